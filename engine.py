@@ -15,15 +15,21 @@ from __future__ import division
 from __future__ import print_function
 
 
+import collections
+import contextlib
 import ctypes
-import itertools
+import functools
+import json
 import os
 import re
 import shutil
+import socket
 import sys
 import time
 
 import sgtk
+from tank_vendor import six
+from tank_vendor import shotgun_api3
 
 import hou
 
@@ -35,6 +41,16 @@ class HoudiniEngine(sgtk.platform.Engine):
 
     _pane_cache = dict()
 
+    JSON_PARM_CACHE_SIZE = 10000
+    MENU_ITEMS_CACHE_SIZE = 10000
+    DIR_LISTING_CACHE_SIZE = 10000
+    TEMPLATE_FORMATTER_CACHE_SIZE = 1000
+    TEMPLATE_FIELDS_CACHE_SIZE = 10000
+    SHOTGUN_CACHE_FILE = "shotgun_cache.sqlite"
+    SGTK_NODE_REGISTRY_KEY = "sgtk_nodes"
+    FROZEN_PATHS_ENV_VAR = "TK_HOUDINI_FROZEN_PATHS"
+    REFRESH_POLICIES = ("none", "variables", "dirty", "all")
+
     @property
     def host_info(self):
         """
@@ -80,15 +96,185 @@ class HoudiniEngine(sgtk.platform.Engine):
         # keep track of if a UI exists
         self._ui_enabled = hasattr(hou, "ui")
         self.__node_handlers = {}
+        self.__node_handler_configs = self._build_node_handler_configs()
+        self.__node_handlers_key = self._get_node_handlers_key()
+        self.__node_handler_constructions = 0
+        self.__publish_cache = None
+        self.__publish_resolver = None
+        self.__cached_shotgun = None
+        self.__shotgun_revalidator = None
+        self.__shared_resolver = None
+        self.__shared_resolver_checked = False
+        self.__shared_shotgun = None
+        self.__resolution_daemon = None
+        self.__shotgun_throttle = None
+        self.__shotgun_throttle_checked = False
+        self.__json_parm_cache = None
+        self.__menu_items_cache = None
+        self.__dir_listing_cache = None
+        self.__template_formatter_cache = None
+        self.__template_fields_cache = None
+        self.__version_index = None
+        self.__version_index_polled = 0
+        self.__context_fields = {}
+        self.__context_fields_context = None
+        self.__scheduled_refreshes = collections.OrderedDict()
+        self.__refreshes_deferred = 0
+        self.__refresh_callback_registered = False
+        self.__refresh_signatures = {}
+        self.__sgtk_node_registry = None
+        self.__sgtk_node_redo_labels = None
+        self.__frozen_paths = self._get_frozen_paths()
+        self.__resolution_manifest = None
+        self.__resolution_manifest_path = None
+        if self.__frozen_paths:
+            self.logger.info("Frozen paths: sgtk node paths won't be resolved")
+
+    def _get_frozen_paths(self):
+        """
+        Whether frozen paths are enabled, by the :attr:`FROZEN_PATHS_ENV_VAR`
+        environment variable if set, otherwise by the ``frozen_paths`` setting.
 
-    def reset_node_handlers(self):
-        """Reset the node handlers cache."""
-        self.__node_handlers = {}
+        :rtype: bool
+        """
+        value = os.environ.get(self.FROZEN_PATHS_ENV_VAR)
+        if value is not None:
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        return bool(self.get_setting("frozen_paths", False))
+
+    @property
+    def frozen_paths(self):
+        """
+        Whether the sgtk nodes keep the paths they were last resolved to,
+        e.g. when rendering on a farm.
+
+        Refreshes are skipped, as are the ``on_loaded`` migrations, and the
+        import node handlers don't query Shotgun.
+
+        :rtype: bool
+        """
+        return self.__frozen_paths
+
+    def reset_node_handlers(self, force=False):
+        """
+        Reset the node handlers and context template fields caches.
+
+        Node handlers are kept while the context and environment they were
+        created under haven't changed, as creating them re-imports their hooks.
+        Otherwise the ``node_handlers`` setting is indexed again, see
+        :meth:`_build_node_handler_configs`, and the registry of sgtk nodes is
+        reset if the node types it covers changed.
+
+        :param bool force: Whether to reset the node handlers regardless.
+        """
+        self.__context_fields = {}
+        key = self._get_node_handlers_key()
+        if force or key != self.__node_handlers_key:
+            self.logger.debug("Resetting node handlers")
+            self.__node_handlers = {}
+            self.__node_handlers_key = key
+            configs = self._build_node_handler_configs()
+            if list(configs) != list(self.__node_handler_configs):
+                self.reset_sgtk_node_registry()
+            self.__node_handler_configs = configs
+
+    def _build_node_handler_configs(self):
+        """
+        Index the ``node_handlers`` setting by node category and type, with
+        the template names resolved to templates.
+
+        The ``extra_templates`` of a config hold the templates named by its
+        ``extra_args``, or ``None`` for values that aren't template names.
+
+        :rtype: :class:`collections.OrderedDict`
+        """
+        configs = collections.OrderedDict()
+        for handler in self.get_setting("node_handlers"):
+            key = (handler["node_category"], handler["node_type"])
+            if key in configs:
+                self.logger.warning("Ignoring duplicate node handler for %s", key)
+                continue
+            config = dict(handler)
+            config["work_template"] = self.get_template_by_name(
+                handler["work_template"]
+            )
+            config["publish_template"] = self.get_template_by_name(
+                handler["publish_template"]
+            )
+            config["extra_templates"] = dict(
+                (name, self.get_template_by_name(value))
+                for name, value in handler["extra_args"].items()
+                if isinstance(value, six.string_types)
+            )
+            configs[key] = config
+        return configs
+
+    @property
+    def node_handler_configs(self):
+        """
+        The ``node_handlers`` setting indexed by node category and type name,
+        see :meth:`node_handler_config`.
+
+        :rtype: :class:`collections.OrderedDict`
+        """
+        return self.__node_handler_configs
+
+    def node_handler_config(self, node_category, node_type):
+        """
+        Get the ``node_handlers`` setting for a node type, with its
+        ``work_template``, ``publish_template`` and ``extra_templates``
+        resolved to templates.
+
+        :param str node_category: The node type category name, e.g. ``Driver``.
+        :param str node_type: The node type name.
+
+        :returns: The node handler config or ``None`` if there's none.
+        :rtype: dict or None
+        """
+        return self.__node_handler_configs.get((node_category, node_type))
+
+    def _get_node_handlers_key(self):
+        """
+        Get what the node handlers depend on: the context and environment.
+
+        :rtype: tuple
+        """
+        return (self.context, self.env.name, self.env.disk_location)
+
+    @property
+    def node_handler_constructions(self):
+        """
+        The number of node handler hooks created this session.
+
+        :rtype: int
+        """
+        return self.__node_handler_constructions
+
+    def post_context_change(self, old_context, new_context):
+        """
+        Called after the context has changed.
+
+        :param old_context: The :class:`sgtk.Context` being switched from.
+        :param new_context: The :class:`sgtk.Context` being switched to.
+        """
+        self.reset_node_handlers()
 
     def pre_app_init(self):
         """
         Called at startup, but after QT has been initialized.
         """
+        self.register_command(
+            "Rebuild sgtk Node Registry",
+            self.check_sgtk_node_registry,
+            {
+                "type": "context_menu",
+                "short_name": "rebuild_sgtk_node_registry",
+                "description": "Rebuild the registry of the sgtk nodes in the "
+                "scene if it doesn't match the scene.",
+            },
+        )
+        if self._ui_enabled or self.__frozen_paths:
+            hou.hipFile.addEventCallback(_refresh_callback)
         if not self._ui_enabled:
             return
 
@@ -100,7 +286,6 @@ class HoudiniEngine(sgtk.platform.Engine):
             tk_houdini = self.import_module("tk_houdini")
             if self.get_setting("automatic_context_switch", True):
                 tk_houdini.ensure_file_change_timer_running()
-        hou.hipFile.addEventCallback(_refresh_callback)
 
     def post_app_init(self):
         """
@@ -318,6 +503,29 @@ class HoudiniEngine(sgtk.platform.Engine):
         self.logger.debug("%s: Destroying...", self)
         hou.hipFile.removeEventCallback(_refresh_callback)
 
+        if self.__publish_resolver is not None:
+            self.__publish_resolver.shutdown()
+
+        if self.__shotgun_revalidator is not None:
+            self.__shotgun_revalidator.shutdown()
+
+        if self.__cached_shotgun is not None:
+            self.__cached_shotgun.cache.close()
+
+        if self.__resolution_daemon is not None:
+            self.__resolution_daemon.close()
+
+        if self.__shotgun_throttle is not None:
+            self.logger.debug("Shotgun throttling: %s", self.__shotgun_throttle.stats())
+
+        if self.__version_index is not None:
+            hou.ui.removeEventLoopCallback(self._poll_version_index)
+            self.__version_index.close()
+
+        if self.__refresh_callback_registered:
+            hou.ui.removeEventLoopCallback(self._flush_scheduled_refreshes)
+            self.__refresh_callback_registered = False
+
         if hasattr(self, "_shelf") and self._shelf:
             # there doesn't appear to be a way to programmatically add a shelf
             # to an existing shelf set. in order to enable context switching,
@@ -1088,9 +1296,7 @@ class HoudiniEngine(sgtk.platform.Engine):
             work_area_template = self.get_template("template_work_area")
             if not work_area_template:
                 return
-            template_fields = context.as_template_fields(
-                work_area_template, validate=False
-            )
+            template_fields = self.context_template_fields(work_area_template)
             work_area_path = work_area_template.apply_fields(template_fields)
         except sgtk.TankError:
             work_area_path = os.path.expanduser("~")
@@ -1105,6 +1311,486 @@ class HoudiniEngine(sgtk.platform.Engine):
         project = context.project or {}
         hou.hscript("set -g PROJECT = {}".format(project.get("name", "''")))
 
+    def context_template_fields(self, template, validate=False):
+        """
+        Get the template fields of the current context, see
+        :meth:`sgtk.Context.as_template_fields`.
+
+        The fields are cached by template name until the context changes or
+        the node handlers are reset, as resolving them may hit the path cache
+        and the file system.
+
+        :param template: An :class:`sgtk.Template`.
+        :param bool validate: Whether to raise if the context can't provide
+            all the fields the template needs.
+
+        :raises: :class:`sgtk.TankError` if validation fails.
+
+        :returns: A copy of the cached fields.
+        :rtype: dict
+        """
+        context = self.context
+        if context is not self.__context_fields_context:
+            self.__context_fields = {}
+            self.__context_fields_context = context
+        key = (template.name, validate)
+        fields = self.__context_fields.get(key)
+        if fields is None:
+            fields = context.as_template_fields(template, validate=validate)
+            self.__context_fields[key] = fields
+        return dict(fields)
+
+    @property
+    def template_fields_cache(self):
+        """
+        The cache of template fields parsed from paths by
+        :meth:`get_template_fields`.
+
+        Its ``hits`` and ``misses`` counters, or :meth:`LRUCache.stats`, show how
+        often the same paths are parsed again.
+
+        :rtype: :class:`LRUCache`
+        """
+        if self.__template_fields_cache is None:
+            tk_houdini = self.import_module("tk_houdini")
+            self.__template_fields_cache = tk_houdini.utils.LRUCache(
+                max_size=self.TEMPLATE_FIELDS_CACHE_SIZE
+            )
+        return self.__template_fields_cache
+
+    def get_template_fields(self, template, path, skip_keys=None, strict=False):
+        """
+        Get the template fields from a path, see
+        :meth:`sgtk.Template.validate_and_get_fields`.
+
+        The fields are cached by template, path and skip keys, as the same
+        paths are parsed many times over when refreshing and publishing nodes.
+
+        :param template: An :class:`sgtk.Template`.
+        :param str path: The path to parse.
+        :param list(str) skip_keys: Keys whose values to ignore.
+        :param bool strict: Whether to raise if the path doesn't match, like
+            :meth:`sgtk.Template.get_fields`.
+
+        :raises: :class:`sgtk.TankError` if strict and the path doesn't match.
+
+        :returns: A copy of the cached fields, or ``None`` if the path doesn't
+            match.
+        :rtype: dict or None
+        """
+        key = (
+            template.name,
+            template.definition,
+            path,
+            tuple(sorted(skip_keys or ())),
+        )
+        missing = object()
+        fields = self.template_fields_cache.get(key, missing)
+        if fields is missing:
+            fields = template.validate_and_get_fields(path, skip_keys=skip_keys)
+            self.template_fields_cache.set(key, fields)
+        if fields is None:
+            if strict:
+                # raise the template's own error
+                template.get_fields(path, skip_keys=skip_keys)
+            return None
+        return dict(fields)
+
+    @property
+    def publish_cache(self):
+        """
+        The ``PublishedFile`` rows cache shared by the import node handlers.
+
+        Its ``hits`` and ``misses`` counters, or :meth:`LRUCache.stats`, can be
+        used to tune the ``publish_cache_ttl`` and ``publish_cache_size`` settings.
+
+        :rtype: :class:`LRUCache`
+        """
+        if self.__publish_cache is None:
+            tk_houdini = self.import_module("tk_houdini")
+            self.__publish_cache = tk_houdini.utils.LRUCache(
+                max_size=self.get_setting("publish_cache_size", 1000),
+                ttl=self.get_setting("publish_cache_ttl", 300),
+            )
+        return self.__publish_cache
+
+    @property
+    def shotgun(self):
+        """
+        The Shotgun connection, throttled by the :attr:`shotgun_throttle`, if
+        any. Queries made through it are neither cached nor shared, see
+        :attr:`cached_shotgun`.
+
+        :rtype: :class:`shotgun_api3.Shotgun` or :class:`RateLimitedShotgun`
+        """
+        return self._get_direct_shotgun_connection()
+
+    @property
+    def cached_shotgun(self):
+        """
+        The Shotgun connection the node handlers query with, caching queries
+        on disk if the ``shotgun_cache`` setting is enabled, see
+        :class:`CachedShotgun`.
+
+        The cache is shared by every session of the project under the Toolkit
+        cache location. Stale results are used while being queried again in
+        the background when a UI exists, refreshing the nodes resolved from
+        them if they changed. Queries missing from the cache are shared with
+        the machine's other processes through the :attr:`shared_resolver`, if
+        any.
+
+        :rtype: :class:`shotgun_api3.Shotgun`, :class:`CachedShotgun` or
+            :class:`SharedShotgun`
+        """
+        if self.__cached_shotgun is None and self.get_setting("shotgun_cache", False):
+            tk_houdini = self.import_module("tk_houdini")
+            cache = tk_houdini.utils.ShotgunQueryCache(
+                os.path.join(self.cache_location, self.SHOTGUN_CACHE_FILE),
+                self.get_setting("shotgun_cache_ttls", {}),
+                max_stale=self.get_setting("shotgun_cache_max_stale", 86400),
+            )
+            cache.prune()
+            revalidate = None
+            if self.has_ui:
+                self.__shotgun_revalidator = tk_houdini.utils.WorkerPool(
+                    self.async_execute_in_main_thread, workers=1
+                )
+                revalidate = self.__shotgun_revalidator.submit
+            self.__cached_shotgun = tk_houdini.utils.CachedShotgun(
+                self._get_shotgun_connection,
+                cache,
+                revalidate=revalidate,
+                on_revalidated=self._on_shotgun_revalidated,
+            )
+            self.logger.debug("Caching Shotgun queries in %s", cache.path)
+        if self.__cached_shotgun is not None:
+            return self.__cached_shotgun
+        return self._get_shotgun_connection()
+
+    def _on_shotgun_revalidated(self, entity_type):
+        """
+        Refresh the sgtk nodes whose paths may have been resolved from a stale
+        Shotgun query result, once it turned out to have changed, see
+        :class:`CachedShotgun`.
+
+        :param str entity_type: The queried entity type.
+        """
+        self.logger.debug("Stale %s query result changed, refreshing", entity_type)
+        if entity_type == "PublishedFile":
+            self.publish_cache.clear()
+        for node in self.all_sgtk_nodes():
+            handler = self.node_handler(node)
+            if handler and entity_type in handler.SHOTGUN_ENTITY_TYPES:
+                self.schedule_refresh(node)
+
+    def _get_shotgun_connection(self):
+        """
+        Get the Shotgun connection of the current thread, bypassing the cache
+        but sharing queries through the :attr:`shared_resolver`, if any.
+
+        :rtype: :class:`shotgun_api3.Shotgun` or :class:`SharedShotgun`
+        """
+        shared_resolver = self.shared_resolver
+        if shared_resolver is None:
+            return self._get_direct_shotgun_connection()
+        if self.__shared_shotgun is None:
+            tk_houdini = self.import_module("tk_houdini")
+            self.__shared_shotgun = tk_houdini.utils.SharedShotgun(
+                self._get_direct_shotgun_connection, shared_resolver
+            )
+        return self.__shared_shotgun
+
+    def _get_direct_shotgun_connection(self):
+        """
+        Get the Shotgun connection of the current thread, throttled by the
+        :attr:`shotgun_throttle`, if any.
+
+        :rtype: :class:`shotgun_api3.Shotgun` or :class:`RateLimitedShotgun`
+        """
+        shotgun_throttle = self.shotgun_throttle
+        if shotgun_throttle is None:
+            return self._get_toolkit_shotgun_connection()
+        return shotgun_throttle
+
+    def _get_toolkit_shotgun_connection(self):
+        """
+        Get the Toolkit Shotgun connection of the current thread.
+
+        :rtype: :class:`shotgun_api3.Shotgun`
+        """
+        return super(HoudiniEngine, self).shotgun
+
+    @property
+    def shotgun_throttle(self):
+        """
+        The Shotgun connection throttling the engine's calls with a token
+        bucket and retrying read-only calls with a jittered exponential
+        backoff, so that farm tasks starting together don't hit Shotgun's rate
+        limits. Its :meth:`RateLimitedShotgun.stats` count the calls throttled
+        and retried and the time spent waiting.
+
+        Configured for the current mode, ``"ui"`` or ``"batch"``, by the
+        ``shotgun_throttling`` setting. ``None`` if neither a rate nor retries
+        are configured.
+
+        :rtype: :class:`RateLimitedShotgun`
+        """
+        if not self.__shotgun_throttle_checked:
+            self.__shotgun_throttle_checked = True
+            mode = "ui" if self.has_ui else "batch"
+            throttling = self.get_setting("shotgun_throttling", {}) or {}
+            settings = throttling.get(mode) or {}
+            rate = settings.get("rate", 0)
+            retries = settings.get("retries", 0)
+            if rate or retries:
+                tk_houdini = self.import_module("tk_houdini")
+                utils = tk_houdini.utils
+                bucket = None
+                if rate:
+                    bucket = utils.TokenBucket(rate, burst=settings.get("burst", 1))
+                self.__shotgun_throttle = utils.RateLimitedShotgun(
+                    self._get_toolkit_shotgun_connection,
+                    bucket=bucket,
+                    retries=retries,
+                    backoff=settings.get("backoff", 1.0),
+                    max_backoff=settings.get("max_backoff", 30.0),
+                    retry_errors=(shotgun_api3.ProtocolError, socket.error),
+                )
+                self.logger.debug("Throttling Shotgun calls (%s): %s", mode, settings)
+        return self.__shotgun_throttle
+
+    @property
+    def shared_resolution_socket(self):
+        """
+        The path of the socket of the local resolution daemon, from the
+        ``shared_resolution_socket`` setting or a socket in the user's private
+        directory, see :func:`resolution_socket_directory`.
+
+        ``None`` if there is no private directory for the default socket.
+
+        :rtype: str
+        """
+        path = self.get_setting("shared_resolution_socket", "")
+        if not path:
+            tk_houdini = self.import_module("tk_houdini")
+            directory = tk_houdini.utils.resolution_socket_directory()
+            if directory is None:
+                return None
+            path = os.path.join(directory, "tk-houdini-resolution.sock")
+        return path
+
+    @property
+    def shared_resolver(self):
+        """
+        The client of the local resolution daemon, deduplicating the Shotgun
+        queries and directory listings of the Houdini processes of the machine.
+
+        The daemon is started on demand by the first process needing it, see
+        :func:`start_resolution_daemon`. Queries run directly whenever it can't
+        be reached, or isn't run by the current user.
+
+        ``None`` unless the ``shared_resolution`` setting is enabled, Unix
+        domain sockets are available and the socket has a private directory.
+
+        :rtype: :class:`ResolutionClient`
+        """
+        if not self.__shared_resolver_checked:
+            self.__shared_resolver_checked = True
+            tk_houdini = self.import_module("tk_houdini")
+            utils = tk_houdini.utils
+            use_shared = self.get_setting("shared_resolution", False)
+            if use_shared and utils.resolution_daemon_supported():
+                socket_path = self.shared_resolution_socket
+                if socket_path is None:
+                    self.logger.warning(
+                        "No private directory for the shared resolution socket, "
+                        "queries won't be shared."
+                    )
+                else:
+                    self.__shared_resolver = utils.ResolutionClient(
+                        socket_path, start_daemon=self._start_resolution_daemon,
+                    )
+        return self.__shared_resolver
+
+    def _start_resolution_daemon(self):
+        """
+        Serve the local resolution daemon from this process, unless already
+        served by another.
+        """
+        if self.__resolution_daemon is not None:
+            return
+        tk_houdini = self.import_module("tk_houdini")
+        self.__resolution_daemon = tk_houdini.utils.start_resolution_daemon(
+            self.shared_resolution_socket,
+            ttl=self.get_setting("shared_resolution_ttl", 60),
+        )
+        if self.__resolution_daemon is not None:
+            self.logger.debug(
+                "Serving shared resolutions at %s", self.__resolution_daemon.path
+            )
+
+    def invalidate_shotgun_query(self, method, entity_type, *args, **kwargs):
+        """
+        Remove the cached or shared result of a query made through
+        :attr:`cached_shotgun`, if any, so that it's queried next time.
+
+        :param str method: The name of the query method, e.g. ``"find"``.
+        :param str entity_type: The queried entity type.
+        """
+        if self.__cached_shotgun is not None:
+            self.__cached_shotgun.invalidate(method, entity_type, *args, **kwargs)
+        if self.__shared_shotgun is not None:
+            self.__shared_shotgun.invalidate(method, entity_type, *args, **kwargs)
+
+    def invalidate_shotgun_queries(self, entity_type):
+        """
+        Remove the results of all the queries of the entity type made through
+        :attr:`cached_shotgun` from the cache on disk, if any, so that they're
+        queried next time.
+
+        :param str entity_type: The queried entity type.
+        """
+        if self.__cached_shotgun is not None:
+            self.__cached_shotgun.invalidate_entity_type(entity_type)
+
+    @property
+    def publish_resolver(self):
+        """
+        The worker pool the import node handlers resolve publishes with.
+
+        ``None`` unless the ``async_publish_resolution`` setting is enabled and
+        a UI exists to hand the results back to. Jobs run off the main thread
+        so mustn't use ``hou``: parm values, nodes and the current hip file
+        are looked up before submitting them.
+
+        :rtype: :class:`WorkerPool`
+        """
+        if self.__publish_resolver is None:
+            use_async = self.get_setting("async_publish_resolution", False)
+            if use_async and self.has_ui:
+                tk_houdini = self.import_module("tk_houdini")
+                self.__publish_resolver = tk_houdini.utils.WorkerPool(
+                    self.async_execute_in_main_thread,
+                    workers=self.get_setting("async_publish_workers", 4),
+                )
+        return self.__publish_resolver
+
+    @property
+    def json_parm_cache(self):
+        """
+        The cache of JSON values decoded from node parms, keyed by node session
+        id and parm name, used by the import node handlers.
+
+        :rtype: :class:`LRUCache`
+        """
+        if self.__json_parm_cache is None:
+            tk_houdini = self.import_module("tk_houdini")
+            self.__json_parm_cache = tk_houdini.utils.LRUCache(
+                max_size=self.JSON_PARM_CACHE_SIZE
+            )
+        return self.__json_parm_cache
+
+    @property
+    def menu_items_cache(self):
+        """
+        The cache of menu items generated by the node handlers, keyed by node
+        session id and menu parm name.
+
+        :rtype: :class:`LRUCache`
+        """
+        if self.__menu_items_cache is None:
+            tk_houdini = self.import_module("tk_houdini")
+            self.__menu_items_cache = tk_houdini.utils.LRUCache(
+                max_size=self.MENU_ITEMS_CACHE_SIZE
+            )
+        return self.__menu_items_cache
+
+    @property
+    def dir_listing_cache(self):
+        """
+        The directory listings cache the node handlers find files on disk with.
+
+        :rtype: :class:`DirListingCache`
+        """
+        if self.__dir_listing_cache is None:
+            tk_houdini = self.import_module("tk_houdini")
+            list_dir = None
+            shared_resolver = self.shared_resolver
+            if shared_resolver is not None:
+                list_dir = functools.partial(
+                    tk_houdini.utils.list_directory_shared, shared_resolver
+                )
+            self.__dir_listing_cache = tk_houdini.utils.DirListingCache(
+                max_size=self.DIR_LISTING_CACHE_SIZE, list_dir=list_dir
+            )
+        return self.__dir_listing_cache
+
+    @property
+    def template_formatter_cache(self):
+        """
+        The cache of template formatters compiled by the node handlers, keyed by
+        template and the fields they were compiled for.
+
+        :rtype: :class:`LRUCache`
+        """
+        if self.__template_formatter_cache is None:
+            tk_houdini = self.import_module("tk_houdini")
+            self.__template_formatter_cache = tk_houdini.utils.LRUCache(
+                max_size=self.TEMPLATE_FORMATTER_CACHE_SIZE
+            )
+        return self.__template_formatter_cache
+
+    @property
+    def version_index(self):
+        """
+        The live index of versions on disk the node handlers find versions with.
+
+        ``None`` unless the ``watch_versions_on_disk`` setting is enabled and
+        a UI exists to poll it from.
+
+        :rtype: :class:`VersionIndex`
+        """
+        if self.__version_index is None:
+            use_index = self.get_setting("watch_versions_on_disk", False)
+            if use_index and self.has_ui:
+                tk_houdini = self.import_module("tk_houdini")
+                utils = tk_houdini.utils
+                self.__version_index = utils.VersionIndex(
+                    utils.create_dir_watcher(),
+                    list_dir=self.dir_listing_cache.list_dir,
+                )
+                hou.ui.addEventLoopCallback(self._poll_version_index)
+        return self.__version_index
+
+    def _poll_version_index(self):
+        """
+        Refresh the nodes whose versions on disk have changed.
+
+        Runs from Houdini's event loop, at most every ``version_watch_interval``
+        seconds.
+        """
+        now = time.time()
+        interval = self.get_setting("version_watch_interval", 2)
+        if now - self.__version_index_polled < interval:
+            return
+        self.__version_index_polled = now
+        try:
+            nodes = []
+            for session_id in self.__version_index.poll():
+                node = hou.nodeBySessionId(session_id)
+                if node is None:
+                    self.__version_index.forget(session_id)
+                else:
+                    nodes.append(node)
+            if nodes:
+                self.logger.debug(
+                    "Versions changed on disk for: %s",
+                    ", ".join(node.path() for node in nodes),
+                )
+                self.refresh_sgtk_nodes(nodes)
+        except Exception:
+            self.logger.exception("Failed to refresh versions on disk")
+
     def node_handler(self, node):
         """
         Get the node handler hook for the given node.
@@ -1122,21 +1808,16 @@ class HoudiniEngine(sgtk.platform.Engine):
         hook_instance = category_handler.get(node_type_name, False)
 
         if hook_instance is False:
-            node_handlers = self.get_setting("node_handlers")
+            config = self.node_handler_config(node_category, node_type_name)
             hook_instance = None
-            for handler in node_handlers:
-                setup_hook = (
-                    handler["node_category"] == node_category
-                    and handler["node_type"] == node_type_name
+            if config:
+                tk_houdini = self.import_module("tk_houdini")
+                base_class = tk_houdini.base_hooks.NodeHandlerBase
+                hook_instance = self.create_hook_instance(
+                    config["hook"],
+                    base_class=base_class,
                 )
-                if setup_hook:
-                    tk_houdini = self.import_module("tk_houdini")
-                    base_class = tk_houdini.base_hooks.NodeHandlerBase
-                    hook_instance = self.create_hook_instance(
-                        handler["hook"],
-                        base_class=base_class,
-                    )
-                    break
+                self.__node_handler_constructions += 1
             category_handler[node_type_name] = hook_instance
 
         return hook_instance
@@ -1145,35 +1826,473 @@ class HoudiniEngine(sgtk.platform.Engine):
         """
         Iterate over all the nodes in the scene that contains sgtk parameters.
 
+        The nodes are looked up in the registry of sgtk nodes, see
+        :meth:`sgtk_nodes`.
+
         :rtype: Generator[:class:`hou.Node`]
         """
-        node_type_categories = hou.nodeTypeCategories()
-        node_handler_settings = self.get_setting("node_handlers")
+        for node_category, node_type in list(self.__node_handler_configs):
+            for node in self.sgtk_nodes(node_category, node_type):
+                yield node
 
-        def key_func(item):
-            return item["node_category"]
+    def sgtk_nodes(self, node_category, node_type):
+        """
+        Get the nodes of the given type in the scene that contain sgtk
+        parameters, as registered, see :meth:`register_sgtk_node`.
 
-        grouped = itertools.groupby(
-            sorted(node_handler_settings, key=key_func), key=key_func
-        )
+        :param str node_category: The node type category name, e.g. ``Driver``.
+        :param str node_type: The node type name.
 
-        for category_name, node_handlers in grouped:
-            category = node_type_categories[category_name]
-            for node_handler in node_handlers:
-                node_type_name = node_handler["node_type"]
-                node_type = hou.nodeType(category, node_type_name)
-                if node_type is None:
-                    self.logger.warn(
-                        "No node type %r comes under category %r",
-                        node_type_name,
-                        category,
-                    )
-                else:
-                    for node in node_type.instances():
-                        parm = node.parm("sgtk_identifier")
-                        if parm:
-                            self.logger.debug("sgtk node: %s", node.path())
-                            yield node
+        :rtype: list(:class:`hou.Node`)
+        """
+        registry = self._get_sgtk_node_registry()
+        session_ids = registry.get((node_category, node_type), set())
+        nodes = []
+        for session_id in list(session_ids):
+            node = hou.nodeBySessionId(session_id)
+            if node is None:
+                # deleted without the OnDeleted script running e.g. by undo
+                session_ids.discard(session_id)
+            else:
+                nodes.append(node)
+        return nodes
+
+    def register_sgtk_node(self, node):
+        """
+        Add the node to the registry of sgtk nodes, if it contains sgtk
+        parameters. Called by the ``OnCreated`` and ``OnLoaded`` scripts.
+
+        :param node: A :class:`hou.Node` instance.
+        """
+        if self.__sgtk_node_registry is None:
+            # it will be found when the registry is built
+            return
+        self._check_sgtk_node_redo_labels()
+        node_type = node.type()
+        key = (node_type.category().name(), node_type.name())
+        if key in self.__node_handler_configs and node.parm("sgtk_identifier"):
+            self.__sgtk_node_registry.setdefault(key, set()).add(node.sessionId())
+
+    def unregister_sgtk_node(self, node):
+        """
+        Remove the node from the registry of sgtk nodes. Called by the
+        ``OnDeleted`` script.
+
+        :param node: A :class:`hou.Node` instance.
+        """
+        if self.__sgtk_node_registry is None:
+            return
+        self._check_sgtk_node_redo_labels()
+        node_type = node.type()
+        key = (node_type.category().name(), node_type.name())
+        self.__sgtk_node_registry.get(key, set()).discard(node.sessionId())
+
+    def reset_sgtk_node_registry(self):
+        """
+        Forget the registry of sgtk nodes, for it to be loaded from the
+        scene or rebuilt next time it is needed.
+        """
+        self.__sgtk_node_registry = None
+        self.__sgtk_node_redo_labels = None
+
+    def check_sgtk_node_registry(self):
+        """
+        Rebuild the registry of sgtk nodes, reporting whether it had drifted
+        from the scene.
+
+        :returns: Whether the registry didn't match the scene.
+        :rtype: bool
+        """
+        registry = self._get_sgtk_node_registry()
+        rebuilt = self._build_sgtk_node_registry()
+        current = dict((key, ids) for key, ids in registry.items() if ids)
+        drifted = current != rebuilt
+        if drifted:
+            self.logger.warning("Rebuilt the sgtk node registry, it had drifted")
+        else:
+            self.logger.info("The sgtk node registry matches the scene")
+        self.__sgtk_node_registry = rebuilt
+        return drifted
+
+    def save_sgtk_node_registry(self):
+        """
+        Store the paths of the sgtk nodes in the root node's user data, for
+        the registry to be loaded with the scene.
+        """
+        saved = []
+        for node_category, node_type in list(self._get_sgtk_node_registry()):
+            paths = [node.path() for node in self.sgtk_nodes(node_category, node_type)]
+            if paths:
+                saved.append([node_category, node_type, paths])
+        hou.node("/").setUserData(self.SGTK_NODE_REGISTRY_KEY, json.dumps(saved))
+
+    def _get_sgtk_node_registry(self):
+        """
+        Get the session ids of the sgtk nodes by node category and type name,
+        loading them from the scene or building them if needed.
+
+        :rtype: dict
+        """
+        if self.__sgtk_node_registry is None:
+            registry = None
+            if not hou.hipFile.hasUnsavedChanges():
+                registry = self._load_sgtk_node_registry()
+            if registry is None:
+                registry = self._build_sgtk_node_registry()
+            self.__sgtk_node_registry = registry
+            self.__sgtk_node_redo_labels = self._get_redo_labels()
+        else:
+            self._check_sgtk_node_redo_labels()
+        return self.__sgtk_node_registry
+
+    def _check_sgtk_node_redo_labels(self):
+        """
+        Rebuild the registry of sgtk nodes if an undo or redo happened since
+        it was last used, as restoring deleted nodes doesn't run their
+        ``OnCreated`` script.
+
+        Undos and redos are told by the redo stack changing.
+        """
+        redo_labels = self._get_redo_labels()
+        if redo_labels != self.__sgtk_node_redo_labels:
+            self.logger.debug("Rebuilding the sgtk node registry after an undo")
+            self.__sgtk_node_registry = self._build_sgtk_node_registry()
+            self.__sgtk_node_redo_labels = redo_labels
+
+    @staticmethod
+    def _get_redo_labels():
+        """
+        Get the labels of the operations that can be redone.
+
+        :rtype: tuple(str)
+        """
+        return tuple(hou.undos.redoLabels())
+
+    def _load_sgtk_node_registry(self):
+        """
+        Load the registry of sgtk nodes saved in the root node's user data.
+
+        :returns: The registry, or ``None`` if there is none or it doesn't
+            match the scene.
+        :rtype: dict or None
+        """
+        saved = hou.node("/").userData(self.SGTK_NODE_REGISTRY_KEY)
+        if not saved:
+            return None
+        registry = {}
+        try:
+            for node_category, node_type, paths in json.loads(saved):
+                key = (node_category, node_type)
+                if key not in self.__node_handler_configs:
+                    continue
+                session_ids = registry.setdefault(key, set())
+                for path in paths:
+                    node = hou.node(path)
+                    if (
+                        node is None
+                        or node.type().name() != node_type
+                        or not node.parm("sgtk_identifier")
+                    ):
+                        return None
+                    session_ids.add(node.sessionId())
+        except ValueError:
+            self.logger.exception("Failed to load the sgtk node registry")
+            return None
+        return registry
+
+    def _build_sgtk_node_registry(self):
+        """
+        Build the registry of sgtk nodes by looking through every node of the
+        node handlers' types, see :meth:`_scan_sgtk_nodes`.
+
+        :rtype: dict
+        """
+        registry = {}
+        for category_name, node_type_name in self.__node_handler_configs:
+            key = (category_name, node_type_name)
+            instances = self._get_node_type_instances(category_name, node_type_name)
+            if instances is None:
+                self.logger.warn(
+                    "No node type %r comes under category %r",
+                    node_type_name,
+                    category_name,
+                )
+                instances = ()
+            session_ids = self._scan_sgtk_nodes(instances)
+            if session_ids:
+                registry[key] = session_ids
+        return registry
+
+    def _scan_sgtk_nodes(self, nodes):
+        """
+        Get the session ids of the given nodes that contain sgtk parameters.
+
+        :param nodes: :class:`hou.Node` instances.
+
+        :rtype: set(int)
+        """
+        session_ids = set()
+        for node in nodes:
+            parm = node.parm("sgtk_identifier")
+            if parm:
+                self.logger.debug("sgtk node: %s", node.path())
+                session_ids.add(node.sessionId())
+        return session_ids
+
+    def _get_node_type_instances(self, category_name, node_type_name):
+        """
+        Get the nodes of the given type in the scene.
+
+        :param str category_name: The node type category name, e.g. ``Driver``.
+        :param str node_type_name: The node type name.
+
+        :returns: The nodes, or ``None`` if there is no such node type.
+        :rtype: tuple(:class:`hou.Node`)
+        """
+        category = hou.nodeTypeCategories()[category_name]
+        node_type = hou.nodeType(category, node_type_name)
+        if node_type is None:
+            return None
+        return node_type.instances()
+
+    def refresh_sgtk_nodes(self, nodes=None):
+        """
+        Refresh the file paths of the given sgtk nodes that have Shotgun enabled.
+
+        Nodes are grouped by node handler so that each handler can share work
+        between its nodes, see :meth:`NodeHandlerBase.refresh_file_paths`.
+
+        Nothing is refreshed when :attr:`frozen_paths` are enabled.
+
+        :param nodes: :class:`hou.Node` instances to refresh. Defaults to all
+            the sgtk nodes in the scene.
+        """
+        if self.__frozen_paths:
+            self.__scheduled_refreshes.clear()
+            return
+        if nodes is None:
+            # every node is refreshed anyway
+            self.__scheduled_refreshes.clear()
+            self.__refresh_signatures.clear()
+            nodes = self.all_sgtk_nodes()
+        nodes_by_handler = collections.OrderedDict()
+        for node in nodes:
+            use_sgtk = node.parm("use_sgtk")
+            if use_sgtk and use_sgtk.eval():
+                handler = self.node_handler(node)
+                if handler:
+                    nodes_by_handler.setdefault(handler, []).append(node)
+        for handler, handler_nodes in nodes_by_handler.items():
+            handler.refresh_file_paths(handler_nodes)
+            for node in handler_nodes:
+                signature = handler.get_refresh_signature(node)
+                self.__refresh_signatures[node.sessionId()] = signature
+
+    def dirty_sgtk_nodes(self):
+        """
+        Iterate over the sgtk nodes whose parms changed since they were last
+        refreshed, see :meth:`NodeHandlerBase.get_refresh_signature`.
+
+        :rtype: Generator[:class:`hou.Node`]
+        """
+        for node in self.all_sgtk_nodes():
+            handler = self.node_handler(node)
+            if not handler:
+                continue
+            signature = self.__refresh_signatures.get(node.sessionId())
+            if signature != handler.get_refresh_signature(node):
+                yield node
+
+    def refresh_after_scene_event(self, event_name):
+        """
+        Refresh the session after the scene is saved, loaded or cleared,
+        following the ``<event_name>_refresh_policy`` setting.
+
+        When :attr:`frozen_paths` are enabled, the paths left unresolved by a
+        load are logged instead, see :meth:`log_unresolved_paths`.
+
+        :param str event_name: One of ``save``, ``load`` or ``clear``.
+        """
+        if self.__frozen_paths:
+            if event_name == "load":
+                self.log_unresolved_paths()
+            return
+        setting_name = "{}_refresh_policy".format(event_name)
+        policy = self.get_setting(setting_name, "all")
+        if policy not in self.REFRESH_POLICIES:
+            self.logger.warning(
+                "Unknown %s %r, expected one of %s",
+                setting_name,
+                policy,
+                ", ".join(self.REFRESH_POLICIES),
+            )
+            policy = "all"
+        self.logger.debug("Refreshing after scene %s: %s", event_name, policy)
+
+        if policy == "none":
+            return
+        if policy == "all":
+            # reset node handlers as they may change between contexts
+            self.reset_node_handlers()
+        self.update_variables()
+        if policy == "all":
+            self.refresh_sgtk_nodes()
+        elif policy == "dirty":
+            self.refresh_sgtk_nodes(list(self.dirty_sgtk_nodes()))
+
+    def log_unresolved_paths(self):
+        """
+        Log the file path parms of the sgtk nodes with Shotgun enabled that
+        haven't been resolved, in a single line.
+
+        :returns: The unresolved parms' paths.
+        :rtype: list(str)
+        """
+        unresolved = []
+        for node in self.all_sgtk_nodes():
+            use_sgtk = node.parm("use_sgtk")
+            handler = self.node_handler(node)
+            if use_sgtk and use_sgtk.eval() and handler:
+                for parm_name in handler.get_unresolved_paths(node):
+                    unresolved.append("{}/{}".format(node.path(), parm_name))
+        if unresolved:
+            self.logger.warning(
+                "%d unresolved sgtk path(s): %s", len(unresolved), ", ".join(unresolved)
+            )
+        else:
+            self.logger.info("All sgtk paths are resolved")
+        return unresolved
+
+    @property
+    def resolution_manifest(self):
+        """
+        The resolution manifest written next to the current hip file, that the
+        import node handlers resolve publishes from instead of Shotgun.
+
+        ``None`` unless the ``resolve_from_manifest`` setting is enabled and
+        the manifest exists, see :meth:`write_resolution_manifest`.
+
+        :rtype: :class:`ResolutionManifest`
+        """
+        if not self.get_setting("resolve_from_manifest", False):
+            return None
+        tk_houdini = self.import_module("tk_houdini")
+        manifest_class = tk_houdini.utils.ResolutionManifest
+        path = manifest_class.get_path(hou.hipFile.path())
+        if path != self.__resolution_manifest_path:
+            self.__resolution_manifest_path = path
+            self.__resolution_manifest = None
+            if os.path.isfile(path):
+                try:
+                    self.__resolution_manifest = manifest_class.load(path)
+                except (IOError, OSError, ValueError):
+                    self.logger.exception("Failed to load %s", path)
+        return self.__resolution_manifest
+
+    def write_resolution_manifest(self):
+        """
+        Write the paths, publishes and versions the sgtk nodes were resolved to
+        in a manifest next to the current hip file.
+
+        :returns: The path of the manifest.
+        :rtype: str
+        """
+        tk_houdini = self.import_module("tk_houdini")
+        hip_path = hou.hipFile.path()
+        manifest = tk_houdini.utils.ResolutionManifest(hip_path=hip_path)
+        for node in self.all_sgtk_nodes():
+            handler = self.node_handler(node)
+            if not handler:
+                continue
+            try:
+                manifest.add_node(node.path(), handler.get_manifest_entry(node))
+            except Exception:
+                self.logger.exception("Failed to add %s to the manifest", node.path())
+        path = manifest.get_path(hip_path)
+        manifest.save(path)
+        if path == self.__resolution_manifest_path:
+            self.__resolution_manifest_path = None
+        self.logger.debug("Wrote %d sgtk node(s) to %s", len(manifest.nodes), path)
+        return path
+
+    def schedule_refresh(self, node):
+        """
+        Schedule a refresh of the file paths of the given sgtk node.
+
+        Refreshes scheduled for the same node are collapsed into one, run when
+        Houdini is next idle, or straight away in batch mode unless deferred,
+        see :meth:`defer_refreshes`. Use :meth:`flush_refreshes` to run them
+        immediately.
+
+        :param node: A :class:`hou.Node` instance.
+        """
+        if self.__frozen_paths:
+            return
+        self.__scheduled_refreshes[node.sessionId()] = None
+        if self.__refreshes_deferred:
+            return
+        if not self.has_ui:
+            self.flush_refreshes()
+        elif not self.__refresh_callback_registered:
+            hou.ui.addEventLoopCallback(self._flush_scheduled_refreshes)
+            self.__refresh_callback_registered = True
+
+    def flush_refreshes(self, nodes=None):
+        """
+        Run the scheduled refreshes now, see :meth:`schedule_refresh`.
+
+        :param nodes: Only run the refreshes scheduled for these
+            :class:`hou.Node` instances, if given.
+        """
+        if nodes is None:
+            session_ids = list(self.__scheduled_refreshes)
+            self.__scheduled_refreshes.clear()
+        else:
+            session_ids = []
+            for node in nodes:
+                session_id = node.sessionId()
+                if session_id in self.__scheduled_refreshes:
+                    del self.__scheduled_refreshes[session_id]
+                    session_ids.append(session_id)
+        scheduled = []
+        for session_id in session_ids:
+            # nodes may have been deleted since
+            node = hou.nodeBySessionId(session_id)
+            if node is not None:
+                scheduled.append(node)
+        if scheduled:
+            self.refresh_sgtk_nodes(scheduled)
+
+    @contextlib.contextmanager
+    def defer_refreshes(self):
+        """
+        Context manager holding back the scheduled refreshes until it exits,
+        for scripts changing many nodes at once::
+
+            with engine.defer_refreshes():
+                for node in nodes:
+                    node.setName(node.name() + "_v2")
+        """
+        self.__refreshes_deferred += 1
+        try:
+            yield
+        finally:
+            self.__refreshes_deferred -= 1
+        if not self.__refreshes_deferred:
+            self.flush_refreshes()
+
+    def _flush_scheduled_refreshes(self):
+        """
+        Run the scheduled refreshes from Houdini's event loop.
+        """
+        if self.__refreshes_deferred:
+            return
+        hou.ui.removeEventLoopCallback(self._flush_scheduled_refreshes)
+        self.__refresh_callback_registered = False
+        try:
+            self.flush_refreshes()
+        except Exception:
+            self.logger.exception("Failed to refresh sgtk nodes")
 
     def remove_sgtk_parms(self, node):
         """
@@ -1212,25 +2331,40 @@ def _refresh_callback(event):
     """
     Callback to refresh all variables and node handler classes.
 
-    This can happen on load, save and clear.
+    This can happen on load, save and clear, see
+    :meth:`HoudiniEngine.refresh_after_scene_event`.
 
     :param event: A :class:`hou.hipFileEventType` event.
     """
-    valid_event_types = (
-        hou.hipFileEventType.AfterSave,
-        hou.hipFileEventType.AfterLoad,
-        hou.hipFileEventType.AfterClear,
-    )
-    if event not in valid_event_types:
+    event_names = {
+        hou.hipFileEventType.AfterSave: "save",
+        hou.hipFileEventType.AfterLoad: "load",
+        hou.hipFileEventType.AfterClear: "clear",
+    }
+    engine = sgtk.platform.current_engine()
+    if event == hou.hipFileEventType.BeforeSave:
+        # save the paths of nodes still waiting to be refreshed up to date
+        if engine:
+            engine.flush_refreshes()
+            engine.save_sgtk_node_registry()
+        return
+    if event in (
+        hou.hipFileEventType.BeforeClear,
+        hou.hipFileEventType.BeforeLoad,
+        hou.hipFileEventType.AfterMerge,
+    ):
+        # merged nodes may not be in the saved registry
+        if engine:
+            engine.reset_sgtk_node_registry()
+        return
+    if event not in event_names:
         return
 
-    engine = sgtk.platform.current_engine()
     if engine:
-        # reset node handlers as they may change between contexts
-        engine.reset_node_handlers()
-        engine.update_variables()
-        for node in engine.all_sgtk_nodes():
-            handler = engine.node_handler(node)
-            use_sgtk = node.parm("use_sgtk")
-            if use_sgtk and use_sgtk.eval():
-                handler.refresh_file_path({"node": node})
+        write_manifest = engine.get_setting("write_resolution_manifest", False)
+        if event == hou.hipFileEventType.AfterSave and write_manifest:
+            try:
+                engine.write_resolution_manifest()
+            except (IOError, OSError):
+                engine.logger.exception("Failed to write the resolution manifest")
+        engine.refresh_after_scene_event(event_names[event])
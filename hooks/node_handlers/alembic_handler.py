@@ -118,4 +118,4 @@ class AlembicNodeHandler(HookBaseClass):
         identifier = fields.get("identifier", "geo")
         entries = sgtk_abc_identifier.menuItems()
         index = entries.index(identifier)
-        sgtk_abc_identifier.set(index)
+        self._set_parm(sgtk_abc_identifier, index)
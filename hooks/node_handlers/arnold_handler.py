@@ -150,14 +150,21 @@ class ArnoldNodeHandler(HookBaseClass):
         vm_filename_plane_template = vm_filename_plane.template
         vm_filename_plane_template.setDefaultValue((self.AOV_ERROR,))
 
-    def _refresh_file_path(self, node):
+    def _update_output_paths(self, node, get_template_fields):
         """
-        Refresh the file paths generated by the node handler.
+        Update the paths of all the node's outputs derived from its output path,
+        in a single pass.
 
         :param node: A :class:`hou.Node` instance.
+        :param get_template_fields: Function from :meth:`_get_output_template_fields`.
         """
-        super(ArnoldNodeHandler, self)._refresh_file_path(node)
-        self.update_file_path(node, self.AR_MATERIALX_FILE, self.MTLX_WORK_TEMPLATE)
+        super(ArnoldNodeHandler, self)._update_output_paths(node, get_template_fields)
+        self.update_file_path(
+            node,
+            self.AR_MATERIALX_FILE,
+            self.MTLX_WORK_TEMPLATE,
+            get_template_fields=get_template_fields,
+        )
 
     #############################################################################################
     # Utilities
@@ -183,7 +190,7 @@ class ArnoldNodeHandler(HookBaseClass):
         index = ar_aovs.index_of_template(self.SGTK_AOV_NAME_TMPL.format("#"))
         ar_aovs.pop_template(index)
 
-    def _get_output_paths_and_templates(self, node):
+    def _get_output_paths_and_templates(self, node, scan_disk=True):
         """
         Go through the node's specified parameters and get the output paths,
         work and publish templates.
@@ -198,12 +205,14 @@ class ArnoldNodeHandler(HookBaseClass):
         - whether the output is a deep image
 
         :param node: A :class:`hou.Node` instance.
+        :param bool scan_disk: Whether to look for the outputs on disk, see
+            :meth:`_get_output_path_and_templates_for_parm`.
 
         :rtype: list(dict)
         """
         paths_and_templates = super(
             ArnoldNodeHandler, self
-        )._get_output_paths_and_templates(node)
+        )._get_output_paths_and_templates(node, scan_disk=scan_disk)
 
         # material x
         if node.parm(self.AR_MATERIALX_ENABLE).eval():
@@ -213,6 +222,7 @@ class ArnoldNodeHandler(HookBaseClass):
                 self._get_template(self.MTLX_WORK_TEMPLATE),
                 self._get_template(self.MTLX_PUBLISH_TEMPLATE),
                 paths_and_templates,
+                scan_disk=scan_disk,
             )
 
         # ass files
@@ -223,6 +233,7 @@ class ArnoldNodeHandler(HookBaseClass):
                 self._get_template(self.ARCHIVE_WORK_TEMPLATE),
                 self._get_template(self.ARCHIVE_PUBLISH_TEMPLATE),
                 paths_and_templates,
+                scan_disk=scan_disk,
             )
 
         return paths_and_templates
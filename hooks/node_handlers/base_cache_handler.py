@@ -104,4 +104,4 @@ class BaseCacheNodeHandler(HookBaseClass):
         """
         super(BaseCacheNodeHandler, self)._populate_from_fields(node, fields)
         sgtk_single_frame = node.parm(self.SGTK_SINGLE_FRAME)
-        sgtk_single_frame.set("SEQ" not in fields)
+        self._set_parm(sgtk_single_frame, "SEQ" not in fields)
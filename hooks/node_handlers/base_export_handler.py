@@ -11,7 +11,6 @@ These include:
 
 """
 import copy
-import glob
 import json
 import os
 import re
@@ -81,7 +80,7 @@ class ExportNodeHandler(HookBaseClass):
             return
         parm = node.parm(self.USE_SGTK)
         if parm and parm.eval():
-            self._refresh_file_path(node)
+            self._schedule_refresh(node)
 
     #############################################################################################
     # UI customisation
@@ -273,8 +272,8 @@ class ExportNodeHandler(HookBaseClass):
             fields["name"] = name
         else:
             # Lets clear these as we can't have just location and variation without element
-            sgtk_location.set("")
-            sgtk_variation.set("")
+            self._set_parm(sgtk_location, "")
+            self._set_parm(sgtk_variation, "")
 
         location = sgtk_location.evalAsString().strip() or None
         fields["location"] = location
@@ -298,7 +297,7 @@ class ExportNodeHandler(HookBaseClass):
                 optional_fields[key_name] = field
         parm = node.parm(self.OPTIONAL_KEYS)
         if parm:
-            parm.set(json.dumps(optional_fields))
+            self._set_parm(parm, json.dumps(optional_fields))
 
     def _update_all_versions(self, node, all_versions):
         """
@@ -310,7 +309,7 @@ class ExportNodeHandler(HookBaseClass):
         if all_versions != self._get_all_versions(node):
             all_versions_str = ",".join(map(str, all_versions))
             sgtk_all_versions = node.parm(self.SGTK_ALL_VERSIONS)
-            sgtk_all_versions.set(all_versions_str)
+            self._set_parm(sgtk_all_versions, all_versions_str)
 
     @HookBaseClass.restore_version_menu_index
     def refresh_file_path_from_version(self, kwargs):
@@ -322,9 +321,40 @@ class ExportNodeHandler(HookBaseClass):
         using_next_parm = node.parm(self.USING_NEXT_VERSION)
         sgtk_version = node.parm(self.SGTK_VERSION)
         using_next = sgtk_version.evalAsString() in self.VERSION_POLICIES
-        using_next_parm.set(using_next)
-        self._refresh_file_path(node)
+        self._set_parm(using_next_parm, using_next)
+        self._schedule_refresh(node)
+
+    def get_manifest_entry(self, node):
+        """
+        Get the entry of the node in the resolution manifest.
 
+        :param node: A :class:`hou.Node` instance.
+
+        :rtype: dict
+        """
+        entry = super(ExportNodeHandler, self).get_manifest_entry(node)
+        entry["output_path"] = node.parm(self.OUTPUT_PARM).unexpandedString()
+        entry["outputs"] = [
+            dict((key, getattr(value, "name", value)) for key, value in item.items())
+            for item in self.get_output_paths_and_templates(node, scan_disk=False)
+        ]
+        return entry
+
+    def get_unresolved_paths(self, node):
+        """
+        Get the names of the node's file path parms that haven't been resolved.
+
+        :param node: A :class:`hou.Node` instance.
+
+        :rtype: list(str)
+        """
+        output_parm = node.parm(self.OUTPUT_PARM)
+        path = output_parm.unexpandedString()
+        if not path or path == self.DEFAULT_ERROR_STRING:
+            return [self.OUTPUT_PARM]
+        return []
+
+    @HookBaseClass.batched_parm_writes
     def _refresh_file_path(self, node):
         """
         Refresh the file paths generated by the node handler.
@@ -333,39 +363,38 @@ class ExportNodeHandler(HookBaseClass):
         """
         output_parm = node.parm(self.OUTPUT_PARM)
 
-        context = self.parent.context
         template = self.get_work_template(node)
-        fields = context.as_template_fields(template, validate=True)
+        fields = self.parent.context_template_fields(template, validate=True)
 
         self._update_template_fields(node, fields)
         self._update_optional_keys(node, template, fields)
 
-        all_versions = self._resolve_all_versions_from_fields(fields, template)
+        all_versions = self._resolve_all_versions_from_fields(
+            fields, template, node=node
+        )
         sgtk_version = node.parm(self.SGTK_VERSION)
         self._update_all_versions(node, all_versions)
 
         using_next = sgtk_version.evalAsString() in self.VERSION_POLICIES
         using_next_parm = node.parm(self.USING_NEXT_VERSION)
         if using_next_parm:
-            using_next_parm.set(using_next)
+            self._set_parm(using_next_parm, using_next)
             if using_next_parm.eval():
-                sgtk_version.set(len(all_versions))
+                self._set_parm(sgtk_version, len(all_versions))
         current = sgtk_version.evalAsString()
         resolved_version = self._resolve_version(all_versions, current)
 
         sgtk_resolved_version = node.parm(self.SGTK_RESOLVED_VERSION)
-        sgtk_resolved_version.set(str(resolved_version))
+        self._set_parm(sgtk_resolved_version, str(resolved_version))
 
         fields["version"] = resolved_version
         try:
-            new_path = self.get_work_template(node).apply_fields(fields)
+            new_path = self._apply_fields(template, fields)
         except sgtk.TankError:
             new_path = self.DEFAULT_ERROR_STRING
             self.parent.logger.exception('Failed to calculate path for "%s"', node)
 
-        output_parm.lock(False)
-        output_parm.set(new_path)
-        output_parm.lock(True)
+        self._set_parm(output_parm, new_path, lock=True)
 
     def _validate_input(self, input_value):
         """
@@ -407,7 +436,7 @@ class ExportNodeHandler(HookBaseClass):
         accordingly.
         """
         if self._validate_parm(kwargs["parm"]):
-            self._refresh_file_path(kwargs["node"])
+            self._schedule_refresh(kwargs["node"])
 
     #############################################################################################
     # Utilities
@@ -444,13 +473,13 @@ class ExportNodeHandler(HookBaseClass):
         :param dict fields: The template fields.
         """
         sgtk_element = node.parm(self.SGTK_ELEMENT)
-        sgtk_element.set(fields.get("name", ""))
+        self._set_parm(sgtk_element, fields.get("name", ""))
 
         sgtk_location = node.parm(self.SGTK_LOCATION)
-        sgtk_location.set(fields.get("location", ""))
+        self._set_parm(sgtk_location, fields.get("location", ""))
 
         sgtk_variation = node.parm(self.SGTK_VARIATION)
-        sgtk_variation.set(fields.get("variation", ""))
+        self._set_parm(sgtk_variation, fields.get("variation", ""))
 
     def _set_version(self, node, current_version):
         """
@@ -472,7 +501,7 @@ class ExportNodeHandler(HookBaseClass):
             index = entries.index(version_str)
         else:
             index = len(entries)
-        sgtk_version.set(index)
+        self._set_parm(sgtk_version, index)
 
     def _get_optional_fields(self, node, template):
         """
@@ -499,13 +528,17 @@ class ExportNodeHandler(HookBaseClass):
         """
         template = self._get_template_for_file_path(node, file_path)
         skip_keys = self.get_optional_keys(template)
-        fields = template.validate_and_get_fields(file_path, skip_keys=skip_keys)
+        fields = self.parent.get_template_fields(
+            template, file_path, skip_keys=skip_keys
+        )
         if fields:
             fields.update(self._get_optional_fields(node, template))
             if "SEQ" in fields:
                 fields["SEQ"] = "FORMAT: $F"
             current_version = fields.get("version", self.NEXT_VERSION_STR)
-            all_versions = self._resolve_all_versions_from_fields(fields, template)
+            all_versions = self._resolve_all_versions_from_fields(
+                fields, template, node=node
+            )
             self._populate_from_fields(node, fields)
             self._update_all_versions(node, all_versions)
             self._set_version(node, current_version)
@@ -543,9 +576,9 @@ class ExportNodeHandler(HookBaseClass):
         sequence_paths = []
         if "SEQ" in fields:
             fields["SEQ"] = "FORMAT: $F"
-            path = template.apply_fields(fields)
+            path = self._apply_fields(template, fields)
             glob_path = self._get_sequence_glob_path(path, template, fields)
-            sequence_paths = glob.glob(glob_path)
+            sequence_paths = self.parent.dir_listing_cache.glob(glob_path)
         return sequence_paths
 
     def _make_sgtk_compliant_path(self, path, template):
@@ -557,10 +590,10 @@ class ExportNodeHandler(HookBaseClass):
 
         :rtype: str
         """
-        fields = template.get_fields(path)
+        fields = self.parent.get_template_fields(template, path, strict=True)
         if "SEQ" in fields:
             fields["SEQ"] = "FORMAT: %d"
-        return template.apply_fields(fields)
+        return self._apply_fields(template, fields)
 
     def _get_output_path_and_templates_for_parm(
         self,
@@ -570,6 +603,7 @@ class ExportNodeHandler(HookBaseClass):
         publish_template,
         paths_and_templates,
         is_deep=False,
+        scan_disk=True,
     ):
         """
         Get the output path and the templates used for the given parm.
@@ -581,12 +615,21 @@ class ExportNodeHandler(HookBaseClass):
         :param list paths_and_templates: The current list of paths and templates
             to append to.
         :param bool is_deep: Is the parm a deep output or not.
+        :param bool scan_disk: Whether to look for the sequence paths and last
+            rendered version on disk, otherwise only the parm's path is used.
         """
         parm = node.parm(parm_name)
         path = parm.evalAsString()
 
         item = {"work_template": work_template, "publish_template": publish_template}
-        fields = work_template.get_fields(path)
+        if not scan_disk:
+            item["path"] = self._make_sgtk_compliant_path(path, work_template)
+            if is_deep:
+                item["is_deep"] = True
+            paths_and_templates.append(item)
+            return
+
+        fields = self.parent.get_template_fields(work_template, path, strict=True)
 
         sequence_paths = self._get_sequence_paths(path, work_template, fields)
         if sequence_paths:
@@ -600,7 +643,7 @@ class ExportNodeHandler(HookBaseClass):
                 # no versions so nothing's been rendered
                 return
             fields["version"] = max(all_versions)
-            path = work_template.apply_fields(fields)
+            path = self._apply_fields(work_template, fields)
             sequence_paths = self._get_sequence_paths(path, work_template, fields)
             if sequence_paths:
                 item["sequence_paths"] = sequence_paths
@@ -611,7 +654,7 @@ class ExportNodeHandler(HookBaseClass):
             item["is_deep"] = True
         paths_and_templates.append(item)
 
-    def _get_output_paths_and_templates(self, node):
+    def _get_output_paths_and_templates(self, node, scan_disk=True):
         """
         Go through the node's specified parameters and get the output paths,
         work and publish templates.
@@ -626,6 +669,8 @@ class ExportNodeHandler(HookBaseClass):
         - whether the output is a deep image
 
         :param node: A :class:`hou.Node` instance.
+        :param bool scan_disk: Whether to look for the outputs on disk, see
+            :meth:`_get_output_path_and_templates_for_parm`.
 
         :rtype: list(dict)
         """
@@ -634,23 +679,30 @@ class ExportNodeHandler(HookBaseClass):
         work_template = self.get_work_template(node)
         publish_template = self.get_publish_template(node)
         self._get_output_path_and_templates_for_parm(
-            node, self.OUTPUT_PARM, work_template, publish_template, paths_and_templates
+            node,
+            self.OUTPUT_PARM,
+            work_template,
+            publish_template,
+            paths_and_templates,
+            scan_disk=scan_disk,
         )
 
         return paths_and_templates
 
-    def get_output_paths_and_templates(self, node):
+    def get_output_paths_and_templates(self, node, scan_disk=True):
         """
         Go through the node's specified parameters and get the output paths,
         work and publish templates.
 
 
         :param node: A :class:`hou.Node` instance.
+        :param bool scan_disk: Whether to look for the outputs on disk, see
+            :meth:`_get_output_path_and_templates_for_parm`.
 
         :rtype: list(dict)
         """
         parm = node.parm(self.USE_SGTK)
         results = []
         if parm and parm.eval():
-            results = self._get_output_paths_and_templates(node)
+            results = self._get_output_paths_and_templates(node, scan_disk=scan_disk)
         return results
@@ -7,10 +7,10 @@ These include:
 - ``image_handler``
 
 """
-import datetime
-import glob
+import copy
 import itertools
 import json
+import logging
 import re
 
 import sgtk
@@ -90,7 +90,39 @@ class ImportNodeHandler(HookBaseClass):
     NO_PUBLISH = "No publish selected"
     NO_NODE = "No node selected"
     NO_FILE = "No file selected"
+    RESOLVING = "Resolving..."
     NOTHING_ON_DISK = "Nothing on disk"
+    FAILED_PUBLISH = "Failed to get publish entity"
+    UNRESOLVED_PATHS = (
+        NO_VERSIONS,
+        NO_PUBLISH,
+        NO_NODE,
+        NO_FILE,
+        RESOLVING,
+        NOTHING_ON_DISK,
+        FAILED_PUBLISH,
+    )
+
+    SHOTGUN_ENTITY_TYPES = ("PublishedFile",)
+
+    PUBLISH_FIELDS = ["id", "path", "version_number", "sg_status_list"]
+    PUBLISH_KEY_FIELDS = ("published_file_type", "entity", "project", "name")
+    BULK_QUERY_CHUNK_SIZE = 50
+    LATEST_PUBLISH_ORDER = [{"field_name": "version_number", "direction": "desc"}]
+
+    PUBLISH_DATA_SCHEMA = 2
+    PUBLISH_DATA_SCHEMA_KEY = "schema"
+    PUBLISH_DATA_LINK_FIELDS = ("published_file_type", "entity", "project")
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initialise the class.
+        """
+        super(ImportNodeHandler, self).__init__(*args, **kwargs)
+        # the versions written from the whole publish history of nodes, and the
+        # nodes it is being queried for, by node session id
+        self.__full_version_histories = {}
+        self.__pending_version_histories = set()
 
     @property
     def valid_file_types(self):
@@ -454,7 +486,7 @@ class ImportNodeHandler(HookBaseClass):
         output_parm = node.parm(self.INPUT_PARM)
         output_parm.lock(sgtk_enabled)
         if sgtk_enabled:
-            self._refresh_file_path(node)
+            self._schedule_refresh(node)
 
     def enable_sgtk(self, kwargs):
         """
@@ -507,42 +539,82 @@ class ImportNodeHandler(HookBaseClass):
 
         return resolved
 
-    def _refresh_file_path_from_publish_data(self, node, publish_data):
+    @HookBaseClass.batched_parm_writes
+    def _refresh_file_path_from_publish_data(
+        self, node, publish_data, rows=None, store_resolved_version=False, lazy=True
+    ):
         """
         Refresh the file path from the given publish data.
 
+        If the engine has a :attr:`HoudiniEngine.publish_resolver` and the rows
+        need querying, the query runs on a worker thread and the file path is
+        refreshed once it completes.
+
         :param node: A :class:`hou.Node` instance.
         :param dict publish_data: The publush data to populate from.
+        :param list(dict) rows: Already queried ``PublishedFile`` rows for the
+            publish data, see :meth:`_find_publishes`. Queried if not given.
+        :param bool store_resolved_version: Whether to write the resolved
+            version back to the publish data parm.
+        :param bool lazy: Whether only the latest row may be queried for nodes
+            using a version policy, see :meth:`_get_lazy_version_policy`.
         """
-        if self._validate_publish_data(publish_data):
+        valid_publish_data = self._validate_publish_data(publish_data)
+        version_policy = self._get_lazy_version_policy(node) if lazy else None
+        publish_resolver = self.parent.publish_resolver
+        if publish_resolver is not None:
+            if valid_publish_data and rows is None:
+                self._resolve_publish_data_async(
+                    node, publish_data, store_resolved_version, version_policy
+                )
+                return
+            publish_resolver.cancel(node.sessionId())
+
+        if valid_publish_data:
             name = publish_data.get("name") or publish_data.get("code", "")
             sgtk_name = node.parm(self.SGTK_NAME)
-            sgtk_name.set(name)
+            self._set_parm(sgtk_name, name)
 
-            all_versions_and_statuses = self._resolve_all_versions_statuses(
-                publish_data
-            )
-            sgtk_all_versions = node.parm(self.SGTK_ALL_VERSIONS)
-            sgtk_all_versions.set(json.dumps(all_versions_and_statuses))
+            if rows is None:
+                rows = self._find_publishes_for_policy(
+                    publish_data, self.parent.resolution_manifest, version_policy
+                )
+            all_versions_and_statuses = self._extract_versions_and_statuses(rows)
 
+            # the menu stores the index of the selected item, which must be
+            # corrected if the versions listed before it change
             sgtk_version = node.parm(self.SGTK_VERSION)
-            current = sgtk_version.evalAsString()
+            current = self._get_version_token(node)
+            self._dump_json_parm(
+                node, self.SGTK_ALL_VERSIONS, all_versions_and_statuses
+            )
+            tokens = list(map(str, self._extract_versions(all_versions_and_statuses)))
+            tokens.extend(self.VERSION_POLICIES)
+            if current in tokens:
+                self._set_parm(sgtk_version, tokens.index(current))
+
             resolved_version = self._resolve_version(all_versions_and_statuses, current)
 
             sgtk_resolved_version = node.parm(self.SGTK_RESOLVED_VERSION)
-            sgtk_resolved_version.set(str(resolved_version))
-
-            sg = self.parent.shotgun
-            filters = self._get_search_filters_from_publish_data(publish_data)
-            filters.append(["version_number", "is", resolved_version])
-            result = sg.find_one("PublishedFile", filters, ["id", "path"]) or {}
+            self._set_parm(sgtk_resolved_version, str(resolved_version))
+            if store_resolved_version:
+                publish_data["version_number"] = resolved_version
+                self._update_publish_data_parm(
+                    node, publish_data, publish_data.get("version_policy")
+                )
+
+            result = {}
+            for row in rows:
+                if row["version_number"] == resolved_version:
+                    result = row
+                    break
 
             id_ = str(result.get("id", ""))
             sgtk_id = node.parm(self.SGTK_ID)
-            sgtk_id.set(id_)
+            self._set_parm(sgtk_id, id_)
 
             if not result:
-                path = "Failed to get publish entity"
+                path = self.FAILED_PUBLISH
             else:
                 path = self._get_path_from_sg_data(result)
                 path = self._convert_path_to_houdini_seq(path)
@@ -550,9 +622,56 @@ class ImportNodeHandler(HookBaseClass):
             path = self.NO_PUBLISH
 
         input_parm = node.parm(self.INPUT_PARM)
-        input_parm.lock(False)
-        input_parm.set(path)
-        input_parm.lock(True)
+        self._set_parm(input_parm, path, lock=True)
+
+    def _resolve_publish_data_async(
+        self, node, publish_data, store_resolved_version, version_policy=None
+    ):
+        """
+        Query the ``PublishedFile`` rows of the publish data on a worker thread,
+        showing a placeholder file path until the node is refreshed from them.
+
+        Results are discarded if the node is refreshed again in the meantime.
+
+        The worker only works from the given publish data and the resolution manifest
+        looked up beforehand, ``hou`` is only used from the main thread.
+
+        :param node: A :class:`hou.Node` instance.
+        :param dict publish_data: The publush data to populate from.
+        :param bool store_resolved_version: Whether to write the resolved
+            version back to the publish data parm.
+        :param str version_policy: The version policy to only query the latest
+            row for, see :meth:`_find_publishes_for_policy`.
+        """
+        session_id = node.sessionId()
+
+        def on_resolved(rows):
+            resolved_node = hou.nodeBySessionId(session_id)
+            if resolved_node is not None:
+                self._refresh_file_path_from_publish_data(
+                    resolved_node,
+                    publish_data,
+                    rows=rows,
+                    store_resolved_version=store_resolved_version,
+                )
+
+        def on_error(error):
+            self.parent.logger.error("Failed to resolve publish: %s", error)
+            resolved_node = hou.nodeBySessionId(session_id)
+            if resolved_node is not None:
+                input_parm = resolved_node.parm(self.INPUT_PARM)
+                self._set_parm(input_parm, self.FAILED_PUBLISH, lock=True)
+
+        input_parm = node.parm(self.INPUT_PARM)
+        self._set_parm(input_parm, self.RESOLVING, lock=True)
+
+        self.parent.publish_resolver.submit(
+            session_id,
+            self._find_publishes_for_policy,
+            args=(publish_data, self.parent.resolution_manifest, version_policy),
+            callback=on_resolved,
+            errback=on_error,
+        )
 
     def _convert_path_to_houdini_seq(self, path):
         """
@@ -582,29 +701,218 @@ class ImportNodeHandler(HookBaseClass):
             r"\.(?P<symbols>[@#]+)\.|\.([%0$F]{2}(?P<padding>[0-9])d?)\.", repl, path
         )
 
+    def on_loaded(self, node=None):
+        """
+        Method to run on houdini's OnLoaded callback.
+
+        Publish data stored by older versions of the engine is shrunk first,
+        see :meth:`_upgrade_publish_data`.
+
+        :param node: A :class:`hou.Node` instance.
+        """
+        if not self.parent.frozen_paths:
+            self._upgrade_publish_data(node)
+        super(ImportNodeHandler, self).on_loaded(node=node)
+
+    def get_manifest_entry(self, node):
+        """
+        Get the entry of the node in the resolution manifest, recording the
+        ``PublishedFile`` it was resolved to, see :meth:`_find_publishes`.
+
+        :param node: A :class:`hou.Node` instance.
+
+        :rtype: dict
+        """
+        entry = super(ImportNodeHandler, self).get_manifest_entry(node)
+        entry["inputs"] = self.get_input_paths(node)
+        if self._path_selection(node) != self.PUBLISH:
+            return entry
+        publish_data = self._retrieve_publish_data(node)
+        sgtk_id = node.parm(self.SGTK_ID).evalAsString()
+        resolved = isinstance(publish_data, dict) and sgtk_id.isdigit()
+        if not resolved or self.get_unresolved_paths(node):
+            return entry
+        version = int(node.parm(self.SGTK_RESOLVED_VERSION).evalAsString())
+        status = None
+        for item in self._get_all_versions_and_statuses(node):
+            if item["version"] == version:
+                status = item["status"]
+        path = node.parm(self.INPUT_PARM).unexpandedString()
+        entry["publish"] = {
+            "key": self._get_publish_key(publish_data),
+            "id": int(sgtk_id),
+            "version_number": version,
+            "sg_status_list": status,
+            "path": {"link_type": "local", "local_path": path},
+        }
+        return entry
+
+    def get_unresolved_paths(self, node):
+        """
+        Get the names of the node's file path parms that haven't been resolved.
+
+        :param node: A :class:`hou.Node` instance.
+
+        :rtype: list(str)
+        """
+        input_parm = node.parm(self.INPUT_PARM)
+        path = input_parm.unexpandedString()
+        if not path or path in self.UNRESOLVED_PATHS:
+            return [self.INPUT_PARM]
+        return []
+
+    @HookBaseClass.batched_parm_writes
     def _refresh_file_path(self, node):
         """
         Refresh the file paths generated by the node handler.
 
         :param node: A :class:`hou.Node` instance.
         """
+        publish_resolver = self.parent.publish_resolver
+        if publish_resolver is not None:
+            publish_resolver.cancel(node.sessionId())
+
         selection = self._path_selection(node)
         if selection == self.PUBLISH:
             sgtk_publish_data = node.parm(self.SGTK_PUBLISH_DATA)
-            publish_data_str = sgtk_publish_data.evalAsString()
-            if publish_data_str:
-                publish_data = json.loads(self._escape_publish_data(publish_data_str))
+            if sgtk_publish_data.evalAsString():
+                publish_data = self._load_json_parm(
+                    node, self.SGTK_PUBLISH_DATA, escape=True
+                )
                 self._refresh_file_path_from_publish_data(node, publish_data)
             else:
                 input_parm = node.parm(self.INPUT_PARM)
-                input_parm.lock(False)
-                input_parm.set(self.NO_PUBLISH)
-                input_parm.lock(True)
+                self._set_parm(input_parm, self.NO_PUBLISH, lock=True)
         elif selection == self.WORK:
             self._refresh_file_path_from_node(node)
         else:
             self._refresh_file_path_from_path(node)
 
+    def refresh_file_paths(self, nodes):
+        """
+        Refresh the file paths generated by the node handler for many nodes at once.
+
+        The publishes of all the nodes on the ``Publish`` tab are resolved in bulk
+        rather than querying Shotgun once or twice per node.
+
+        :param list nodes: :class:`hou.Node` instances handled by this node handler.
+        """
+        publish_nodes = []
+        other_nodes = []
+        for node in nodes:
+            if self._path_selection(node) == self.PUBLISH:
+                publish_data = self._retrieve_publish_data(node)
+                is_dict = isinstance(publish_data, dict)
+                if is_dict and self._validate_publish_data(publish_data):
+                    publish_nodes.append((node, publish_data))
+                    continue
+            other_nodes.append(node)
+
+        # nodes using a version policy only need their latest row
+        lazy_nodes = []
+        full_nodes = []
+        for node, publish_data in publish_nodes:
+            version_policy = self._get_lazy_version_policy(node)
+            if version_policy:
+                lazy_nodes.append((node, publish_data, version_policy))
+            else:
+                full_nodes.append((node, publish_data))
+
+        latest_rows_by_key = self._find_latest_publishes_in_bulk(
+            [
+                (publish_data, version_policy == self.LATEST_COMPLETE_POLICY)
+                for _, publish_data, version_policy in lazy_nodes
+            ]
+        )
+        for node, publish_data, version_policy in lazy_nodes:
+            complete = version_policy == self.LATEST_COMPLETE_POLICY
+            rows = latest_rows_by_key[(self._get_publish_key(publish_data), complete)]
+            self._refresh_file_path_from_publish_data(node, publish_data, rows=rows)
+
+        rows_by_key = self._find_publishes_in_bulk(
+            [publish_data for _, publish_data in full_nodes]
+        )
+        for node, publish_data in full_nodes:
+            rows = rows_by_key[self._get_publish_key(publish_data)]
+            self._refresh_file_path_from_publish_data(node, publish_data, rows=rows)
+
+        super(ImportNodeHandler, self).refresh_file_paths(other_nodes)
+
+    @classmethod
+    def _slim_publish_data(cls, publish_data):
+        """
+        Get the compact form of publish data stored on nodes, keeping only the
+        ids, name, type, version and version policy.
+
+        Links are reduced to their type and id, which is all that is needed to
+        query the publish history, see :meth:`_get_search_filters_from_publish_data`.
+        Empty links are kept as they are, e.g. the ``None`` entity of project
+        publishes.
+
+        :param publish_data: The publish data, or list of publish data.
+        :type publish_data: dict or list(dict)
+
+        :rtype: dict or list(dict)
+        """
+        if isinstance(publish_data, list):
+            return [cls._slim_publish_data(item) for item in publish_data]
+        if not publish_data:
+            return publish_data
+        slim = {cls.PUBLISH_DATA_SCHEMA_KEY: cls.PUBLISH_DATA_SCHEMA}
+        for field in ("id", "type", "version_number", "version_policy"):
+            if field in publish_data:
+                slim[field] = publish_data[field]
+        name = publish_data.get("name") or publish_data.get("code")
+        if name is not None:
+            slim["name"] = name
+        for field in cls.PUBLISH_DATA_LINK_FIELDS:
+            if field not in publish_data:
+                continue
+            link = publish_data[field]
+            if link:
+                link = {"type": link.get("type"), "id": link.get("id")}
+            slim[field] = link
+        return slim
+
+    @classmethod
+    def _is_slim_publish_data(cls, publish_data):
+        """
+        Whether the publish data is in the compact form stored on nodes, see
+        :meth:`_slim_publish_data`.
+
+        :param publish_data: The publish data, or list of publish data.
+        :type publish_data: dict or list(dict)
+
+        :rtype: bool
+        """
+        if isinstance(publish_data, list):
+            return all(cls._is_slim_publish_data(item) for item in publish_data)
+        if not publish_data:
+            return True
+        schema = publish_data.get(cls.PUBLISH_DATA_SCHEMA_KEY)
+        return schema == cls.PUBLISH_DATA_SCHEMA
+
+    def _upgrade_publish_data(self, node):
+        """
+        Shrink publish data stored by older versions of the engine, which
+        stored the whole ``PublishedFile`` record, see :meth:`_slim_publish_data`.
+
+        :param node: A :class:`hou.Node` instance.
+
+        :returns: Whether the publish data was upgraded.
+        :rtype: bool
+        """
+        parm = node.parm(self.SGTK_PUBLISH_DATA)
+        if not parm or not parm.evalAsString():
+            return False
+        publish_data = self._retrieve_publish_data(node)
+        if self._is_slim_publish_data(publish_data):
+            return False
+        self._dump_json_parm(
+            node, self.SGTK_PUBLISH_DATA, self._slim_publish_data(publish_data)
+        )
+        return True
+
     @staticmethod
     def _escape_publish_data(publish_data_str):
         """
@@ -619,6 +927,50 @@ class ImportNodeHandler(HookBaseClass):
         except UnicodeDecodeError:
             return publish_data_str.encode("string_escape")
 
+    def _load_json_parm(
+        self, node, parm_name, default="{}", escape=False, mutable=False
+    ):
+        """
+        Load the JSON value stored in the given parm.
+
+        Decoded values are cached on the engine by node and parm, so they are
+        only decoded again when the parm's value changes.
+
+        :param node: A :class:`hou.Node` instance.
+        :param str parm_name: The name of the parm storing the JSON value.
+        :param str default: The JSON value to use if the parm is empty.
+        :param bool escape: Whether to escape the value first, see
+            :meth:`_escape_publish_data`.
+        :param bool mutable: Whether to return a copy that can be modified.
+            Otherwise the cached value is returned and must be left untouched.
+
+        :returns: The decoded value.
+        """
+        raw = node.parm(parm_name).evalAsString() or default
+        key = (node.sessionId(), parm_name)
+        json_parm_cache = self.parent.json_parm_cache
+        cached = json_parm_cache.get(key)
+        if cached is not None and cached[0] == raw:
+            value = cached[1]
+        else:
+            value = json.loads(self._escape_publish_data(raw) if escape else raw)
+            json_parm_cache.set(key, (raw, value))
+        return copy.deepcopy(value) if mutable else value
+
+    @staticmethod
+    def _dump_json_parm(node, parm_name, value):
+        """
+        Store the value as JSON in the given parm, unless already stored.
+
+        :param node: A :class:`hou.Node` instance.
+        :param str parm_name: The name of the parm to store the JSON value in.
+        :param value: The value to store.
+        """
+        parm = node.parm(parm_name)
+        encoded = json.dumps(value)
+        if parm.unexpandedString() != encoded:
+            parm.set(encoded)
+
     @staticmethod
     def _get_path_from_sg_data(data):
         """
@@ -667,36 +1019,440 @@ class ImportNodeHandler(HookBaseClass):
             ["name", "is", name],
         ]
 
-    def _resolve_all_versions_statuses(self, publish_data):
+    @staticmethod
+    def _get_publish_key(publish_data):
         """
-        Get all the available versions and their pipeline statuses from the given
-        entity publish data.
+        Get a hashable key identifying the search filters of the publish data.
+
+        Publish data and ``PublishedFile`` rows sharing a key belong to the same
+        publish history i.e. they only differ by version.
+
+        :param dict publish_data: The publish data or ``PublishedFile`` row.
+
+        :rtype: tuple
+        """
+
+        def link_key(link):
+            link = link or {}
+            return link.get("type"), link.get("id")
+
+        name = publish_data.get("name") or publish_data.get("code", "")
+        return (
+            link_key(publish_data.get("published_file_type")),
+            link_key(publish_data.get("entity")),
+            link_key(publish_data.get("project")),
+            name,
+        )
+
+    def _find_publishes(self, publish_data, manifest):
+        """
+        Query all the ``PublishedFile`` rows (every version) relating to the
+        given publish data.
+
+        Rows are cached on the engine, see :attr:`HoudiniEngine.publish_cache`.
+        Only cached rows are returned when the engine's
+        :attr:`HoudiniEngine.frozen_paths` are enabled.
+
+        Safe to call from a worker thread, the manifest must be looked up on
+        the main thread as it depends on the current hip file.
 
         :param dict publish_data: The publish data to use for the query.
+        :param manifest: The engine's :attr:`HoudiniEngine.resolution_manifest`
+            to resolve from first, if any.
+
+        :returns: A list(:class:`dict`) of rows containing :attr:`PUBLISH_FIELDS`.
+        """
+        key = self._get_publish_key(publish_data)
+        if manifest is not None:
+            rows = manifest.find_publishes(key)
+            if rows:
+                return rows
+        publish_cache = self.parent.publish_cache
+        rows = publish_cache.get(key)
+        if rows is None and self.parent.frozen_paths:
+            self.parent.logger.debug("Not querying Shotgun for frozen paths")
+            rows = []
+        elif rows is None:
+            filters = self._get_search_filters_from_publish_data(publish_data)
+            sg = self.parent.cached_shotgun
+            rows = sg.find("PublishedFile", filters, self.PUBLISH_FIELDS)
+            publish_cache.set(key, rows)
+        return list(rows)
 
-        :returns: A list(:class:`dict`) of versions and relating statuses.
+    def _get_lazy_version_policy(self, node):
+        """
+        Get the version policy of the node if only the latest ``PublishedFile``
+        row is needed to resolve it, i.e. when the ``lazy_version_history``
+        setting is enabled and the node uses a version policy.
+
+        The whole history is only queried once the version menu is opened, see
+        :meth:`populate_versions`, or the versions are refreshed.
+
+        :param node: A :class:`hou.Node` instance.
+
+        :returns: The version policy or ``None``.
+        :rtype: str
+        """
+        if not self.parent.get_setting("lazy_version_history", False):
+            return None
+        version_policy = self._get_version_token(node)
+        if version_policy in self.VERSION_POLICIES:
+            return version_policy
+        return None
+
+    def _get_version_token(self, node):
+        """
+        Get the token of the selected version menu item from the versions
+        stored on the node, without evaluating the menu script.
+
+        :param node: A :class:`hou.Node` instance.
+
+        :returns: The selected version or version policy, or ``None`` if the
+            stored index is out of range.
+        :rtype: str
+        """
+        tokens = list(map(str, self._get_all_versions(node)))
+        tokens.extend(self.VERSION_POLICIES)
+        index = node.parm(self.SGTK_VERSION).evalAsInt()
+        if 0 <= index < len(tokens):
+            return tokens[index]
+        return None
+
+    def _find_publishes_for_policy(self, publish_data, manifest, version_policy=None):
+        """
+        Query the ``PublishedFile`` rows needed to resolve the version policy.
+
+        :param dict publish_data: The publish data to use for the query.
+        :param manifest: The resolution manifest, see :meth:`_find_publishes`.
+        :param str version_policy: The version policy, or ``None`` to query
+            every version, see :meth:`_find_publishes`.
+
+        :returns: A list(:class:`dict`) of rows containing :attr:`PUBLISH_FIELDS`.
+        """
+        if version_policy is None:
+            return self._find_publishes(publish_data, manifest)
+        complete = version_policy == self.LATEST_COMPLETE_POLICY
+        return self._find_latest_publish(publish_data, manifest, complete=complete)
+
+    def _find_latest_publish(self, publish_data, manifest, complete=False):
+        """
+        Query only the latest ``PublishedFile`` row relating to the given
+        publish data, skipping declined ones.
+
+        The whole history is used instead if it is already cached, see
+        :meth:`_find_publishes`, otherwise rows are cached on the engine
+        separately, see :attr:`HoudiniEngine.publish_cache`.
+
+        :param dict publish_data: The publish data to use for the query.
+        :param manifest: The resolution manifest, see :meth:`_find_publishes`.
+        :param bool complete: Whether to query the latest complete row, falling
+            back to the latest row if none is complete, as
+            :attr:`LATEST_COMPLETE_POLICY` is resolved by :meth:`_resolve_version`.
+
+        :returns: A list(:class:`dict`) of at most one row containing
+            :attr:`PUBLISH_FIELDS`.
+        """
+        key = self._get_publish_key(publish_data)
+        publish_cache = self.parent.publish_cache
+        if manifest is not None or key in publish_cache:
+            return self._find_publishes(publish_data, manifest)
+
+        latest_key = self._get_latest_publish_key(key, complete)
+        rows = publish_cache.get(latest_key)
+        if rows is None and self.parent.frozen_paths:
+            self.parent.logger.debug("Not querying Shotgun for frozen paths")
+            rows = []
+        elif rows is None:
+            sg = self.parent.cached_shotgun
+            row = None
+            for filters in self._get_latest_search_filters(publish_data, complete):
+                row = sg.find_one(
+                    "PublishedFile",
+                    filters,
+                    self.PUBLISH_FIELDS,
+                    order=self.LATEST_PUBLISH_ORDER,
+                )
+                if row is not None:
+                    break
+            rows = [row] if row else []
+            publish_cache.set(latest_key, rows)
+        return list(rows)
+
+    @staticmethod
+    def _get_latest_publish_key(key, complete=False):
+        """
+        Get the key the latest ``PublishedFile`` row of a publish history is
+        cached under, see :meth:`_find_latest_publish`.
+
+        :param tuple key: The :meth:`_get_publish_key` key of the history.
+        :param bool complete: Whether it is the latest complete row.
+
+        :rtype: tuple
+        """
+        return "latest", complete, key
+
+    def _get_latest_search_filters(self, publish_data, complete=False):
+        """
+        Get the search filters of the queries finding the latest ``PublishedFile``
+        row of the publish data, in the order they are tried, see
+        :meth:`_find_latest_publish`.
+
+        :param dict publish_data: The publish data to use for the query.
+        :param bool complete: Whether the latest complete row is wanted.
+
+        :rtype: list(list)
         """
-        valid_publish_data = self._validate_publish_data(publish_data)
-        if not valid_publish_data:
-            return []
         filters = self._get_search_filters_from_publish_data(publish_data)
-        sg = self.parent.shotgun
-        results = sg.find(
-            "PublishedFile", filters, ["version_number", "sg_status_list"]
+        filters.append(["sg_status_list", "is_not", "decl"])
+        if complete:
+            return [filters + [["sg_status_list", "is", "cmpt"]], filters]
+        return [filters]
+
+    def _find_latest_publishes_in_bulk(self, all_publish_data):
+        """
+        Query only the latest ``PublishedFile`` rows for many publish data at
+        once, like :meth:`_find_latest_publish` does for one.
+
+        Cached histories and rows are used as they are, the other publish data
+        are combined into as few queries as possible, see
+        :meth:`_query_publishes_in_bulk`, of which only the latest and latest
+        complete row of each is kept and cached.
+
+        :param list(tuple) all_publish_data: Tuples of the publish data to
+            query for and whether its latest complete row is wanted.
+
+        :returns: A :class:`dict` of tuples of the :meth:`_get_publish_key` key
+            and whether the latest complete row was wanted, to the rows found
+            for them, as returned by :meth:`_find_latest_publish`.
+        """
+        publish_cache = self.parent.publish_cache
+        manifest = self.parent.resolution_manifest
+        rows_by_key = {}
+        filters_by_key = {}
+        for publish_data, complete in all_publish_data:
+            key = self._get_publish_key(publish_data)
+            if (key, complete) in rows_by_key or key in filters_by_key:
+                continue
+            rows = manifest.find_publishes(key) if manifest is not None else None
+            if not rows:
+                rows = publish_cache.get(key)
+            if rows is None:
+                rows = publish_cache.get(self._get_latest_publish_key(key, complete))
+            if rows is None and self.parent.frozen_paths:
+                rows = []
+            if rows is None:
+                filters_by_key[key] = self._get_search_filters_from_publish_data(
+                    publish_data
+                )
+            else:
+                rows_by_key[(key, complete)] = list(rows)
+
+        queried_rows_by_key = self._query_publishes_in_bulk(
+            filters_by_key, extra_filters=[["sg_status_list", "is_not", "decl"]]
         )
-        versions_and_statuses = []
+        for key, rows in queried_rows_by_key.items():
+            rows.sort(key=lambda row: row["version_number"], reverse=True)
+            latest = rows[:1]
+            latest_complete = [row for row in rows if row["sg_status_list"] == "cmpt"]
+            for complete, latest_rows in (
+                (False, latest),
+                (True, latest_complete[:1] or latest),
+            ):
+                latest_key = self._get_latest_publish_key(key, complete)
+                publish_cache.set(latest_key, latest_rows)
+                rows_by_key[(key, complete)] = list(latest_rows)
+        return rows_by_key
+
+    def populate_versions(self, kwargs):
+        """
+        Callback to get the versions in a format to populate the "sgtk_all_versions"
+        parameter on the node.
+
+        The whole history of nodes resolved from their latest row only, see
+        :meth:`_get_lazy_version_policy`, is queried when the menu is first
+        opened, on a worker thread if the engine has a
+        :attr:`HoudiniEngine.publish_resolver`, otherwise once Houdini is idle.
+        The menu lists the versions stored on the node until it is written to
+        it, and it isn't queried again unless the stored versions change.
+
+        :return: list(str), for example '["1", "1", "2", "2", "3", "3"]'
+        """
+        node = kwargs["node"]
+        manifest = self.parent.resolution_manifest
+        if (
+            self.parent.frozen_paths
+            or manifest is not None
+            or not self._get_lazy_version_policy(node)
+            or self._path_selection(node) != self.PUBLISH
+        ):
+            return super(ImportNodeHandler, self).populate_versions(kwargs)
+        session_id = node.sessionId()
+        all_versions = node.parm(self.SGTK_ALL_VERSIONS).evalAsString()
+        publish_resolver = self.parent.publish_resolver
+        if (
+            self.__full_version_histories.get(session_id) == all_versions
+            or session_id in self.__pending_version_histories
+            or (publish_resolver and publish_resolver.is_pending(session_id))
+        ):
+            return super(ImportNodeHandler, self).populate_versions(kwargs)
+        publish_data = self._load_json_parm(node, self.SGTK_PUBLISH_DATA, escape=True)
+        is_dict = isinstance(publish_data, dict)
+        if not is_dict or not self._validate_publish_data(publish_data):
+            return super(ImportNodeHandler, self).populate_versions(kwargs)
+
+        def write_versions(rows):
+            self.__pending_version_histories.discard(session_id)
+            written_node = hou.nodeBySessionId(session_id)
+            if written_node is None:
+                return
+            # the node may have been populated from another publish since
+            written_publish_data = self._retrieve_publish_data(written_node)
+            if not isinstance(written_publish_data, dict) or self._get_publish_key(
+                written_publish_data
+            ) != self._get_publish_key(publish_data):
+                return
+            self._refresh_file_path_from_publish_data(
+                written_node, written_publish_data, rows=rows
+            )
+            written_versions = written_node.parm(self.SGTK_ALL_VERSIONS)
+            self.__full_version_histories[session_id] = written_versions.evalAsString()
+
+        def on_error(error):
+            self.__pending_version_histories.discard(session_id)
+            self.parent.logger.error("Failed to query versions: %s", error)
+
+        # Shotgun isn't queried and parms aren't written while the menu is
+        # being generated
+        if publish_resolver is None:
+            self.__pending_version_histories.add(session_id)
+            self.parent.async_execute_in_main_thread(
+                lambda: write_versions(self._find_publishes(publish_data, manifest))
+            )
+        else:
+            publish_resolver.submit(
+                session_id,
+                self._find_publishes,
+                args=(publish_data, manifest),
+                callback=write_versions,
+                errback=on_error,
+            )
+        return super(ImportNodeHandler, self).populate_versions(kwargs)
+
+    def _find_publishes_in_bulk(self, all_publish_data):
+        """
+        Query the ``PublishedFile`` rows for many publish data at once.
+
+        Publish data sharing the same search filters are only queried once,
+        cached ones are not queried at all and the remaining filters are combined
+        into as few queries as possible, see :attr:`BULK_QUERY_CHUNK_SIZE`.
 
-        for result in sorted(results, key=lambda item: item["version_number"]):
-            if result["sg_status_list"] == "decl":
+        Like :meth:`_find_publishes`, Shotgun isn't queried when the engine's
+        :attr:`HoudiniEngine.frozen_paths` are enabled.
+
+        :param list(dict) all_publish_data: The publish data to query for.
+
+        :returns: A :class:`dict` of :meth:`_get_publish_key` keys to the rows
+            found for them, as returned by :meth:`_find_publishes`.
+        """
+        publish_cache = self.parent.publish_cache
+        manifest = self.parent.resolution_manifest
+        rows_by_key = {}
+        filters_by_key = {}
+        for publish_data in all_publish_data:
+            key = self._get_publish_key(publish_data)
+            if key in rows_by_key or key in filters_by_key:
                 continue
-            versions_and_statuses.append(
+            rows = manifest.find_publishes(key) if manifest is not None else None
+            if rows:
+                rows_by_key[key] = rows
+                continue
+            rows = publish_cache.get(key)
+            if rows is None and self.parent.frozen_paths:
+                rows_by_key[key] = []
+            elif rows is None:
+                filters = self._get_search_filters_from_publish_data(publish_data)
+                filters_by_key[key] = filters
+            else:
+                rows_by_key[key] = list(rows)
+
+        queried_rows_by_key = self._query_publishes_in_bulk(filters_by_key)
+        for key, rows in queried_rows_by_key.items():
+            publish_cache.set(key, rows)
+            rows_by_key[key] = list(rows)
+        return rows_by_key
+
+    def _query_publishes_in_bulk(self, filters_by_key, extra_filters=None):
+        """
+        Query the ``PublishedFile`` rows matching any of the given search
+        filters, combined into as few queries as possible, see
+        :attr:`BULK_QUERY_CHUNK_SIZE`.
+
+        :param dict filters_by_key: The search filters, by :meth:`_get_publish_key`
+            key.
+        :param list extra_filters: Search filters every row must also match.
+
+        :returns: A :class:`dict` of the keys to the rows found for them.
+        """
+        queried_rows_by_key = {key: [] for key in filters_by_key}
+        keys = list(filters_by_key)
+        fields = self.PUBLISH_FIELDS + list(self.PUBLISH_KEY_FIELDS)
+        sg = self.parent.cached_shotgun
+        for start in range(0, len(keys), self.BULK_QUERY_CHUNK_SIZE):
+            chunk = keys[start : start + self.BULK_QUERY_CHUNK_SIZE]
+            filters = [
                 {
-                    "version": result["version_number"],
-                    "status": result["sg_status_list"],
+                    "filter_operator": "any",
+                    "filters": [
+                        {"filter_operator": "all", "filters": filters_by_key[key]}
+                        for key in chunk
+                    ],
                 }
+            ]
+            filters.extend(extra_filters or [])
+            self.parent.logger.debug(
+                "Resolving %d publish(es) in a single query", len(chunk)
+            )
+            for row in sg.find("PublishedFile", filters, fields):
+                rows = queried_rows_by_key.get(self._get_publish_key(row))
+                if rows is not None:
+                    rows.append(row)
+        return queried_rows_by_key
+
+    @staticmethod
+    def _extract_versions_and_statuses(rows):
+        """
+        Extract the sorted versions and their pipeline statuses from the given
+        ``PublishedFile`` rows, skipping any declined ones.
+
+        :param list(dict) rows: Rows as returned by :meth:`_find_publishes`.
+
+        :returns: A list(:class:`dict`) of versions and relating statuses.
+        """
+        versions_and_statuses = []
+        for row in sorted(rows, key=lambda item: item["version_number"]):
+            if row["sg_status_list"] == "decl":
+                continue
+            versions_and_statuses.append(
+                {"version": row["version_number"], "status": row["sg_status_list"]}
             )
         return versions_and_statuses
 
+    def _resolve_all_versions_statuses(self, publish_data):
+        """
+        Get all the available versions and their pipeline statuses from the given
+        entity publish data.
+
+        :param dict publish_data: The publish data to use for the query.
+
+        :returns: A list(:class:`dict`) of versions and relating statuses.
+        """
+        valid_publish_data = self._validate_publish_data(publish_data)
+        if not valid_publish_data:
+            return []
+        return self._extract_versions_and_statuses(
+            self._find_publishes(publish_data, self.parent.resolution_manifest)
+        )
+
     def _update_publish_data_parm(self, node, publish_data, version_policy):
         """
         Update the publish data parm on the node with the publish data and
@@ -708,26 +1464,25 @@ class ImportNodeHandler(HookBaseClass):
         """
         self.parent.logger.debug("VERSION_POLICY: %s", version_policy)
         publish_data["version_policy"] = version_policy
-        for key, val in publish_data.items():
-            # get rid of datetimes, they don't like to serialize and we don't need 'em
-            if isinstance(val, datetime.datetime):
-                publish_data.pop(key)
-
-        sgtk_publish_data = node.parm(self.SGTK_PUBLISH_DATA)
-        sgtk_publish_data.set(json.dumps(publish_data))
+        self._dump_json_parm(
+            node, self.SGTK_PUBLISH_DATA, self._slim_publish_data(publish_data)
+        )
 
     def _update_version_from_publish_data(self, node, publish_data, version_policy):
         """
         Update the version parameter from the given publish data and version policy.
 
+        The versions are stored along with it, as the selected version is read
+        back from them, see :meth:`_get_version_token`.
+
         :param node: A :class:`hou.Node` instance.
         :param dict publish_data: The publish data.
         :param str version_policy: The version policy.
         """
         sgtk_version = node.parm(self.SGTK_VERSION)
-        all_versions = self._extract_versions(
-            self._resolve_all_versions_statuses(publish_data)
-        )
+        all_versions_and_statuses = self._resolve_all_versions_statuses(publish_data)
+        self._dump_json_parm(node, self.SGTK_ALL_VERSIONS, all_versions_and_statuses)
+        all_versions = self._extract_versions(all_versions_and_statuses)
         menu_items = all_versions + self.VERSION_POLICIES
         self.parent.logger.debug("MENU_ITEMS: %r", menu_items)
         if version_policy in self.VERSION_POLICIES:
@@ -787,10 +1542,7 @@ class ImportNodeHandler(HookBaseClass):
         self._load_from_shotgun(node)
 
     def _get_all_versions_and_statuses(self, node):
-        sgtk_all_versions = node.parm(self.SGTK_ALL_VERSIONS)
-        all_versions_json = sgtk_all_versions.evalAsString() or "[]"
-        all_versions_and_statuses = json.loads(all_versions_json)
-        return all_versions_and_statuses
+        return self._load_json_parm(node, self.SGTK_ALL_VERSIONS, default="[]")
 
     @staticmethod
     def _extract_versions(versions_and_statuses):
@@ -821,13 +1573,54 @@ class ImportNodeHandler(HookBaseClass):
 
         :rtype: dict
         """
-        sgtk_publish_data = node.parm(self.SGTK_PUBLISH_DATA)
         default = "[]" if self.ACCEPTS_MULTI_SELECTION else "{}"
-        publish_data_str = sgtk_publish_data.evalAsString() or default
-        publish_data = json.loads(self._escape_publish_data(publish_data_str))
-        self.parent.logger.debug("PUBLISH_DATA: %s", json.dumps(publish_data, indent=4))
+        publish_data = self._load_json_parm(
+            node, self.SGTK_PUBLISH_DATA, default=default, escape=True, mutable=True
+        )
+        if self.parent.logger.isEnabledFor(logging.DEBUG):
+            self.parent.logger.debug(
+                "PUBLISH_DATA: %s", json.dumps(publish_data, indent=4)
+            )
         return publish_data
 
+    def _invalidate_cached_publishes(self, parm, publish_data):
+        """
+        Drop the cached ``PublishedFile`` rows of the publish data, its whole
+        history and latest rows, if the refresh versions button was pressed,
+        forcing them to be queried again.
+
+        All the ``PublishedFile`` queries cached on disk are dropped, as the
+        rows may also come from the queries resolving many nodes at once, see
+        :meth:`_query_publishes_in_bulk`.
+
+        :param parm: The :class:`hou.Parm` that triggered the callback, if any.
+        :param dict publish_data: The publish data of the node.
+        """
+        if parm is None or parm.name() != self.SGTK_REFRESH_VERSIONS:
+            return
+        if isinstance(publish_data, dict) and publish_data:
+            key = self._get_publish_key(publish_data)
+            publish_cache = self.parent.publish_cache
+            publish_cache.invalidate(key)
+            for complete in (False, True):
+                publish_cache.invalidate(self._get_latest_publish_key(key, complete))
+            self.parent.invalidate_shotgun_queries("PublishedFile")
+            if self._validate_publish_data(publish_data):
+                filters = self._get_search_filters_from_publish_data(publish_data)
+                self.parent.invalidate_shotgun_query(
+                    "find", "PublishedFile", filters, self.PUBLISH_FIELDS
+                )
+                for latest_filters in self._get_latest_search_filters(
+                    publish_data, complete=True
+                ):
+                    self.parent.invalidate_shotgun_query(
+                        "find_one",
+                        "PublishedFile",
+                        latest_filters,
+                        self.PUBLISH_FIELDS,
+                        order=self.LATEST_PUBLISH_ORDER,
+                    )
+
     @HookBaseClass.restore_version_menu_index
     def refresh_file_path_from_version(self, kwargs):
         """
@@ -836,16 +1629,29 @@ class ImportNodeHandler(HookBaseClass):
         """
         node = kwargs["node"]
         publish_data = self._retrieve_publish_data(node)
+        self._invalidate_cached_publishes(kwargs.get("parm"), publish_data)
         sgtk_version = node.parm(self.SGTK_VERSION)
         version = sgtk_version.evalAsString()
         version_policy = version if version in self.VERSION_POLICIES else None
         self._update_publish_data_parm(node, publish_data, version_policy)
-        super(ImportNodeHandler, self).refresh_file_path_from_version(kwargs)
-        # now write the resolved version back to the publish data
-        sgtk_resolved_version = node.parm(self.SGTK_RESOLVED_VERSION)
-        resolved_version = sgtk_resolved_version.eval()
-        publish_data["version_number"] = int(resolved_version)
-        self._update_publish_data_parm(node, publish_data, version_policy)
+        if self._path_selection(node) == self.PUBLISH and publish_data:
+            # the resolved version is written back to the publish data once
+            # resolved, which may happen asynchronously. the whole history is
+            # queried when refreshing the versions.
+            parm = kwargs.get("parm")
+            refreshing = parm is not None and parm.name() == self.SGTK_REFRESH_VERSIONS
+            self._refresh_file_path_from_publish_data(
+                node, publish_data, store_resolved_version=True, lazy=not refreshing
+            )
+        else:
+            super(ImportNodeHandler, self).refresh_file_path_from_version(kwargs)
+            # the refresh is only scheduled, run it before reading the resolved
+            # version to write it back to the publish data
+            self.parent.flush_refreshes([node])
+            sgtk_resolved_version = node.parm(self.SGTK_RESOLVED_VERSION)
+            resolved_version = sgtk_resolved_version.eval()
+            publish_data["version_number"] = int(resolved_version)
+            self._update_publish_data_parm(node, publish_data, version_policy)
 
     #############################################################################################
     # Methods for populating from node
@@ -901,7 +1707,7 @@ class ImportNodeHandler(HookBaseClass):
                     except sgtk.TankError:
                         template = None
                 if template:
-                    fields = template.validate_and_get_fields(path)
+                    fields = self.parent.get_template_fields(template, path)
                     if fields:
                         if "SEQ" in fields:
                             fields["SEQ"] = "FORMAT: $F"
@@ -914,23 +1720,21 @@ class ImportNodeHandler(HookBaseClass):
                     )
         return template, fields, all_versions
 
+    @HookBaseClass.batched_parm_writes
     def _refresh_file_path_from_node(self, node):
         """
         Use another node to populate the file path on this node.
 
         :param node: A :class:`hou.Node` instance.
         """
-        work_file_parm = node.parm(self.SGTK_WORK_FILE_DATA)
-        work_file_data = json.loads(
-            work_file_parm.evalAsString() or self.DEFAULT_WORK_FILE_DATA
-        )
+        work_file_data = self._get_work_file_data(node, mutable=True)
         parent_parm = node.parm(self.SGTK_NODE_PARM)
         sgtk_resolved_version = node.parm(self.SGTK_WORK_RESOLVED_VERSION)
         node_path = work_file_data["node"]
         parent_node = node.node(node_path)
         if parent_node:
             parent_node_parm = node.parm(self.SGTK_NODE_NAME)
-            parent_node_parm.set(node_path)
+            self._set_parm(parent_node_parm, node_path)
 
             parm_name = work_file_data["parm"]
             all_parms = work_file_data["all_parms"]
@@ -938,7 +1742,7 @@ class ImportNodeHandler(HookBaseClass):
                 index = all_parms.index(parm_name)
             else:
                 index = 0
-            parent_parm.set(index)
+            self._set_parm(parent_parm, index)
 
             (
                 template,
@@ -946,36 +1750,64 @@ class ImportNodeHandler(HookBaseClass):
                 all_versions,
             ) = self._get_template_fields_and_work_versions(parent_node, parm_name)
             work_file_data["all_versions"] = all_versions
-            work_file_parm.set(json.dumps(work_file_data))
+            self._dump_json_parm(node, self.SGTK_WORK_FILE_DATA, work_file_data)
 
             version = work_file_data["current_version"]
             resolved_version = self._resolve_work_version(all_versions, version)
 
-            sgtk_resolved_version.set(str(resolved_version or self.NO_VERSIONS))
+            self._set_parm(
+                sgtk_resolved_version, str(resolved_version or self.NO_VERSIONS)
+            )
 
             path_parm = parent_node.parm(parm_name)
             orig_path = path_parm.unexpandedString()
             if resolved_version:
                 if template:
                     fields["version"] = resolved_version
-                    path = template.apply_fields(fields)
+                    path = self._apply_fields(template, fields)
                 else:
                     path = self._replace_version_in_path(orig_path, resolved_version)
             else:
                 path = self.NOTHING_ON_DISK
 
         else:
-            parent_parm.set(0)
+            self._set_parm(parent_parm, 0)
             sgtk_version = node.parm(self.SGTK_WORK_VERSION)
-            sgtk_version.set(0)
-            sgtk_resolved_version.set(self.NO_VERSIONS)
+            self._set_parm(sgtk_version, 0)
+            self._set_parm(sgtk_resolved_version, self.NO_VERSIONS)
             path = self.NO_NODE
 
-        work_file_parm.set(json.dumps(work_file_data))
+        self._dump_json_parm(node, self.SGTK_WORK_FILE_DATA, work_file_data)
         input_parm = node.parm(self.INPUT_PARM)
-        input_parm.lock(False)
-        input_parm.set(path)
-        input_parm.lock(True)
+        self._set_parm(input_parm, path, lock=True)
+
+    def _get_work_file_data(self, node, mutable=False):
+        """
+        Get the data stored for the node's Work tab.
+
+        :param node: A :class:`hou.Node` instance.
+        :param bool mutable: Whether to return a copy that can be modified.
+
+        :rtype: dict
+        """
+        return self._load_json_parm(
+            node,
+            self.SGTK_WORK_FILE_DATA,
+            default=self.DEFAULT_WORK_FILE_DATA,
+            mutable=mutable,
+        )
+
+    def _populate_node_parms_menu(self, node):
+        """
+        Get the parameter names in a format to populate the parameter name menu.
+
+        :param node: A :class:`hou.Node` instance.
+
+        :rtype: list(str)
+        """
+        work_file_data = self._get_work_file_data(node)
+        parms = work_file_data.get("all_parms", [])
+        return list(itertools.chain(*zip(parms, parms)))
 
     def populate_node_parms_menu(self, kwargs):
         """
@@ -984,12 +1816,12 @@ class ImportNodeHandler(HookBaseClass):
         :rtype: list(str)
         """
         node = kwargs["node"]
-        work_file_parm = node.parm(self.SGTK_WORK_FILE_DATA)
-        work_file_data = json.loads(
-            work_file_parm.evalAsString() or self.DEFAULT_WORK_FILE_DATA
+        return self._memoize_menu_items(
+            node,
+            self.SGTK_NODE_PARM,
+            self.SGTK_WORK_FILE_DATA,
+            self._populate_node_parms_menu,
         )
-        parms = work_file_data.get("all_parms", [])
-        return list(itertools.chain(*zip(parms, parms)))
 
     def _get_work_versions(self, node):
         """
@@ -999,13 +1831,22 @@ class ImportNodeHandler(HookBaseClass):
 
         :rtype: list(int)
         """
-        work_file_parm = node.parm(self.SGTK_WORK_FILE_DATA)
-        work_file_data = json.loads(
-            work_file_parm.evalAsString() or self.DEFAULT_WORK_FILE_DATA
-        )
+        work_file_data = self._get_work_file_data(node)
         all_versions = work_file_data.get("all_versions", [])
         return all_versions
 
+    def _populate_work_versions(self, node):
+        """
+        Get all the work versions and `<LATEST>` in a format to populate the
+        work versions menu.
+
+        :param node: A :class:`hou.Node` instance.
+
+        :rtype: list(str)
+        """
+        versions = list(map(str, self._get_work_versions(node))) + [self.LATEST_POLICY]
+        return list(itertools.chain(*zip(versions, versions)))
+
     def populate_work_versions(self, kwargs):
         """
         Populate the work versions menu with all available versions and `<LATEST>`.
@@ -1013,8 +1854,12 @@ class ImportNodeHandler(HookBaseClass):
         :rtype: list(str)
         """
         node = kwargs["node"]
-        versions = list(map(str, self._get_work_versions(node))) + [self.LATEST_POLICY]
-        return list(itertools.chain(*zip(versions, versions)))
+        return self._memoize_menu_items(
+            node,
+            self.SGTK_WORK_VERSION,
+            self.SGTK_WORK_FILE_DATA,
+            self._populate_work_versions,
+        )
 
     def _get_node_file_parms(self, parent_node):
         """
@@ -1041,10 +1886,7 @@ class ImportNodeHandler(HookBaseClass):
         node = kwargs["node"]
         parm = kwargs["parm"]
         parent_node = parm.evalAsNode()
-        work_file_parm = node.parm(self.SGTK_WORK_FILE_DATA)
-        work_file_data = json.loads(
-            work_file_parm.evalAsString() or self.DEFAULT_WORK_FILE_DATA
-        )
+        work_file_data = self._get_work_file_data(node, mutable=True)
         if parent_node:
             work_file_data["node"] = parm.evalAsString()
             path_parm = node.parm(self.SGTK_NODE_PARM)
@@ -1058,7 +1900,7 @@ class ImportNodeHandler(HookBaseClass):
                 index = parms.index(parm_name)
             work_file_data["parm"] = parm_name
             path_parm.set(index)
-        work_file_parm.set(json.dumps(work_file_data))
+        self._dump_json_parm(node, self.SGTK_WORK_FILE_DATA, work_file_data)
         self._refresh_file_path_from_node(node)
 
     def refresh_from_parm_selection(self, kwargs):
@@ -1067,10 +1909,7 @@ class ImportNodeHandler(HookBaseClass):
         """
         node = kwargs["node"]
         parm = kwargs["parm"]
-        work_file_parm = node.parm(self.SGTK_WORK_FILE_DATA)
-        work_file_data = json.loads(
-            work_file_parm.evalAsString() or self.DEFAULT_WORK_FILE_DATA
-        )
+        work_file_data = self._get_work_file_data(node, mutable=True)
         parent_node = node.node(work_file_data["node"])
         parm_name = parm.evalAsString()
         work_file_data["parm"] = parm_name
@@ -1079,7 +1918,7 @@ class ImportNodeHandler(HookBaseClass):
                 parent_node, parm_name
             )[2]
             work_file_data["all_versions"] = all_versions
-        work_file_parm.set(json.dumps(work_file_data))
+        self._dump_json_parm(node, self.SGTK_WORK_FILE_DATA, work_file_data)
         self._refresh_file_path_from_node(node)
 
     def refresh_from_work_version(self, kwargs):
@@ -1088,13 +1927,10 @@ class ImportNodeHandler(HookBaseClass):
         """
         node = kwargs["node"]
         parm = kwargs["parm"]
-        work_file_parm = node.parm(self.SGTK_WORK_FILE_DATA)
-        work_file_data = json.loads(
-            work_file_parm.evalAsString() or self.DEFAULT_WORK_FILE_DATA
-        )
+        work_file_data = self._get_work_file_data(node, mutable=True)
         version = parm.evalAsString()
         work_file_data["current_version"] = version
-        work_file_parm.set(json.dumps(work_file_data))
+        self._dump_json_parm(node, self.SGTK_WORK_FILE_DATA, work_file_data)
         self._refresh_file_path_from_node(node)
 
     @HookBaseClass.restore_version_menu_index(SGTK_WORK_VERSION)
@@ -1111,10 +1947,7 @@ class ImportNodeHandler(HookBaseClass):
 
         :param node: A :class:`hou.Node` instance.
         """
-        work_file_parm = node.parm(self.SGTK_WORK_FILE_DATA)
-        work_file_data = json.loads(
-            work_file_parm.evalAsString() or self.DEFAULT_WORK_FILE_DATA
-        )
+        work_file_data = self._get_work_file_data(node)
         node_parm = node.parm(self.SGTK_NODE_NAME)
         node_parm.set(work_file_data["node"])
 
@@ -1153,21 +1986,23 @@ class ImportNodeHandler(HookBaseClass):
 
         :rtype: list(int)
         """
-        unique_versions = set()
+        utils = self.parent.import_module("tk_houdini").utils
         expanded_path = hou.text.expandStringAtFrame(path, int(self.SEQUENCE_REGEX))
-        regex = r"{}|{}".format(self.WORK_VERSION_REGEX, self.SEQUENCE_REGEX)
-        glob_path = re.sub(regex, "*", expanded_path)
-        at_least_one_version = False
-        all_paths = glob.iglob(glob_path)
-        for current_path in all_paths:
-            at_least_one_version = True
-            version_match = re.search(self.WORK_VERSION_REGEX, current_path)
-            if version_match:
-                unique_versions.add(int(version_match.group(1)))
-        if at_least_one_version and not unique_versions:
+        scan_path = re.sub(
+            self.WORK_VERSION_REGEX,
+            self.WORK_VERSION_TEMPLATE.format(utils.VERSION_TOKEN),
+            expanded_path,
+        )
+        scan_path = scan_path.replace(self.SEQUENCE_REGEX, utils.WILDCARD_TOKEN)
+        all_versions = utils.scan_versions(
+            scan_path, list_dir=self.parent.dir_listing_cache.list_dir
+        )
+        unique_versions = set(all_versions)
+        unique_versions.discard(None)
+        if all_versions and not unique_versions:
             # the file exists on disk, but it does not contain a version number
             return [1]
-        return list(unique_versions)
+        return sorted(unique_versions)
 
     def _replace_version_in_path(self, path, version):
         """
@@ -1188,6 +2023,19 @@ class ImportNodeHandler(HookBaseClass):
                 path = re.sub(self.WORK_VERSION_REGEX, new_version_str, path)
         return path
 
+    def _get_file_data(self, node, mutable=False):
+        """
+        Get the data stored for the node's File tab.
+
+        :param node: A :class:`hou.Node` instance.
+        :param bool mutable: Whether to return a copy that can be modified.
+
+        :rtype: dict
+        """
+        return self._load_json_parm(
+            node, self.SGTK_FILE_DATA, default=self.DEFAULT_FILE_DATA, mutable=mutable
+        )
+
     def _get_file_versions(self, node):
         """
         Get all the file versions from the stored data on this node.
@@ -1196,11 +2044,22 @@ class ImportNodeHandler(HookBaseClass):
 
         :rtype: list(int)
         """
-        file_data_parm = node.parm(self.SGTK_FILE_DATA)
-        file_data = json.loads(file_data_parm.evalAsString() or self.DEFAULT_FILE_DATA)
+        file_data = self._get_file_data(node)
         all_versions = file_data.get("all_versions", [])
         return all_versions
 
+    def _populate_file_versions(self, node):
+        """
+        Get all the file versions and `<LATEST>` in a format to populate the
+        file versions menu.
+
+        :param node: A :class:`hou.Node` instance.
+
+        :rtype: list(str)
+        """
+        versions = list(map(str, self._get_file_versions(node))) + [self.LATEST_POLICY]
+        return list(itertools.chain(*zip(versions, versions)))
+
     def populate_file_versions(self, kwargs):
         """
         Populate the file versions menu with all available versions and `<LATEST>`.
@@ -1208,45 +2067,49 @@ class ImportNodeHandler(HookBaseClass):
         :rtype: list(str)
         """
         node = kwargs["node"]
-        versions = list(map(str, self._get_file_versions(node))) + [self.LATEST_POLICY]
-        return list(itertools.chain(*zip(versions, versions)))
+        return self._memoize_menu_items(
+            node,
+            self.SGTK_FILE_VERSION,
+            self.SGTK_FILE_DATA,
+            self._populate_file_versions,
+        )
 
+    @HookBaseClass.batched_parm_writes
     def _refresh_file_path_from_path(self, node):
         """
         Use another file path to update the file path on this node.
 
         :param node: A :class:`hou.Node` instance.
         """
-        file_data_parm = node.parm(self.SGTK_FILE_DATA)
-        file_data = json.loads(file_data_parm.evalAsString() or self.DEFAULT_FILE_DATA)
+        file_data = self._get_file_data(node, mutable=True)
         file_parm = node.parm(self.SGTK_FILE_PATH)
         file_path = file_parm.unexpandedString()
         sgtk_resolved_version = node.parm(self.SGTK_FILE_RESOLVED_VERSION)
         if file_path:
             all_versions = self._resolve_all_versions_from_path(file_path)
             file_data["all_versions"] = all_versions
-            file_data_parm.set(json.dumps(file_data))
+            self._dump_json_parm(node, self.SGTK_FILE_DATA, file_data)
 
             version = file_data["current_version"]
             resolved_version = self._resolve_work_version(all_versions, version)
-            sgtk_resolved_version.set(str(resolved_version or self.NO_VERSIONS))
+            self._set_parm(
+                sgtk_resolved_version, str(resolved_version or self.NO_VERSIONS)
+            )
             if resolved_version:
                 path = self._replace_version_in_path(file_path, resolved_version)
-                file_parm.set(path)
+                self._set_parm(file_parm, path)
             else:
                 path = self.NOTHING_ON_DISK
         else:
-            file_parm.set("")
+            self._set_parm(file_parm, "")
             sgtk_version = node.parm(self.SGTK_FILE_VERSION)
-            sgtk_version.set(0)
-            sgtk_resolved_version.set(self.NO_VERSIONS)
+            self._set_parm(sgtk_version, 0)
+            self._set_parm(sgtk_resolved_version, self.NO_VERSIONS)
             path = self.NO_FILE
 
-        file_data_parm.set(json.dumps(file_data))
+        self._dump_json_parm(node, self.SGTK_FILE_DATA, file_data)
         input_parm = node.parm(self.INPUT_PARM)
-        input_parm.lock(False)
-        input_parm.set(path)
-        input_parm.lock(True)
+        self._set_parm(input_parm, path, lock=True)
 
     @HookBaseClass.restore_version_menu_index(SGTK_FILE_VERSION)
     def refresh_from_file_path(self, kwargs):
@@ -1262,11 +2125,10 @@ class ImportNodeHandler(HookBaseClass):
         """
         node = kwargs["node"]
         parm = kwargs["parm"]
-        file_data_parm = node.parm(self.SGTK_FILE_DATA)
-        file_data = json.loads(file_data_parm.evalAsString() or self.DEFAULT_FILE_DATA)
+        file_data = self._get_file_data(node, mutable=True)
         version = parm.evalAsString()
         file_data["current_version"] = version
-        file_data_parm.set(json.dumps(file_data))
+        self._dump_json_parm(node, self.SGTK_FILE_DATA, file_data)
         self._refresh_file_path_from_path(node)
 
     def refresh_from_file_selection(self, kwargs):
@@ -1276,8 +2138,7 @@ class ImportNodeHandler(HookBaseClass):
         node = kwargs["node"]
         parm = kwargs["parm"]
         file_path = parm.unexpandedString()
-        file_data_parm = node.parm(self.SGTK_FILE_DATA)
-        file_data = json.loads(file_data_parm.evalAsString() or self.DEFAULT_FILE_DATA)
+        file_data = self._get_file_data(node, mutable=True)
         if file_path:
             file_data["path"] = file_path
             all_versions = self._resolve_all_versions_from_path(file_path)
@@ -1289,7 +2150,7 @@ class ImportNodeHandler(HookBaseClass):
                 version_parm = node.parm(self.SGTK_FILE_VERSION)
                 index = all_versions.index(version)
                 version_parm.set(index)
-        file_data_parm.set(json.dumps(file_data))
+        self._dump_json_parm(node, self.SGTK_FILE_DATA, file_data)
         self._refresh_file_path_from_path(node)
 
     def _populate_from_file_data(self, node):
@@ -1298,8 +2159,7 @@ class ImportNodeHandler(HookBaseClass):
 
         :param node: A :class:`hou.Node` instance.
         """
-        work_file_parm = node.parm(self.SGTK_FILE_DATA)
-        file_data = json.loads(work_file_parm.evalAsString() or self.DEFAULT_FILE_DATA)
+        file_data = self._get_file_data(node)
         path_parm = node.parm(self.SGTK_FILE_PATH)
         path_parm.set(file_data["path"])
 
@@ -1354,8 +2214,7 @@ class ImportNodeHandler(HookBaseClass):
         publish_data = self._retrieve_publish_data(node)
         self.add_sgtk_parms(node)
         all_versions_and_statuses = self._resolve_all_versions_statuses(publish_data)
-        sgtk_all_versions = node.parm(self.SGTK_ALL_VERSIONS)
-        sgtk_all_versions.set(json.dumps(all_versions_and_statuses))
+        self._dump_json_parm(node, self.SGTK_ALL_VERSIONS, all_versions_and_statuses)
 
         if publish_data:
             self.populate_node_from_publish_data(
@@ -52,8 +52,10 @@ class BaseRenderNodeHandler(HookBaseClass):
         :returns: The template fields updated with the additional_fields
         """
         output_parm = node.parm(self.OUTPUT_PARM)
-        file_path = output_parm.unexpandedString()
-        fields = self.get_work_template(node).validate_and_get_fields(file_path)
+        file_path = self._get_parm_string(output_parm)
+        fields = self.parent.get_template_fields(
+            self.get_work_template(node), file_path
+        )
         if not fields:
             mesage = 'Can not extract Shotgun fields from "{}": "{}"'
             raise sgtk.TankError(mesage.format(output_parm.path(), file_path))
@@ -62,25 +64,61 @@ class BaseRenderNodeHandler(HookBaseClass):
         fields.update(additional_fields or {})
         return fields
 
-    def generate_aov_path(self, node, channel, template_name):
+    def _get_output_template_fields(self, node):
+        """
+        Get a function returning a shotgun template and the template fields from
+        the node's output path, for generating the paths of the node's other
+        outputs in a single pass.
+
+        The fields are only extracted from the output path once, and each
+        template only looked up once, however many paths are generated.
+
+        :param node: A :class:`hou.Node` instance.
+
+        :returns: A function taking the name of the shotgun template to use and
+            returning a tuple of the :class:`sgtk.Template` and a copy of the
+            template fields. It raises :class:`sgtk.TankError` if either can't
+            be found.
+        """
+        try:
+            base_fields = self._get_template_fields_from(node)
+            base_error = None
+        except sgtk.TankError as error:
+            base_fields = None
+            base_error = str(error)
+        templates = {}
+
+        def get_template_fields(template_name):
+            if base_fields is None:
+                raise sgtk.TankError(base_error)
+            if template_name not in templates:
+                templates[template_name] = self._get_template(template_name)
+            return templates[template_name], dict(base_fields)
+
+        return get_template_fields
+
+    def generate_aov_path(self, node, channel, template_name, get_template_fields=None):
         """
         Generate the file path for the given aov name.
 
         :param node: A :class:`hou.Node` instance.
         :param str channel: The aov name.
         :param str template_name: The name of the shotgun template to use.
+        :param get_template_fields: Function from :meth:`_get_output_template_fields`
+            to re-use between paths.
 
         :returns: The file path for the aov output.
         """
+        if get_template_fields is None:
+            get_template_fields = self._get_output_template_fields(node)
         try:
-            fields = self._get_template_fields_from(node)
-            template = self._get_template(template_name)
+            template, fields = get_template_fields(template_name)
         except sgtk.TankError as error:
             return str(error)
         if channel:
             fields["channel"] = channel
         try:
-            file_path = template.apply_fields(fields)
+            file_path = self._apply_fields(template, fields)
         except sgtk.TankError:
             return self.AOV_ERROR
         return file_path
@@ -96,21 +134,33 @@ class BaseRenderNodeHandler(HookBaseClass):
         archive_output = node.parm(self.ARCHIVE_OUTPUT)
         archive_output.lock(lock)
 
-    def _update_aov_paths(self, node):
+    @HookBaseClass.batched_parm_writes
+    def _update_aov_paths(self, node, get_template_fields=None):
         """
         Update all the aov output paths on the node.
 
         :param node: A :class:`hou.Node` instance.
+        :param get_template_fields: Function from :meth:`_get_output_template_fields`
+            to re-use between paths.
         """
+        if get_template_fields is None:
+            get_template_fields = self._get_output_template_fields(node)
         aov_count = node.parm(self.AOV_COUNT)
         count = aov_count.eval() + 1
         for index in range(1, count):
             aov_name = node.parm(self.AOV_NAME_TMPL.format(index))
             sgtk_aov_name = node.parm(self.SGTK_AOV_NAME_TMPL.format(index))
-            sgtk_aov_name.set(aov_name.unexpandedString())
-            self._update_aov_path(node, index)
+            self._set_parm(sgtk_aov_name, aov_name.unexpandedString())
+            self._update_aov_path(node, index, get_template_fields)
 
-    def update_file_path(self, node, parm_name, template_name, additional_fields=None):
+    def update_file_path(
+        self,
+        node,
+        parm_name,
+        template_name,
+        additional_fields=None,
+        get_template_fields=None,
+    ):
         """
         Update the file path for the given parameter.
 
@@ -118,19 +168,19 @@ class BaseRenderNodeHandler(HookBaseClass):
         :param str parm_name: The name of the parm to update.
         :param str template_name: The name of the shotgun template to use.
         :param dict additional_fields: Any fields to override the template fields with.
+        :param get_template_fields: Function from :meth:`_get_output_template_fields`
+            to re-use between paths.
         """
+        if get_template_fields is None:
+            get_template_fields = self._get_output_template_fields(node)
         try:
-            fields = self._get_template_fields_from(
-                node, additional_fields=additional_fields
-            )
-            template = self._get_template(template_name)
-            file_path = template.apply_fields(fields)
+            template, fields = get_template_fields(template_name)
+            fields.update(additional_fields or {})
+            file_path = self._apply_fields(template, fields)
         except sgtk.TankError as error:
             file_path = str(error)
         parm = node.parm(parm_name)
-        parm.lock(False)
-        parm.set(file_path)
-        parm.lock(True)
+        self._set_parm(parm, file_path, lock=True)
 
     #############################################################################################
     # Overriden methods
@@ -197,6 +247,7 @@ class BaseRenderNodeHandler(HookBaseClass):
         if sgtk_enabled:
             self._update_aov_paths(node)
 
+    @HookBaseClass.batched_parm_writes
     def _refresh_file_path(self, node):
         """
         Refresh the file paths generated by the node handler.
@@ -204,22 +255,39 @@ class BaseRenderNodeHandler(HookBaseClass):
         :param node: A :class:`hou.Node` instance.
         """
         super(BaseRenderNodeHandler, self)._refresh_file_path(node)
+        self._update_output_paths(node, self._get_output_template_fields(node))
+
+    def _update_output_paths(self, node, get_template_fields):
+        """
+        Update the paths of all the node's outputs derived from its output path,
+        in a single pass.
+
+        :param node: A :class:`hou.Node` instance.
+        :param get_template_fields: Function from :meth:`_get_output_template_fields`.
+        """
         aov_count = node.parm(self.AOV_COUNT)
         count = aov_count.eval() + 1
         for index in range(1, count):
-            self._update_aov_path(node, index)
-        self.update_file_path(node, self.ARCHIVE_OUTPUT, self.ARCHIVE_WORK_TEMPLATE)
+            self._update_aov_path(node, index, get_template_fields)
+        self.update_file_path(
+            node,
+            self.ARCHIVE_OUTPUT,
+            self.ARCHIVE_WORK_TEMPLATE,
+            get_template_fields=get_template_fields,
+        )
 
     #############################################################################################
     # AOVs
     #############################################################################################
 
-    def _update_aov_path(self, node, index):
+    def _update_aov_path(self, node, index, get_template_fields=None):
         """
         Update the aov output path for the given index.
 
         :param node: A :class:`hou.Node` instance.
         :param int index: The index of the aov parm.
+        :param get_template_fields: Function from :meth:`_get_output_template_fields`
+            to re-use between paths.
 
         :raises: :class:`FieldInputError` on invalid input.
         """
@@ -229,16 +297,16 @@ class BaseRenderNodeHandler(HookBaseClass):
         try:
             self._validate_parm(parm)
         except Exception:
-            aov_name.set("")
-            aov_file_path.set(self.AOV_ERROR)
+            self._set_parm(aov_name, "")
+            self._set_parm(aov_file_path, self.AOV_ERROR)
             raise
         aov = parm.evalAsString()
-        aov_name.set(parm.unexpandedString())
+        self._set_parm(aov_name, parm.unexpandedString())
 
-        aov_path = self.generate_aov_path(node, aov, self.AOV_WORK_TEMPLATE)
-        aov_file_path.lock(False)
-        aov_file_path.set(aov_path)
-        aov_file_path.lock(True)
+        aov_path = self.generate_aov_path(
+            node, aov, self.AOV_WORK_TEMPLATE, get_template_fields
+        )
+        self._set_parm(aov_file_path, aov_path, lock=True)
 
     def update_aov_path(self, kwargs):
         """
@@ -289,7 +357,7 @@ class BaseRenderNodeHandler(HookBaseClass):
             src_parm = node.parm(src_parm_name.format(index))
             channel_name = src_parm.evalAsString()
             dest_parm = node.parm(dest_parm_name.format(index))
-            dest_parm.set(channel_name)
+            self._set_parm(dest_parm, channel_name)
 
     def _populate_from_fields(self, node, fields):
         """
@@ -300,7 +368,7 @@ class BaseRenderNodeHandler(HookBaseClass):
         """
         super(BaseRenderNodeHandler, self)._populate_from_fields(node, fields)
         sgtk_pass_name = node.parm(self.SGTK_PASS_NAME)
-        sgtk_pass_name.set(fields.get("identifier", ""))
+        self._set_parm(sgtk_pass_name, fields.get("identifier", ""))
         self._populate_aov_names(
             node, self.AOV_COUNT, self.AOV_NAME_TMPL, self.SGTK_AOV_NAME_TMPL
         )
@@ -314,6 +382,7 @@ class BaseRenderNodeHandler(HookBaseClass):
         work_template_name,
         publish_template_name,
         paths_and_templates,
+        scan_disk=True,
     ):
         """
         Get the output path and the templates used for the given multi parms.
@@ -326,6 +395,8 @@ class BaseRenderNodeHandler(HookBaseClass):
         :param publish_template: The publish :class:`sgtk.Template` for this parm.
         :param list paths_and_templates: The current list of paths and templates
             to append to.
+        :param bool scan_disk: Whether to look for the outputs on disk, see
+            :meth:`_get_output_path_and_templates_for_parm`.
         """
         aov_work_template = self._get_template(work_template_name)
         aov_publish_template = self._get_template(publish_template_name)
@@ -340,9 +411,10 @@ class BaseRenderNodeHandler(HookBaseClass):
                     aov_work_template,
                     aov_publish_template,
                     paths_and_templates,
+                    scan_disk=scan_disk,
                 )
 
-    def _get_output_paths_and_templates(self, node):
+    def _get_output_paths_and_templates(self, node, scan_disk=True):
         """
         Go through the node's specified parameters and get the output paths,
         work and publish templates.
@@ -357,12 +429,14 @@ class BaseRenderNodeHandler(HookBaseClass):
         - whether the output is a deep image
 
         :param node: A :class:`hou.Node` instance.
+        :param bool scan_disk: Whether to look for the outputs on disk, see
+            :meth:`_get_output_path_and_templates_for_parm`.
 
         :rtype: list(dict)
         """
         paths_and_templates = super(
             BaseRenderNodeHandler, self
-        )._get_output_paths_and_templates(node)
+        )._get_output_paths_and_templates(node, scan_disk=scan_disk)
 
         # get extra image planes
         self._get_multi_parm_output_paths_and_templates(
@@ -373,6 +447,7 @@ class BaseRenderNodeHandler(HookBaseClass):
             self.AOV_WORK_TEMPLATE,
             self.AOV_PUBLISH_TEMPLATE,
             paths_and_templates,
+            scan_disk=scan_disk,
         )
 
         return paths_and_templates
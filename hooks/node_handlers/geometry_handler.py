@@ -119,4 +119,4 @@ class GeometryNodeHandler(HookBaseClass):
         identifier = fields.get("extension", "geo")
         entries = sgtk_cache_extension.menuItems()
         index = entries.index(identifier)
-        sgtk_cache_extension.set(index)
+        self._set_parm(sgtk_cache_extension, index)
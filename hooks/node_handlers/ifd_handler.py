@@ -79,13 +79,18 @@ class IfdNodeHandler(HookBaseClass):
     # strings
     AOV_ERROR = "Channel Name not defined"
 
-    def _update_aov_paths(self, node):
+    @HookBaseClass.batched_parm_writes
+    def _update_aov_paths(self, node, get_template_fields=None):
         """
         Update all the aov output paths on the node.
 
         :param node: A :class:`hou.Node` instance.
+        :param get_template_fields: Function from :meth:`_get_output_template_fields`
+            to re-use between paths.
         """
-        super(IfdNodeHandler, self)._update_aov_paths(node)
+        if get_template_fields is None:
+            get_template_fields = self._get_output_template_fields(node)
+        super(IfdNodeHandler, self)._update_aov_paths(node, get_template_fields)
         vm_cryptolayers = node.parm(self.VM_CRYPTOLAYERS)
         count = vm_cryptolayers.eval() + 1
         for index in range(1, count):
@@ -93,8 +98,8 @@ class IfdNodeHandler(HookBaseClass):
             sgtk_cryptolayername = node.parm(
                 self.SGTK_CRYPTOLAYERNAME_TMPL.format(index)
             )
-            sgtk_cryptolayername.set(vm_cryptolayername.unexpandedString())
-            self._update_crypto_layer_path(node, index)
+            self._set_parm(sgtk_cryptolayername, vm_cryptolayername.unexpandedString())
+            self._update_crypto_layer_path(node, index, get_template_fields)
 
     def _lock_parms(self, node, lock):
         """
@@ -167,8 +172,7 @@ class IfdNodeHandler(HookBaseClass):
         # deep
         deep_folder = images_folder.get("output6_2")
         index = deep_folder.index_of_template(self.VM_DCMFILENAME)
-        deep_template_name = self.extra_args.get(self.DCM_WORK_TEMPLATE)
-        deep_template = self.parent.get_template_by_name(deep_template_name)
+        deep_template = self.extra_templates.get(self.DCM_WORK_TEMPLATE)
         choices = deep_template.keys["extension"].labelled_choices
         sgtk_deep_ext = hou.MenuParmTemplate(
             self.SGTK_DEEP_EXT,
@@ -231,30 +235,36 @@ class IfdNodeHandler(HookBaseClass):
         )
         vm_cryptolayers.insert_template(index, sgtk_cryptolayername)
 
-    def _refresh_file_path(self, node):
+    def _update_output_paths(self, node, get_template_fields):
         """
-        Refresh the file paths generated by the node handler.
+        Update the paths of all the node's outputs derived from its output path,
+        in a single pass.
 
         :param node: A :class:`hou.Node` instance.
+        :param get_template_fields: Function from :meth:`_get_output_template_fields`.
         """
-        super(IfdNodeHandler, self)._refresh_file_path(node)
+        super(IfdNodeHandler, self)._update_output_paths(node, get_template_fields)
         vm_cryptolayers = node.parm(self.VM_CRYPTOLAYERS)
         count = vm_cryptolayers.eval() + 1
         for index in range(1, count):
-            self._update_crypto_layer_path(node, index)
+            self._update_crypto_layer_path(node, index, get_template_fields)
 
-        self._update_deep_paths(node)
+        self._update_deep_paths(node, get_template_fields)
 
     #############################################################################################
     # Deep Output
     #############################################################################################
 
-    def _update_deep_paths(self, node):
+    def _update_deep_paths(self, node, get_template_fields=None):
         """
         Update the output path for deep images.
 
         :param node: A :class:`hou.Node` instance.
+        :param get_template_fields: Function from :meth:`_get_output_template_fields`
+            to re-use between paths.
         """
+        if get_template_fields is None:
+            get_template_fields = self._get_output_template_fields(node)
         sgtk_deep_ext = node.parm(self.SGTK_DEEP_EXT)
         extension = sgtk_deep_ext.evalAsString()
         additional_fields = {"extension": extension}
@@ -262,7 +272,11 @@ class IfdNodeHandler(HookBaseClass):
         template_names = (self.DCM_WORK_TEMPLATE, self.DSM_WORK_TEMPLATE)
         for parm_name, template_name in zip(parm_names, template_names):
             self.update_file_path(
-                node, parm_name, template_name, additional_fields=additional_fields
+                node,
+                parm_name,
+                template_name,
+                additional_fields=additional_fields,
+                get_template_fields=get_template_fields,
             )
 
     def update_deep_paths(self, kwargs):
@@ -276,12 +290,14 @@ class IfdNodeHandler(HookBaseClass):
     # Cryptomatte
     #############################################################################################
 
-    def _update_crypto_layer_path(self, node, index):
+    def _update_crypto_layer_path(self, node, index, get_template_fields=None):
         """
         Update cryptomatte later output paths.
 
         :param node: A :class:`hou.Node` instance.
         :param int index: The index of the aov parm.
+        :param get_template_fields: Function from :meth:`_get_output_template_fields`
+            to re-use between paths.
 
         :raises: :class:`FieldInputError` on invalid input.
         """
@@ -292,22 +308,24 @@ class IfdNodeHandler(HookBaseClass):
         try:
             self._validate_parm(parm)
         except Exception:
-            vm_cryptolayername.set("")
-            vm_cryptolayeroutput.set(self.AOV_ERROR)
-            vm_cryptolayersidecar.set(self.AOV_ERROR)
+            self._set_parm(vm_cryptolayername, "")
+            self._set_parm(vm_cryptolayeroutput, self.AOV_ERROR)
+            self._set_parm(vm_cryptolayersidecar, self.AOV_ERROR)
             raise
         aov = parm.evalAsString()
-        vm_cryptolayername.set(parm.unexpandedString())
+        self._set_parm(vm_cryptolayername, parm.unexpandedString())
 
-        channel_path = self.generate_aov_path(node, aov, self.AOV_WORK_TEMPLATE)
-        vm_cryptolayeroutput.lock(False)
-        vm_cryptolayeroutput.set(channel_path)
-        vm_cryptolayeroutput.lock(True)
+        if get_template_fields is None:
+            get_template_fields = self._get_output_template_fields(node)
+        channel_path = self.generate_aov_path(
+            node, aov, self.AOV_WORK_TEMPLATE, get_template_fields
+        )
+        self._set_parm(vm_cryptolayeroutput, channel_path, lock=True)
 
-        sidecar_path = self.generate_aov_path(node, aov, self.MANIFEST_NAME_TEMPLATE)
-        vm_cryptolayersidecar.lock(False)
-        vm_cryptolayersidecar.set(sidecar_path)
-        vm_cryptolayersidecar.lock(True)
+        sidecar_path = self.generate_aov_path(
+            node, aov, self.MANIFEST_NAME_TEMPLATE, get_template_fields
+        )
+        self._set_parm(vm_cryptolayersidecar, sidecar_path, lock=True)
 
     def update_crypto_layer_path(self, kwargs):
         """
@@ -428,7 +446,7 @@ class IfdNodeHandler(HookBaseClass):
         dcm_template = self._get_template(self.DCM_WORK_TEMPLATE)
 
         if dcm_file_path is not None:
-            dcm_fields = dcm_template.validate_and_get_fields(dcm_file_path)
+            dcm_fields = self.parent.get_template_fields(dcm_template, dcm_file_path)
             if dcm_fields:
                 sgtk_deep_extension = node.parm(self.SGTK_DEEP_EXT)
                 entries = sgtk_deep_extension.menuItems()
@@ -436,7 +454,7 @@ class IfdNodeHandler(HookBaseClass):
                 index = entries.index(ext)
                 sgtk_deep_extension.set(index)
 
-    def _get_output_paths_and_templates(self, node):
+    def _get_output_paths_and_templates(self, node, scan_disk=True):
         """
         Go through the node's specified parameters and get the output paths,
         work and publish templates.
@@ -451,12 +469,14 @@ class IfdNodeHandler(HookBaseClass):
         - whether the output is a deep image
 
         :param node: A :class:`hou.Node` instance.
+        :param bool scan_disk: Whether to look for the outputs on disk, see
+            :meth:`_get_output_path_and_templates_for_parm`.
 
         :rtype: list(dict)
         """
         paths_and_templates = super(
             IfdNodeHandler, self
-        )._get_output_paths_and_templates(node)
+        )._get_output_paths_and_templates(node, scan_disk=scan_disk)
 
         # get cryptomatte
         self._get_multi_parm_output_paths_and_templates(
@@ -467,6 +487,7 @@ class IfdNodeHandler(HookBaseClass):
             self.AOV_WORK_TEMPLATE,
             self.AOV_PUBLISH_TEMPLATE,
             paths_and_templates,
+            scan_disk=scan_disk,
         )
 
         # get deep outputs
@@ -491,7 +512,9 @@ class IfdNodeHandler(HookBaseClass):
                     True,
                 ),
             }
-            self._get_output_path_and_templates_for_parm(*func_parms[result])
+            self._get_output_path_and_templates_for_parm(
+                *func_parms[result], scan_disk=scan_disk
+            )
 
         # get ifd
         if node.parm(self.ARCHIVE_ENABLED).eval():
@@ -501,6 +524,7 @@ class IfdNodeHandler(HookBaseClass):
                 self._get_template(self.ARCHIVE_WORK_TEMPLATE),
                 self._get_template(self.ARCHIVE_PUBLISH_TEMPLATE),
                 paths_and_templates,
+                scan_disk=scan_disk,
             )
 
         return paths_and_templates
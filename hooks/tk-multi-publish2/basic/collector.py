@@ -31,24 +31,25 @@ _HOUDINI_OUTPUTS = {
 }
 
 
-def _iter_output_nodes():
-    """Iterate over all output nodes in the scene.
+def _iter_output_nodes(engine):
+    """Iterate over all sgtk output nodes in the scene.
 
-    For a more functional programming approach, you can try::
+    The nodes are looked up in the engine's registry of sgtk nodes, see
+    :meth:`HoudiniEngine.sgtk_nodes`.
 
-        for category, type_names in _HOUDINI_OUTPUTS.items():
-            node_types = (hou.nodeType(category, name) for name in type_names)
-            for node_type in filter(None, node_types):  # Strip None node_type
-                yield category, node_type, node_type.instances() or ()
-
-    :return: Node category, node type and all node instances.
-    :rtype: Generator[hou.NodeTypeCategory, hou.NodeType, tuple[hou.Node]]
+    :param engine: The current :class:`HoudiniEngine`, whose
+        :meth:`HoudiniEngine.node_handler_config` tells the node types with
+        a node handler.
+    :return: Node category, node type and all sgtk node instances.
+    :rtype: Generator[hou.NodeTypeCategory, hou.NodeType, list[hou.Node]]
     """
     for category, type_names in _HOUDINI_OUTPUTS.items():
         for name in type_names:
+            if engine.node_handler_config(category.name(), name) is None:
+                continue
             node_type = hou.nodeType(category, name)
             if node_type is not None:
-                yield category, node_type, node_type.instances() or ()
+                yield category, node_type, engine.sgtk_nodes(category.name(), name)
 
 
 class HoudiniSessionCollector(HookBaseClass):
@@ -231,7 +232,7 @@ class HoudiniSessionCollector(HookBaseClass):
 
         engine = self.parent.engine
 
-        for _, node_type, nodes in _iter_output_nodes():
+        for _, node_type, nodes in _iter_output_nodes(engine):
             type_name = node_type.name()
             get_output_paths_and_templates = None
             # iterate over each node
@@ -298,7 +299,7 @@ class HoudiniSessionCollector(HookBaseClass):
                         "publish_template"
                     ]
 
-                    fields = template.get_fields(path)
+                    fields = engine.get_template_fields(template, path, strict=True)
 
                     publish_name_tokens = []
                     for key in ["name", "location", "variation", "identifier"]:
@@ -248,9 +248,9 @@ class HoudiniStartVersionControlPlugin(HookBaseClass):
 
         work_template = item.properties.get("work_template")
         if work_template:
-            if work_template.validate(path):
+            work_fields = publisher.engine.get_template_fields(work_template, path)
+            if work_fields is not None:
                 self.logger.debug("Using work template to determine version number.")
-                work_fields = work_template.get_fields(path)
                 if "version" in work_fields:
                     version_number = work_fields.get("version")
             else:
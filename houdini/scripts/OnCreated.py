@@ -8,6 +8,7 @@ def run_on_created(node):
         handler = engine.node_handler(node)
         if handler:
             handler.on_created(node=node)
+            engine.register_sgtk_node(node)
 
 
 run_on_created(kwargs["node"])
@@ -8,6 +8,7 @@ def run_on_deleted(node):
         handler = engine.node_handler(node)
         if handler:
             handler.on_deleted(node=node)
+            engine.unregister_sgtk_node(node)
 
 
 run_on_deleted(kwargs["node"])
@@ -8,6 +8,7 @@ def run_on_loaded(node):
         handler = engine.node_handler(node)
         if handler:
             handler.on_loaded(node=node)
+            engine.register_sgtk_node(node)
 
 
 run_on_loaded(kwargs["node"])
@@ -2,11 +2,14 @@
 Implicit, base hook class for all node handlers.
 """
 
+import collections
+import contextlib
+import functools
 import itertools
 import re
 
 import sgtk
-
+from tank_vendor import six
 
 HookBaseClass = sgtk.get_hook_baseclass()
 
@@ -20,6 +23,8 @@ class NodeHandlerBase(HookBaseClass):
     NODE_CATEGORY = None
 
     VERSION_POLICIES = []
+    VERSION_SCAN_SENTINEL = 918273600
+    FORMATTER_VARYING_KEYS = ("version", "SEQ", "channel", "extension")
 
     SGTK_ALL_VERSIONS = "sgtk_all_versions"
     SGTK_VERSION = "sgtk_version"
@@ -29,6 +34,12 @@ class NodeHandlerBase(HookBaseClass):
     USE_SGTK = "use_sgtk"
     SGTK_IDENTIFIER = "sgtk_identifier"
 
+    # Shotgun entity types the node paths are resolved from
+    SHOTGUN_ENTITY_TYPES = ()
+
+    # templates resolved from the handler config, by extra_args key
+    extra_templates = {}
+
     def __new__(cls, *args, **kwargs):
         """
         Set up the node handler class to contain the appropriate settings from the
@@ -44,27 +55,24 @@ class NodeHandlerBase(HookBaseClass):
             if hasattr(cls, "_work_template"):
                 return super(NodeHandlerBase, cls).__new__(cls, *args, **kwargs)
             engine = sgtk.platform.current_engine()
-            node_handlers = engine.get_setting("node_handlers")
-            for handler in node_handlers:
-                matching_node_category_type = (
-                    handler["node_type"] == cls.NODE_TYPE
-                    and handler["node_category"] == cls.NODE_CATEGORY
-                )
-                if matching_node_category_type:
-                    work_template = engine.get_template_by_name(
-                        handler["work_template"]
-                    )
-                    cls._work_template = work_template
-                    publish_template = engine.get_template_by_name(
-                        handler["publish_template"]
-                    )
-                    cls._publish_template = publish_template
-                    cls.extra_args = handler["extra_args"]
-                    cls.init_node_values = handler["init_node_values"]
-                    engine.logger.debug(repr(handler))
-                    break
+            config = engine.node_handler_config(cls.NODE_CATEGORY, cls.NODE_TYPE)
+            if config:
+                cls._work_template = config["work_template"]
+                cls._publish_template = config["publish_template"]
+                cls.extra_args = config["extra_args"]
+                cls.extra_templates = config["extra_templates"]
+                cls.init_node_values = config["init_node_values"]
+                engine.logger.debug(repr(config))
         return super(NodeHandlerBase, cls).__new__(cls, *args, **kwargs)
 
+    def __init__(self, *args, **kwargs):
+        """
+        Initialise the class.
+        """
+        super(NodeHandlerBase, self).__init__(*args, **kwargs)
+        # pending writes of locked parms, by node session id
+        self.__parm_writes = {}
+
     @staticmethod
     def generate_callback_script_str(method_name):
         """
@@ -117,7 +125,9 @@ class NodeHandlerBase(HookBaseClass):
                 "No template name '{}' defined for node type '{}'"
                 "".format(template_name, self.NODE_TYPE)
             )
-        template = self.parent.get_template_by_name(setting_template_name)
+        template = self.extra_templates.get(template_name)
+        if not template:
+            template = self.parent.get_template_by_name(setting_template_name)
         if not template:
             raise sgtk.TankError(
                 "Can't find template called '{}' defined for node type '{}'"
@@ -177,6 +187,123 @@ class NodeHandlerBase(HookBaseClass):
         if sgtk_identifier and not use_sgtk:
             self._restore_sgtk_parms(node)
 
+    ###########################################################################
+    # Parm writes
+    ###########################################################################
+
+    @staticmethod
+    def batched_parm_writes(method):
+        """Decorator for making a method's parm writes in a single batch.
+
+        The method's first argument must be the node written to i.e.
+        decorating implementations of ``_refresh_file_path`` in sub-hook
+        classes::
+
+            @HookBaseClass.batched_parm_writes
+            def _refresh_file_path(self, node):
+
+        See :meth:`_batch_parm_writes`.
+
+        Args:
+            method (object): Method to wrap.
+
+        Returns:
+            object: The wrapped method.
+        """
+
+        @functools.wraps(method)
+        def wrapped_method(self, node, *args, **kwargs):
+            with self._batch_parm_writes(node):
+                return method(self, node, *args, **kwargs)
+
+        return wrapped_method
+
+    @contextlib.contextmanager
+    def _batch_parm_writes(self, node):
+        """
+        Context manager batching the parm writes made on the node with
+        :meth:`_set_parm`.
+
+        Undos are disabled for the whole batch, and writes of locked parms are
+        deferred until the batch exits, when only the values that changed are
+        set. Deferred writes are still made if an exception is raised, so the
+        values queued before it aren't lost. Nested batches for the same node
+        re-use the outermost one.
+
+        :param node: A :class:`hou.Node` instance.
+        """
+        import hou
+
+        session_id = node.sessionId()
+        if session_id in self.__parm_writes:
+            yield
+            return
+        pending = self.__parm_writes[session_id] = collections.OrderedDict()
+        with hou.undos.disabler():
+            try:
+                yield
+            finally:
+                del self.__parm_writes[session_id]
+                for parm, value in pending.values():
+                    self._write_parm(parm, value, lock=True)
+
+    def _set_parm(self, parm, value, lock=False):
+        """
+        Set the value of a parm, skipping the write if it is unchanged.
+
+        :param parm: A :class:`hou.Parm` instance.
+        :param value: The value to set.
+        :param bool lock: Whether the parm is locked, in which case it is
+            unlocked for the write and deferred until the end of the current
+            batch, if any, see :meth:`_batch_parm_writes`.
+        """
+        if lock:
+            pending = self.__parm_writes.get(parm.node().sessionId())
+            if pending is not None:
+                pending[parm.name()] = (parm, value)
+                return
+        self._write_parm(parm, value, lock=lock)
+
+    def _get_parm_string(self, parm):
+        """
+        Get the unexpanded string of a parm, including any write of it still
+        pending in the current batch, see :meth:`_batch_parm_writes`.
+
+        :param parm: A :class:`hou.Parm` instance.
+
+        :rtype: str
+        """
+        pending = self.__parm_writes.get(parm.node().sessionId(), {})
+        if parm.name() in pending:
+            return pending[parm.name()][1]
+        return parm.unexpandedString()
+
+    @staticmethod
+    def _write_parm(parm, value, lock=False):
+        """
+        Set the value of a parm now, skipping the write if it is unchanged.
+
+        :param parm: A :class:`hou.Parm` instance.
+        :param value: The value to set.
+        :param bool lock: Whether to unlock the parm for the write and
+            lock it again afterwards.
+        """
+        import hou
+
+        try:
+            if isinstance(value, six.string_types):
+                changed = parm.unexpandedString() != value
+            else:
+                changed = parm.eval() != value
+        except hou.OperationFailed:
+            changed = True
+        if changed:
+            if lock:
+                parm.lock(False)
+            parm.set(value)
+        if lock and not parm.isLocked():
+            parm.lock(True)
+
     ###########################################################################
     # houdini callback overrides
     ###########################################################################
@@ -209,8 +336,13 @@ class NodeHandlerBase(HookBaseClass):
         """
         Method to run on houdini's OnLoaded callback.
 
+        The sgtk parms are migrated to the engine's version, unless the
+        engine's :attr:`HoudiniEngine.frozen_paths` are enabled.
+
         :param node: A :class:`hou.Node` instance.
         """
+        if self.parent.frozen_paths:
+            return
         current_version = None
         engine_version = self.parent.version
         folder = node.parm(self.SGTK_FOLDER)
@@ -502,6 +634,8 @@ class NodeHandlerBase(HookBaseClass):
                 value_before_update = version_parm.evalAsString()
                 try:
                     callback(self, kwargs)
+                    # the versions menu must be refreshed before correcting it
+                    self.parent.flush_refreshes([kwargs["node"]])
                 finally:
                     current = version_parm.evalAsString()
                     if value_before_update in version_parm.menuItems():
@@ -536,9 +670,8 @@ class NodeHandlerBase(HookBaseClass):
         :param node: A :class:`hou.Node` instance.
         :param bool sgtk_enabled: The state to set the parameters to.
         """
-        kwargs = {"node": node}
         if sgtk_enabled:
-            self.refresh_file_path(kwargs)
+            self._schedule_refresh(node)
 
     def enable_sgtk(self, kwargs):
         """
@@ -572,8 +705,18 @@ class NodeHandlerBase(HookBaseClass):
 
         :return: list(str), for example '["1", "1", "2", "2", "3", "3"]'
         """
-        all_versions = self._get_all_versions(node)
-        versions = map(str, all_versions)
+        return self._get_version_menu_items(self._get_all_versions(node))
+
+    def _get_version_menu_items(self, all_versions):
+        """
+        Get the version menu items for the given versions, followed by the
+        version policies.
+
+        :param list(int) all_versions: The versions.
+
+        :return: list(str), for example '["1", "1", "2", "2", "3", "3"]'
+        """
+        versions = list(map(str, all_versions))
         versions.extend(self.VERSION_POLICIES)
         return list(itertools.chain(*zip(versions, versions)))
 
@@ -585,7 +728,34 @@ class NodeHandlerBase(HookBaseClass):
         :return: list(str), for example '["1", "1", "2", "2", "3", "3"]'
         """
         node = kwargs["node"]
-        return self._populate_versions(node)
+        return self._memoize_menu_items(
+            node, self.SGTK_VERSION, self.SGTK_ALL_VERSIONS, self._populate_versions
+        )
+
+    def _memoize_menu_items(self, node, menu_parm_name, source_parm_name, populate):
+        """
+        Get the menu items for a menu parm, only populating them again when
+        the parm they are populated from has changed.
+
+        Houdini runs menu item generators every time a menu is drawn or
+        evaluated, so the items are cached on the engine by node and menu parm.
+
+        :param node: A :class:`hou.Node` instance.
+        :param str menu_parm_name: The name of the menu parm.
+        :param str source_parm_name: The name of the parm the items are
+            populated from.
+        :param populate: Callable taking the node and returning the menu items.
+
+        :rtype: list(str)
+        """
+        raw = node.parm(source_parm_name).evalAsString()
+        key = (node.sessionId(), menu_parm_name)
+        menu_items_cache = self.parent.menu_items_cache
+        cached = menu_items_cache.get(key)
+        if cached is None or cached[0] != raw:
+            cached = (raw, populate(node))
+            menu_items_cache.set(key, cached)
+        return list(cached[1])
 
     def _refresh_file_path(self, node):
         """
@@ -602,21 +772,93 @@ class NodeHandlerBase(HookBaseClass):
         node = kwargs["node"]
         self._refresh_file_path(node)
 
+    def get_refresh_signature(self, node):
+        """
+        Get a signature of the inputs the file paths of the node are generated
+        from, to tell whether they need refreshing.
+
+        :param node: A :class:`hou.Node` instance.
+
+        :rtype: tuple
+        """
+        return (node.name(),) + tuple(
+            (parm.name(), parm.rawValue())
+            for parm in node.parms()
+            if parm.name().startswith("sgtk_") or parm.name() == self.USE_SGTK
+        )
+
+    def get_manifest_entry(self, node):
+        """
+        Get the entry of the node in the resolution manifest, see
+        :meth:`HoudiniEngine.write_resolution_manifest`.
+
+        :param node: A :class:`hou.Node` instance.
+
+        :rtype: dict
+        """
+        node_type = node.type()
+        entry = {
+            "node_type": "{}/{}".format(node_type.category().name(), node_type.name())
+        }
+        use_sgtk = node.parm(self.USE_SGTK)
+        entry["use_sgtk"] = bool(use_sgtk and use_sgtk.eval())
+        version = node.parm(self.SGTK_VERSION)
+        if version:
+            entry["version_policy"] = version.evalAsString()
+        resolved_version = node.parm(self.SGTK_RESOLVED_VERSION)
+        if resolved_version:
+            entry["resolved_version"] = resolved_version.evalAsString()
+        return entry
+
+    def get_unresolved_paths(self, node):
+        """
+        Get the names of the node's file path parms that haven't been resolved,
+        see :meth:`HoudiniEngine.log_unresolved_paths`.
+
+        :param node: A :class:`hou.Node` instance.
+
+        :rtype: list(str)
+        """
+        return []
+
+    def refresh_file_paths(self, nodes):
+        """
+        Refresh the file paths generated by the node handler for many nodes at once.
+
+        Override this when work can be shared between nodes, i.e. batching queries.
+
+        :param list nodes: :class:`hou.Node` instances handled by this node handler.
+        """
+        for node in nodes:
+            self.refresh_file_path({"node": node})
+
     def refresh_file_path_from_version(self, kwargs):
         """
         Callback to refresh the file paths generated by the node handler when the
         version is updated.
         """
         node = kwargs["node"]
-        self._refresh_file_path(node)
+        self._schedule_refresh(node)
+
+    def _schedule_refresh(self, node):
+        """
+        Schedule a refresh of the file paths generated by the node handler,
+        collapsing repeated requests for the same node into one, see
+        :meth:`HoudiniEngine.schedule_refresh`.
 
-    def _resolve_all_versions_from_fields(self, fields, template):
+        :param node: A :class:`hou.Node` instance.
+        """
+        self.parent.schedule_refresh(node)
+
+    def _resolve_all_versions_from_fields(self, fields, template, node=None):
         """
         Using fields and a shotgun template, get all the versions on disk
         that relate to the current item.
 
         :param dict fields: The template fields.
         :param template: An :class:`sgtk.Template`.
+        :param node: A :class:`hou.Node` instance to refresh when versions
+            appear or disappear on disk, see :attr:`HoudiniEngine.version_index`.
 
         :rtype: list(int)
         """
@@ -626,8 +868,126 @@ class NodeHandlerBase(HookBaseClass):
             for key in template.keys.values()
             if isinstance(key, sgtk.SequenceKey)
         ]
-        unique_versions = set(
-            template.get_fields(path)["version"]
-            for path in self.sgtk.paths_from_template(template, fields, skip_keys=skip)
-        )
+        try:
+            scan_path = self._get_version_scan_path(fields, template, skip)
+        except sgtk.TankError:
+            unique_versions = set(
+                template.get_fields(path)["version"]
+                for path in self.sgtk.paths_from_template(
+                    template, fields, skip_keys=skip
+                )
+            )
+        else:
+            version_index = self.parent.version_index
+            if version_index is not None:
+                key = node.sessionId() if node else None
+                return version_index.versions(scan_path, key=key)
+            utils = self.parent.import_module("tk_houdini").utils
+            unique_versions = utils.scan_versions(
+                scan_path, list_dir=self.parent.dir_listing_cache.list_dir
+            )
+            unique_versions.discard(None)
         return sorted(unique_versions)
+
+    def _apply_fields(self, template, fields):
+        """
+        Apply the fields to the template, like :meth:`sgtk.Template.apply_fields`,
+        using a formatter compiled for the fields other than the
+        ``FORMATTER_VARYING_KEYS``, see :class:`TemplateFormatter`.
+
+        Falls back to the template if no formatter can be compiled.
+
+        :param template: An :class:`sgtk.Template`.
+        :param dict fields: The template fields.
+
+        :raises: :class:`sgtk.TankError` if the fields are invalid.
+
+        :rtype: str
+        """
+        varying_keys = tuple(
+            key_name
+            for key_name in self.FORMATTER_VARYING_KEYS
+            if key_name in template.keys and fields.get(key_name) is not None
+            # keys with a few valid values are best compiled in
+            and not getattr(template.keys[key_name], "choices", None)
+        )
+        formatter = None
+        if varying_keys:
+            formatter = self._get_template_formatter(template, fields, varying_keys)
+        if formatter is None:
+            return template.apply_fields(fields)
+        return formatter.format(fields)
+
+    def _get_template_formatter(self, template, fields, varying_keys):
+        """
+        Get the cached formatter of the template for the fields, compiling it
+        if needed.
+
+        :param template: An :class:`sgtk.Template`.
+        :param dict fields: The template fields.
+        :param tuple(str) varying_keys: The names of the keys to substitute.
+
+        :returns: A :class:`TemplateFormatter`, or ``None`` if the template
+            can't be compiled for the fields.
+        """
+        fixed_fields = tuple(
+            sorted(
+                (key_name, value)
+                for key_name, value in fields.items()
+                if key_name in template.keys and key_name not in varying_keys
+            )
+        )
+        key = (template.name, template.definition, fixed_fields, varying_keys)
+        formatter_cache = self.parent.template_formatter_cache
+        try:
+            formatter = formatter_cache.get(key)
+        except TypeError:
+            # unhashable field values
+            return None
+        if formatter is None:
+            utils = self.parent.import_module("tk_houdini").utils
+            try:
+                formatter = utils.TemplateFormatter(template, fields, varying_keys)
+            except (ValueError, sgtk.TankError):
+                self.parent.logger.debug(
+                    "Can't compile a formatter of %s for %s", template, varying_keys
+                )
+                formatter = False
+            formatter_cache.set(key, formatter)
+        return formatter or None
+
+    def _get_version_scan_path(self, fields, template, skip_keys):
+        """
+        Build the path to scan for versions on disk with, see
+        :func:`scan_versions`.
+
+        :param dict fields: The template fields.
+        :param template: An :class:`sgtk.Template`.
+        :param list(str) skip_keys: The version and sequence keys to scan for.
+
+        :raises: :class:`sgtk.TankError` if the fields do not fully describe
+            the path, in which case it can't be scanned for directly.
+
+        :rtype: str
+        """
+        utils = self.parent.import_module("tk_houdini").utils
+        if "version" not in template.keys:
+            raise sgtk.TankError("No version in template {}".format(template))
+        missing = [key for key in template.keys if key not in fields]
+        if set(missing) - set(skip_keys):
+            raise sgtk.TankError("Missing fields: {}".format(missing))
+
+        scan_fields = dict(fields)
+        tokens = {}
+        for index, key_name in enumerate(skip_keys):
+            # unlikely numbers to substitute back for tokens after formatting
+            sentinel = self.VERSION_SCAN_SENTINEL + index
+            scan_fields[key_name] = sentinel
+            if key_name == "version":
+                tokens[str(sentinel)] = utils.VERSION_TOKEN
+            else:
+                tokens[str(sentinel)] = utils.WILDCARD_TOKEN
+        path = template.apply_fields(scan_fields)
+        for sentinel, token in tokens.items():
+            path = path.replace(sentinel, token)
+        return path
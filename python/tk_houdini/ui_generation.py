@@ -1007,7 +1007,9 @@ def _on_file_change_timeout():
             ["step", "is", new_context.step],
             ["entity", "is", new_context.entity],
         ]
-        possible_tasks = tk.shotgun.find("Task", filters, fields=["content"])
+        # the running engine's connection may cache queries on disk
+        sg = cur_engine.shotgun if cur_engine else tk.shotgun
+        possible_tasks = sg.find("Task", filters, fields=["content"])
         if possible_tasks:
             task = possible_tasks[0]
             task_message = "Jobbing into task {0[content]!r} (id:{0[id]})"
@@ -1,7 +1,31 @@
 from .action_manager import HoudiniActionManager
+from .dir_listing_cache import DirListingCache
+from .dir_watcher import InotifyDirWatcher, PollingDirWatcher, create_dir_watcher
+from .lru_cache import LRUCache
 from .parm_template_wrappers import (
     Parm,
     ParmFolder,
     ParmGroup,
     wrap_node_parameter_group,
 )
+from .version_scanner import (
+    VERSION_TOKEN,
+    WILDCARD_TOKEN,
+    VersionScanner,
+    scan_versions,
+)
+from .rate_limiter import RateLimitedShotgun, TokenBucket
+from .resolution_daemon import (
+    ResolutionClient,
+    ResolutionDaemon,
+    SharedShotgun,
+    list_directory_shared,
+    resolution_daemon_supported,
+    resolution_socket_directory,
+    start_resolution_daemon,
+)
+from .resolution_manifest import ResolutionManifest
+from .shotgun_cache import CachedShotgun, ShotgunQueryCache
+from .template_formatter import TemplateFormatter
+from .version_index import VersionIndex
+from .worker_pool import WorkerPool
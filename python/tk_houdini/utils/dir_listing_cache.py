@@ -0,0 +1,134 @@
+import fnmatch
+import os
+import re
+import time
+
+from .lru_cache import LRUCache
+from .version_scanner import list_directory
+
+_MAGIC_REGEX = re.compile(r"[*?[]")
+
+
+class DirListingCache(object):
+    """
+    Cache of directory listings, validated against the directory's mtime.
+
+    A directory's mtime changes whenever an entry is added to, removed from
+    or renamed in it, so a listing stays valid for as long as the mtime is the
+    same. Listings of directories modified too recently to tell apart from a
+    later change within the file system's mtime resolution are not cached.
+    """
+
+    # seconds, covers coarse mtime resolutions e.g. FAT or some NFS servers
+    MTIME_RESOLUTION = 2.0
+
+    def __init__(self, max_size=None, timer=time.time, list_dir=None):
+        """
+        Initialise the class.
+
+        :param int max_size: The maximum number of listings to keep.
+            Unbounded if ``None`` or ``0``.
+        :param timer: Callable returning the current time in seconds.
+        :param list_dir: Callable used to list directories missing from the
+            cache. Defaults to :func:`list_directory`.
+        """
+        self._listings = LRUCache(max_size=max_size)
+        self._timer = timer
+        self._list_dir = list_dir or list_directory
+
+    @property
+    def hits(self):
+        return self._listings.hits
+
+    @property
+    def misses(self):
+        return self._listings.misses
+
+    def stats(self):
+        """
+        Get the cache statistics, see :meth:`LRUCache.stats`.
+
+        :rtype: dict
+        """
+        return self._listings.stats()
+
+    def clear(self):
+        """
+        Remove all the listings.
+        """
+        self._listings.clear()
+
+    def list_dir(self, directory):
+        """
+        List the entries of a directory, re-using the cached listing if the
+        directory has not been modified since.
+
+        :param str directory: The directory to list.
+
+        :returns: A list of tuples of the entry name and a callable returning
+            whether the entry is a directory. Empty if the directory can't be
+            listed.
+        """
+        directory = os.path.abspath(directory)
+        try:
+            mtime = os.stat(directory).st_mtime
+        except OSError:
+            self._listings.invalidate(directory)
+            return []
+
+        cached = self._listings.get(directory)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        entries = self._list_dir(directory)
+        if self._timer() - mtime > self.MTIME_RESOLUTION:
+            self._listings.set(directory, (mtime, entries))
+        else:
+            self._listings.invalidate(directory)
+        return entries
+
+    def glob(self, pattern):
+        """
+        Return the paths matching the pattern, like :func:`glob.glob`, listing
+        directories through the cache.
+
+        :param str pattern: The glob pattern.
+
+        :rtype: list(str)
+        """
+        components = re.split(r"[\\/]", pattern)
+        if not _MAGIC_REGEX.search(pattern):
+            return [pattern] if os.path.lexists(pattern) else []
+
+        index = 0
+        while not _MAGIC_REGEX.search(components[index]):
+            index += 1
+        root = "/".join(components[:index])
+        if not root:
+            root = "/" if pattern[:1] in ("/", "\\") else ""
+        elif root.endswith(":"):
+            root += "/"
+
+        paths = [root]
+        last = len(components) - 1
+        for position in range(index, len(components)):
+            component = components[position]
+            is_last = position == last
+            matched = []
+            for directory in paths:
+                if not _MAGIC_REGEX.search(component):
+                    path = os.path.join(directory, component)
+                    if os.path.lexists(path):
+                        matched.append(path)
+                    continue
+                show_hidden = component.startswith(".")
+                for name, is_dir in self.list_dir(directory or os.curdir):
+                    if name.startswith(".") and not show_hidden:
+                        continue
+                    if not fnmatch.fnmatch(name, component):
+                        continue
+                    if not is_last and not is_dir():
+                        continue
+                    matched.append(os.path.join(directory, name))
+            paths = matched
+        return paths
@@ -0,0 +1,246 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import sys
+
+
+class PollingDirWatcher(object):
+    """
+    Watch directories for entries being added or removed by polling their mtime.
+    """
+
+    def __init__(self):
+        """
+        Initialise the class.
+        """
+        self._mtimes = {}
+
+    @staticmethod
+    def _get_mtime(directory):
+        try:
+            return os.stat(directory).st_mtime
+        except OSError:
+            return None
+
+    @property
+    def directories(self):
+        """
+        The watched directories.
+
+        :rtype: list(str)
+        """
+        return list(self._mtimes)
+
+    def watch(self, directory):
+        """
+        Start watching the given directory.
+
+        :param str directory: The directory to watch.
+
+        :returns: Whether the directory is being watched.
+        :rtype: bool
+        """
+        if directory not in self._mtimes:
+            self._mtimes[directory] = self._get_mtime(directory)
+        return True
+
+    def unwatch(self, directory):
+        """
+        Stop watching the given directory.
+
+        :param str directory: The watched directory.
+        """
+        self._mtimes.pop(directory, None)
+
+    def poll(self):
+        """
+        Get the watched directories changed since last polled.
+
+        :rtype: set(str)
+        """
+        changed = set()
+        for directory, mtime in self._mtimes.items():
+            current = self._get_mtime(directory)
+            if current != mtime:
+                self._mtimes[directory] = current
+                changed.add(directory)
+        return changed
+
+    def close(self):
+        """
+        Stop watching all directories.
+        """
+        self._mtimes.clear()
+
+
+class InotifyDirWatcher(object):
+    """
+    Watch directories for entries being added or removed using Linux's inotify.
+
+    Directories that can't be watched by inotify, e.g. ones that don't exist
+    yet or once the user's watch limit is reached, are polled instead.
+    """
+
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_CLOEXEC = 0o2000000
+    IN_NONBLOCK = 0o4000
+
+    WATCH_MASK = (
+        IN_CREATE
+        | IN_DELETE
+        | IN_MOVED_FROM
+        | IN_MOVED_TO
+        | IN_DELETE_SELF
+        | IN_MOVE_SELF
+        | IN_ONLYDIR
+    )
+    EVENT_HEADER = struct.Struct("iIII")
+    READ_SIZE = 65536
+
+    def __init__(self):
+        """
+        Initialise the class.
+
+        :raises: :class:`OSError` if inotify is not available.
+        """
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._directories_by_wd = {}
+        self._wds = {}
+        self._polling = PollingDirWatcher()
+
+    @property
+    def directories(self):
+        """
+        The watched directories.
+
+        :rtype: list(str)
+        """
+        return list(self._wds) + self._polling.directories
+
+    def watch(self, directory):
+        """
+        Start watching the given directory.
+
+        :param str directory: The directory to watch.
+
+        :returns: Whether the directory is being watched.
+        :rtype: bool
+        """
+        if directory in self._wds:
+            return True
+        path = directory
+        if not isinstance(path, bytes):
+            path = path.encode(sys.getfilesystemencoding() or "utf-8")
+        wd = self._libc.inotify_add_watch(self._fd, path, self.WATCH_MASK)
+        if wd < 0:
+            return self._polling.watch(directory)
+        self._polling.unwatch(directory)
+        self._wds[directory] = wd
+        self._directories_by_wd.setdefault(wd, set()).add(directory)
+        return True
+
+    def unwatch(self, directory):
+        """
+        Stop watching the given directory.
+
+        :param str directory: The watched directory.
+        """
+        self._polling.unwatch(directory)
+        wd = self._wds.pop(directory, None)
+        if wd is None:
+            return
+        directories = self._directories_by_wd.get(wd, set())
+        directories.discard(directory)
+        if not directories:
+            self._directories_by_wd.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def _read_events(self):
+        """
+        Read all the pending events.
+
+        :rtype: bytes
+        """
+        chunks = []
+        while True:
+            try:
+                chunk = os.read(self._fd, self.READ_SIZE)
+            except OSError as error:
+                if error.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def poll(self):
+        """
+        Get the watched directories changed since last polled.
+
+        :rtype: set(str)
+        """
+        changed = self._polling.poll()
+        for directory in changed:
+            # watch directories that have since been created with inotify
+            self.watch(directory)
+        data = self._read_events()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size + length
+            if mask & self.IN_Q_OVERFLOW:
+                changed.update(self._wds)
+                continue
+            directories = self._directories_by_wd.get(wd, ())
+            changed.update(directories)
+            if mask & self.IN_IGNORED:
+                # the directory was removed, poll it in case it comes back
+                for directory in list(directories):
+                    self._wds.pop(directory, None)
+                    self._polling.watch(directory)
+                self._directories_by_wd.pop(wd, None)
+        return changed
+
+    def close(self):
+        """
+        Stop watching all directories.
+        """
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._wds.clear()
+        self._directories_by_wd.clear()
+        self._polling.close()
+
+
+def create_dir_watcher():
+    """
+    Create the best directory watcher available on this platform.
+
+    :returns: A :class:`InotifyDirWatcher` on Linux, otherwise a
+        :class:`PollingDirWatcher`.
+    """
+    try:
+        return InotifyDirWatcher()
+    except (OSError, AttributeError):
+        return PollingDirWatcher()
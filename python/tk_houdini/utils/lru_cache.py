@@ -0,0 +1,115 @@
+import collections
+import threading
+import time
+
+
+class LRUCache(object):
+    """
+    A thread safe, least recently used cache with an optional time to live.
+
+    Hits and misses are counted so the cache can be tuned.
+    """
+
+    def __init__(self, max_size=None, ttl=None, timer=time.time):
+        """
+        Initialise the class.
+
+        :param int max_size: The maximum number of entries to keep.
+            Unbounded if ``None`` or ``0``.
+        :param float ttl: The number of seconds entries are valid for.
+            Entries never expire if ``None`` or ``0``.
+        :param timer: Callable returning the current time in seconds.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._timer = timer
+        self._entries = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._expired(entry)
+
+    def _expired(self, entry):
+        """
+        Check if the given entry has outlived the time to live.
+
+        :param tuple entry: The time the value was stored and the value.
+
+        :rtype: bool
+        """
+        return bool(self.ttl) and self._timer() - entry[0] > self.ttl
+
+    def get(self, key, default=None):
+        """
+        Get the value stored for the given key, counting the hit or miss.
+
+        :param key: The key to look up.
+        :param default: The value to return on a miss.
+
+        :returns: The stored value or the default.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or self._expired(entry):
+                self.misses += 1
+                return default
+            # re-insert to mark as most recently used
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        """
+        Store the value for the given key, evicting the least recently used
+        entries when full.
+
+        :param key: The key to store the value under.
+        :param value: The value to store.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self._timer(), value)
+            if self.max_size:
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """
+        Remove the given key from the cache, if stored.
+
+        :param key: The key to remove.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Remove all the entries and reset the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Get the cache statistics.
+
+        :returns: A :class:`dict` containing the ``hits``, ``misses``,
+            ``hit_rate`` and current ``size``.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": float(self.hits) / lookups if lookups else 0.0,
+                "size": len(self._entries),
+            }
@@ -0,0 +1,169 @@
+import functools
+import random
+import threading
+import time
+
+
+class TokenBucket(object):
+    """
+    Thread safe token bucket, limiting calls to ``rate`` per second on average
+    while allowing bursts of up to ``burst`` calls.
+    """
+
+    def __init__(self, rate, burst=1, timer=time.time, sleep=time.sleep):
+        """
+        Initialise the class.
+
+        :param float rate: The number of tokens added per second.
+        :param int burst: The maximum number of tokens stored.
+        :param timer: Callable returning the current time in seconds.
+        :param sleep: Callable waiting for a number of seconds.
+        """
+        self.rate = float(rate)
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._timer = timer
+        self._sleep = sleep
+        self._updated = timer()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take a token, waiting for one to be added if there are none left.
+
+        Tokens are reserved before waiting, so that concurrent callers wait in
+        turn rather than all at once.
+
+        :returns: The number of seconds waited.
+        :rtype: float
+        """
+        with self._lock:
+            now = self._timer()
+            elapsed = max(0.0, now - self._updated)
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            wait = -self._tokens / self.rate
+        self._sleep(wait)
+        return wait
+
+
+class RateLimitedShotgun(object):
+    """
+    Shotgun connection whose calls are throttled by a :class:`TokenBucket`,
+    with read-only calls retried on transient errors after an exponential
+    backoff with full jitter, so that processes starting together spread
+    their retries out.
+
+    Counts the calls throttled and retried and the time spent waiting.
+    """
+
+    # calls that are safe to retry
+    READ_METHODS = frozenset(
+        [
+            "find",
+            "find_one",
+            "summarize",
+            "text_search",
+            "schema_read",
+            "schema_entity_read",
+            "schema_field_read",
+            "info",
+        ]
+    )
+
+    def __init__(
+        self,
+        get_connection,
+        bucket=None,
+        retries=0,
+        backoff=1.0,
+        max_backoff=30.0,
+        retry_errors=(IOError,),
+        sleep=time.sleep,
+        random=random.random,
+    ):
+        """
+        Initialise the class.
+
+        :param get_connection: Callable returning the Shotgun connection to
+            call, called from the thread calling.
+        :param bucket: The :class:`TokenBucket` throttling the calls, if any.
+        :param int retries: The number of times read-only calls are retried.
+        :param float backoff: The number of seconds the first retry waits for
+            at most, doubled for every other retry.
+        :param float max_backoff: The maximum number of seconds to wait for.
+        :param tuple retry_errors: The exception types to retry calls on.
+        :param sleep: Callable waiting for a number of seconds.
+        :param random: Callable returning a random float in ``[0, 1)``.
+        """
+        self.bucket = bucket
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.calls = 0
+        self.throttled = 0
+        self.retried = 0
+        self.wait_time = 0.0
+        self._get_connection = get_connection
+        self._retry_errors = tuple(retry_errors)
+        self._sleep = sleep
+        self._random = random
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attribute = getattr(self._get_connection(), name)
+        if name.startswith("_") or not callable(attribute):
+            return attribute
+        retries = self.retries if name in self.READ_METHODS else 0
+        return functools.partial(self._call, name, retries)
+
+    def _count(self, throttled=0, retried=0, wait_time=0.0):
+        with self._lock:
+            self.throttled += throttled
+            self.retried += retried
+            self.wait_time += wait_time
+
+    def _call(self, name, retries, *args, **kwargs):
+        """
+        Call a method of the connection, throttled and retried.
+
+        :param str name: The name of the method.
+        :param int retries: The number of times to retry the call.
+        """
+        with self._lock:
+            self.calls += 1
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                waited = self.bucket.acquire()
+                if waited:
+                    self._count(throttled=1, wait_time=waited)
+            try:
+                return getattr(self._get_connection(), name)(*args, **kwargs)
+            except self._retry_errors:
+                if attempt >= retries:
+                    raise
+            delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+            delay *= self._random()
+            attempt += 1
+            self._count(retried=1, wait_time=delay)
+            self._sleep(delay)
+
+    def stats(self):
+        """
+        Get the throttling statistics.
+
+        :returns: A :class:`dict` containing the number of ``calls``, of calls
+            ``throttled`` by the bucket, of ``retried`` calls and the total
+            ``wait_time`` in seconds.
+        """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "throttled": self.throttled,
+                "retried": self.retried,
+                "wait_time": self.wait_time,
+            }
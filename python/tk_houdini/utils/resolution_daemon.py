@@ -0,0 +1,703 @@
+import errno
+import json
+import os
+import socket
+import stat
+import struct
+import tempfile
+import threading
+import time
+
+from .dir_listing_cache import DirListingCache
+from .version_scanner import list_directory
+
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None
+
+
+def resolution_daemon_supported():
+    """
+    Check if the resolution daemon can run on this platform, i.e. it has
+    Unix domain sockets and file locks.
+
+    :rtype: bool
+    """
+    return hasattr(socket, "AF_UNIX") and fcntl is not None
+
+
+def _is_private_directory(directory):
+    """
+    Check if a directory belongs to the current user and no one else can
+    create or replace files in it.
+
+    :param str directory: The directory.
+
+    :rtype: bool
+    """
+    try:
+        status = os.lstat(directory)
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(status.st_mode)
+        and status.st_uid == os.getuid()
+        and not status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    )
+
+
+def resolution_socket_directory():
+    """
+    Get the private directory of the current user to put daemon sockets in.
+
+    ``$XDG_RUNTIME_DIR`` is used when set, otherwise a ``tk-houdini-<uid>``
+    directory is created with mode 0700 in the temporary directory.
+
+    :returns: The directory, or ``None`` if it isn't private to the user,
+        e.g. another user created it first.
+    :rtype: str
+    """
+    runtime_directory = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_directory and _is_private_directory(runtime_directory):
+        return runtime_directory
+    directory = os.path.join(tempfile.gettempdir(), "tk-houdini-{}".format(os.getuid()))
+    try:
+        os.mkdir(directory, 0o700)
+    except OSError as error:
+        if error.errno != errno.EEXIST:
+            return None
+    if _is_private_directory(directory):
+        return directory
+    return None
+
+
+def _check_socket_path(path, must_exist=True):
+    """
+    Check that a socket path can be trusted: its directory is private to the
+    current user, and the socket, if any, is owned by them.
+
+    :param str path: The path of the socket.
+    :param bool must_exist: Whether the socket has to exist.
+
+    :raises: :class:`socket.error` if the path can't be trusted.
+    """
+    if not _is_private_directory(os.path.dirname(os.path.abspath(path))):
+        raise socket.error(
+            errno.EACCES, "Socket directory isn't private to the user", path
+        )
+    try:
+        status = os.lstat(path)
+    except OSError:
+        if must_exist:
+            raise socket.error(errno.ENOENT, "No socket", path)
+        return
+    if not stat.S_ISSOCK(status.st_mode) or status.st_uid != os.getuid():
+        raise socket.error(errno.EACCES, "Socket isn't owned by the user", path)
+
+
+def _peer_uid(connection):
+    """
+    Get the user id of the process at the other end of a Unix domain socket.
+
+    :param connection: A connected :class:`socket.socket`.
+
+    :returns: The user id, or ``None`` where ``SO_PEERCRED`` isn't available.
+    :rtype: int
+    """
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    size = struct.calcsize("3i")
+    credentials = connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, size)
+    _, uid, _ = struct.unpack("3i", credentials)
+    return uid
+
+
+def _is_trusted_peer(connection):
+    """
+    Check if the process at the other end of a Unix domain socket runs as the
+    current user. Without ``SO_PEERCRED`` only the socket path is checked,
+    see :func:`_check_socket_path`.
+
+    :param connection: A connected :class:`socket.socket`.
+
+    :rtype: bool
+    """
+    uid = _peer_uid(connection)
+    return uid is None or uid == os.getuid()
+
+
+def _connect(path, timeout):
+    """
+    Connect to the daemon serving at a socket path, if it can be trusted.
+
+    :param str path: The path of the socket.
+    :param float timeout: The timeout of the connection.
+
+    :raises: :class:`socket.error` if the daemon can't be reached or trusted.
+
+    :rtype: :class:`socket.socket`
+    """
+    _check_socket_path(path)
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.settimeout(timeout)
+    try:
+        connection.connect(path)
+        if not _is_trusted_peer(connection):
+            raise socket.error(errno.EACCES, "Daemon isn't run by the user", path)
+    except socket.error:
+        connection.close()
+        raise
+    return connection
+
+
+def _encode(message):
+    return json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _decode(line):
+    if not line:
+        raise ValueError("Connection closed")
+    return json.loads(line.decode("utf-8"))
+
+
+class ResolutionDaemon(object):
+    """
+    Local server deduplicating identical queries made by the processes of a
+    machine, over a Unix domain socket.
+
+    The daemon doesn't query anything itself. The first client asking for a
+    key is told to lead: it runs the query and sends the result back, while
+    clients asking for the same key in the meantime wait for it. Results are
+    then served to other clients for ``ttl`` seconds. Clients run by other
+    users are turned away.
+
+    One request per line, as JSON::
+
+        {"op": "get", "key": "..."} -> {"status": "hit", "value": ...}
+                                     | {"status": "lead"}
+                                     | {"status": "miss"}
+        {"op": "put", "key": "...", "value": ...} -> {"status": "ok"}
+        {"op": "fail", "key": "..."} -> {"status": "ok"}
+        {"op": "drop", "key": "..."} -> {"status": "ok"}
+
+    ``miss`` is returned if the leader takes longer than ``wait_timeout``, in
+    which case the client queries directly.
+    """
+
+    ACCEPT_TIMEOUT = 0.5
+
+    def __init__(self, path, ttl=60, wait_timeout=60, max_results=10000):
+        """
+        Initialise the class.
+
+        :param str path: The path of the socket.
+        :param float ttl: The number of seconds results are served for.
+        :param float wait_timeout: The number of seconds clients wait for the
+            leader of a key.
+        :param int max_results: The maximum number of results to keep.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self.max_results = max_results
+        self._results = {}
+        self._leaders = set()
+        self._condition = threading.Condition()
+        self._socket = None
+        self._thread = None
+        self._lock_file = None
+        self._closed = threading.Event()
+
+    def start(self, lock_file=None):
+        """
+        Bind the socket and serve clients on a background thread.
+
+        :param lock_file: The open lock file held while serving, if any.
+
+        :raises: :class:`socket.error` if the socket can't be bound.
+        """
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            server.bind(self.path)
+            os.chmod(self.path, 0o600)
+            server.listen(64)
+        except socket.error:
+            server.close()
+            raise
+        server.settimeout(self.ACCEPT_TIMEOUT)
+        self._socket = server
+        self._lock_file = lock_file
+        self._thread = threading.Thread(
+            target=self._serve, name=self.__class__.__name__
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def close(self):
+        """
+        Stop serving clients and remove the socket.
+        """
+        if self._socket is None:
+            return
+        self._closed.set()
+        self._thread.join()
+        self._socket.close()
+        self._socket = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _serve(self):
+        """
+        Accept clients until closed, handling each on its own thread.
+        """
+        while not self._closed.is_set():
+            try:
+                connection, _ = self._socket.accept()
+            except socket.timeout:
+                continue
+            except socket.error:
+                return
+            if not _is_trusted_peer(connection):
+                connection.close()
+                continue
+            connection.settimeout(None)
+            thread = threading.Thread(target=self._handle, args=(connection,))
+            thread.daemon = True
+            thread.start()
+
+    def _handle(self, connection):
+        """
+        Answer the requests of a client until it disconnects, releasing the
+        keys it was leading.
+
+        :param connection: The client's :class:`socket.socket`.
+        """
+        stream = connection.makefile("rwb")
+        leading = set()
+        try:
+            for line in stream:
+                request = _decode(line)
+                key = request.get("key")
+                operation = request.get("op")
+                if operation == "get":
+                    response = self._get(key, leading)
+                elif operation == "put":
+                    self._put(key, request.get("value"), leading)
+                    response = {"status": "ok"}
+                elif operation == "fail":
+                    self._release(key, leading)
+                    response = {"status": "ok"}
+                elif operation == "drop":
+                    with self._condition:
+                        self._results.pop(key, None)
+                    response = {"status": "ok"}
+                else:
+                    response = {"status": "error"}
+                stream.write(_encode(response))
+                stream.flush()
+        except (socket.error, ValueError):
+            pass
+        finally:
+            for key in list(leading):
+                self._release(key, leading)
+            try:
+                stream.close()
+            except socket.error:
+                pass
+            connection.close()
+
+    def _get(self, key, leading):
+        """
+        Get the result of a key, waiting for its leader if there is one,
+        otherwise making the client its leader.
+
+        :param str key: The key.
+        :param set leading: The keys led by the client.
+
+        :rtype: dict
+        """
+        deadline = time.time() + self.wait_timeout
+        with self._condition:
+            while True:
+                entry = self._results.get(key)
+                if entry is not None and time.time() - entry[0] <= self.ttl:
+                    return {"status": "hit", "value": entry[1]}
+                if key not in self._leaders:
+                    self._leaders.add(key)
+                    leading.add(key)
+                    return {"status": "lead"}
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return {"status": "miss"}
+                self._condition.wait(remaining)
+
+    def _put(self, key, value, leading):
+        """
+        Store the result of a key led by the client, waking up its waiters.
+
+        :param str key: The key.
+        :param value: The result.
+        :param set leading: The keys led by the client.
+        """
+        with self._condition:
+            now = time.time()
+            self._results[key] = (now, value)
+            if len(self._results) > self.max_results:
+                # drop expired results, then the oldest
+                for stored_key, entry in list(self._results.items()):
+                    if now - entry[0] > self.ttl:
+                        del self._results[stored_key]
+                by_age = sorted(self._results, key=lambda k: self._results[k][0])
+                for stored_key in by_age[: len(by_age) - self.max_results]:
+                    del self._results[stored_key]
+            self._release(key, leading)
+
+    def _release(self, key, leading):
+        """
+        Stop the client leading a key, letting a waiter take over if no result
+        was stored.
+
+        :param str key: The key.
+        :param set leading: The keys led by the client.
+        """
+        with self._condition:
+            if key in leading:
+                leading.discard(key)
+                self._leaders.discard(key)
+            self._condition.notify_all()
+
+
+def _is_serving(path):
+    """
+    Check if a daemon of the current user is serving at the socket path.
+
+    :param str path: The path of the socket.
+
+    :rtype: bool
+    """
+    try:
+        _connect(path, None).close()
+    except socket.error:
+        return False
+    return True
+
+
+def start_resolution_daemon(path, **kwargs):
+    """
+    Start a daemon serving at the socket path in this process, unless one
+    already is in another.
+
+    A lock file next to the socket makes sure only one process starts it, a
+    socket left behind by a process that died is replaced. Nothing is served
+    unless the socket's directory is private to the current user and any
+    existing socket is owned by them, see :func:`resolution_socket_directory`.
+
+    :param str path: The path of the socket.
+    :param kwargs: The keyword arguments of :class:`ResolutionDaemon`.
+
+    :returns: The started daemon, or ``None``.
+    :rtype: :class:`ResolutionDaemon`
+    """
+    if not resolution_daemon_supported() or _is_serving(path):
+        return None
+    try:
+        _check_socket_path(path, must_exist=False)
+    except socket.error:
+        return None
+    lock_file = open(path + ".lock", "a")
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except (IOError, OSError):
+        # another process is serving or starting to
+        lock_file.close()
+        return None
+    try:
+        try:
+            os.remove(path)
+        except OSError as error:
+            if error.errno != errno.ENOENT:
+                raise
+        daemon = ResolutionDaemon(path, **kwargs)
+        daemon.start(lock_file=lock_file)
+    except (socket.error, OSError):
+        lock_file.close()
+        return None
+    return daemon
+
+
+class ResolutionClient(object):
+    """
+    Client of a :class:`ResolutionDaemon`, running queries directly whenever
+    the daemon can't be reached, or isn't run by the current user.
+    """
+
+    RESTART_INTERVAL = 10.0
+
+    def __init__(self, path, timeout=120, start_daemon=None):
+        """
+        Initialise the class.
+
+        :param str path: The path of the daemon's socket.
+        :param float timeout: The number of seconds to wait for the daemon.
+        :param start_daemon: Callable starting the daemon, called at most every
+            :attr:`RESTART_INTERVAL` seconds when it can't be reached.
+        """
+        self.path = path
+        self.timeout = timeout
+        self.hits = 0
+        self.leads = 0
+        self.fallbacks = 0
+        self._start_daemon = start_daemon
+        self._started = None
+
+    @staticmethod
+    def get_key(parts):
+        """
+        Get the key of a query.
+
+        :param list parts: The JSON serialisable parts identifying the query.
+
+        :returns: The key, or ``None`` if the parts can't be serialised.
+        :rtype: str
+        """
+        try:
+            return json.dumps(parts, sort_keys=True, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return None
+
+    def _connect(self):
+        """
+        Connect to the daemon, trying to start it if it can't be reached.
+
+        :raises: :class:`socket.error` if the daemon can't be reached.
+
+        :rtype: :class:`socket.socket`
+        """
+        try:
+            return self._open()
+        except socket.error:
+            now = time.time()
+            if self._start_daemon is None or (
+                self._started is not None
+                and now - self._started < self.RESTART_INTERVAL
+            ):
+                raise
+            self._started = now
+            self._start_daemon()
+            return self._open()
+
+    def _open(self):
+        return _connect(self.path, self.timeout)
+
+    @staticmethod
+    def _request(stream, message):
+        stream.write(_encode(message))
+        stream.flush()
+        return _decode(stream.readline())
+
+    def resolve(self, parts, func, *args):
+        """
+        Get the result of a query from the daemon, running it if this client
+        leads it or the daemon can't be reached.
+
+        Results go through JSON, so tuples come back as lists.
+
+        :param list parts: The JSON serialisable parts identifying the query.
+        :param func: The function running the query.
+        :param args: The arguments to call the function with.
+
+        :returns: The result of the query.
+        """
+        key = self.get_key(parts)
+        if key is None or not resolution_daemon_supported():
+            return func(*args)
+        try:
+            connection = self._connect()
+        except socket.error:
+            self.fallbacks += 1
+            return func(*args)
+
+        stream = connection.makefile("rwb")
+        try:
+            try:
+                response = self._request(stream, {"op": "get", "key": key})
+            except (socket.error, ValueError):
+                response = {}
+            status = response.get("status")
+            if status == "hit":
+                self.hits += 1
+                return response.get("value")
+            if status != "lead":
+                self.fallbacks += 1
+                return func(*args)
+
+            self.leads += 1
+            try:
+                result = func(*args)
+            except Exception:
+                self._send_quietly(stream, {"op": "fail", "key": key})
+                raise
+            message = {"op": "put", "key": key, "value": result}
+            try:
+                json.dumps(message)
+            except (TypeError, ValueError):
+                message = {"op": "fail", "key": key}
+            self._send_quietly(stream, message)
+            return result
+        finally:
+            try:
+                stream.close()
+            except socket.error:
+                pass
+            connection.close()
+
+    def invalidate(self, parts):
+        """
+        Drop the result of a query served by the daemon, if it can be reached.
+
+        :param list parts: The JSON serialisable parts identifying the query.
+        """
+        key = self.get_key(parts)
+        if key is None or not resolution_daemon_supported():
+            return
+        try:
+            connection = self._open()
+        except socket.error:
+            return
+        stream = connection.makefile("rwb")
+        try:
+            self._send_quietly(stream, {"op": "drop", "key": key})
+        finally:
+            try:
+                stream.close()
+            except socket.error:
+                pass
+            connection.close()
+
+    def _send_quietly(self, stream, message):
+        try:
+            self._request(stream, message)
+        except (socket.error, ValueError):
+            pass
+
+    def stats(self):
+        """
+        Get the client statistics.
+
+        :returns: A :class:`dict` containing the ``hits``, ``leads`` and
+            ``fallbacks``.
+        """
+        return {"hits": self.hits, "leads": self.leads, "fallbacks": self.fallbacks}
+
+
+class SharedShotgun(object):
+    """
+    Shotgun connection whose ``find`` and ``find_one`` queries go through a
+    :class:`ResolutionClient`, other attributes are the connection's.
+    """
+
+    def __init__(self, get_connection, client):
+        """
+        Initialise the class.
+
+        :param get_connection: Callable returning the Shotgun connection to
+            query with, called from the thread querying.
+        :param client: The :class:`ResolutionClient` to use.
+        """
+        self.client = client
+        self._get_connection = get_connection
+
+    def __getattr__(self, name):
+        return getattr(self._get_connection(), name)
+
+    def find(self, entity_type, *args, **kwargs):
+        """
+        Shared :meth:`shotgun_api3.Shotgun.find`.
+        """
+        return self._resolve("find", entity_type, args, kwargs)
+
+    def find_one(self, entity_type, *args, **kwargs):
+        """
+        Shared :meth:`shotgun_api3.Shotgun.find_one`.
+        """
+        return self._resolve("find_one", entity_type, args, kwargs)
+
+    def invalidate(self, method, entity_type, *args, **kwargs):
+        """
+        Drop the shared result of a query, so that it's queried next time.
+
+        :param str method: The name of the query method, e.g. ``"find"``.
+        :param str entity_type: The queried entity type.
+        """
+        self.client.invalidate(self._key_parts(method, entity_type, args, kwargs))
+
+    def _resolve(self, method, entity_type, args, kwargs):
+        parts = self._key_parts(method, entity_type, args, kwargs)
+        return self.client.resolve(
+            parts, self._query, method, entity_type, args, kwargs
+        )
+
+    def _key_parts(self, method, entity_type, args, kwargs):
+        """
+        Get the parts of the key a query is shared under, which includes the
+        site and the login queried as, so that sessions of other sites or
+        users never get each other's results.
+        """
+        connection = self._get_connection()
+        config = getattr(connection, "config", None)
+        login = None
+        for attr in ("sudo_as_login", "user_login", "script_name"):
+            login = getattr(config, attr, None)
+            if login:
+                break
+        return [
+            "shotgun",
+            getattr(connection, "base_url", None),
+            login,
+            method,
+            entity_type,
+            list(args),
+            kwargs,
+        ]
+
+    def _query(self, method, entity_type, args, kwargs):
+        connection = self._get_connection()
+        return getattr(connection, method)(entity_type, *args, **kwargs)
+
+
+def _constant(value):
+    return lambda: value
+
+
+def list_directory_shared(client, directory):
+    """
+    List the entries of a directory through a :class:`ResolutionClient`, see
+    :func:`list_directory`.
+
+    Listings are shared for as long as the directory's mtime is the same,
+    directories modified too recently to tell changes apart are listed directly.
+
+    :param client: The :class:`ResolutionClient` to use.
+    :param str directory: The directory to list.
+
+    :returns: A list of tuples of the entry name and a callable returning
+        whether the entry is a directory.
+    """
+    try:
+        mtime = os.stat(directory).st_mtime
+    except OSError:
+        return []
+    if time.time() - mtime <= DirListingCache.MTIME_RESOLUTION:
+        return list_directory(directory)
+
+    def list_entries():
+        return [(name, is_dir()) for name, is_dir in list_directory(directory)]
+
+    entries = client.resolve(["listdir", directory, mtime], list_entries)
+    return [(name, _constant(is_dir)) for name, is_dir in entries]
@@ -0,0 +1,169 @@
+import json
+import os
+import tempfile
+
+
+def _freeze(value):
+    """
+    Convert the lists of a JSON value to tuples, recursively, so that it can
+    be compared to or used as a hashable key.
+
+    :param value: The JSON value.
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class ResolutionManifest(object):
+    """
+    Snapshot of the paths the sgtk nodes of a hip file were resolved to.
+
+    It is written next to the hip file, see :meth:`get_path`, so that the
+    input and output paths, publishes and versions can be read without
+    Houdini or Shotgun. Entries are stored by node path::
+
+        {
+            "version": 1,
+            "hip": "/path/to/scene.hip",
+            "nodes": {
+                "/obj/geo1/alembic1": {
+                    "node_type": "Sop/alembic",
+                    "inputs": ["/path/to/cache.abc"],
+                    "publish": {"key": [...], "id": 123, ...},
+                    ...
+                },
+            },
+        }
+    """
+
+    VERSION = 1
+    SUFFIX = ".sgtk.json"
+
+    def __init__(self, hip_path=None, nodes=None):
+        """
+        Initialise the class.
+
+        :param str hip_path: The path of the hip file.
+        :param dict nodes: The entries of the sgtk nodes, by node path.
+        """
+        self.hip_path = hip_path
+        self.nodes = dict(nodes or {})
+        self._rows_by_key = None
+
+    @classmethod
+    def get_path(cls, hip_path):
+        """
+        Get the path of the manifest of a hip file.
+
+        :param str hip_path: The path of the hip file.
+
+        :rtype: str
+        """
+        return hip_path + cls.SUFFIX
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a manifest file.
+
+        :param str path: The path of the manifest.
+
+        :raises: :class:`IOError` if the file can't be read or
+            :class:`ValueError` if it isn't a supported manifest.
+
+        :rtype: :class:`ResolutionManifest`
+        """
+        with open(path) as manifest_file:
+            data = json.load(manifest_file)
+        if not isinstance(data, dict) or data.get("version") != cls.VERSION:
+            raise ValueError("Unsupported resolution manifest: {}".format(path))
+        return cls(hip_path=data.get("hip"), nodes=data.get("nodes"))
+
+    def save(self, path):
+        """
+        Write the manifest file, replacing it atomically so that readers never
+        see a partially written file.
+
+        :param str path: The path of the manifest.
+        """
+        data = {"version": self.VERSION, "hip": self.hip_path, "nodes": self.nodes}
+        directory = os.path.dirname(path) or os.curdir
+        handle, temp_path = tempfile.mkstemp(
+            prefix=".", suffix=self.SUFFIX, dir=directory
+        )
+        try:
+            with os.fdopen(handle, "w") as manifest_file:
+                json.dump(data, manifest_file, sort_keys=True, separators=(",", ":"))
+            # mkstemp only lets the owner read the file
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp_path, 0o666 & ~umask)
+            if hasattr(os, "replace"):
+                os.replace(temp_path, path)
+            else:
+                # python 2 can't atomically replace files on Windows
+                if os.name == "nt" and os.path.exists(path):
+                    os.remove(path)
+                os.rename(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def add_node(self, node_path, entry):
+        """
+        Add the entry of an sgtk node.
+
+        :param str node_path: The path of the node.
+        :param dict entry: The node's entry.
+        """
+        self.nodes[node_path] = entry
+        self._rows_by_key = None
+
+    def find_publishes(self, publish_key):
+        """
+        Get the ``PublishedFile`` rows recorded for a publish key, i.e. the
+        publish each import node was resolved to.
+
+        :param tuple publish_key: The key of the publish history, see
+            ``ImportNodeHandler._get_publish_key``.
+
+        :rtype: list(dict)
+        """
+        if self._rows_by_key is None:
+            self._rows_by_key = {}
+            for entry in self.nodes.values():
+                publish = entry.get("publish")
+                if publish:
+                    row = dict(publish)
+                    rows = self._rows_by_key.setdefault(_freeze(row.pop("key")), [])
+                    if row not in rows:
+                        rows.append(row)
+        return list(self._rows_by_key.get(_freeze(publish_key), []))
+
+    def input_paths(self):
+        """
+        Get the input paths of all the sgtk nodes.
+
+        :rtype: list(str)
+        """
+        paths = []
+        for entry in self.nodes.values():
+            paths.extend(entry.get("inputs", []))
+        return paths
+
+    def output_paths(self):
+        """
+        Get the output paths of all the sgtk nodes.
+
+        :rtype: list(str)
+        """
+        paths = []
+        for entry in self.nodes.values():
+            entry_paths = [entry.get("output_path")]
+            entry_paths.extend(item["path"] for item in entry.get("outputs", []))
+            for path in entry_paths:
+                if path and path not in paths:
+                    paths.append(path)
+        return paths
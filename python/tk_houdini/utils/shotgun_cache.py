@@ -0,0 +1,362 @@
+import errno
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class ShotgunQueryCache(object):
+    """
+    Cache of Shotgun query results in an SQLite database, shared by every
+    session using the same file.
+
+    The database is written in WAL mode so that sessions reading it don't
+    block each other or the one writing. Results are cached by entity type:
+    they are fresh for the entity type's time to live, then stale for
+    ``max_stale`` seconds, during which they may still be used while being
+    queried again, see :class:`CachedShotgun`.
+
+    Only queries and results that can be stored as JSON are cached.
+    """
+
+    TABLE = "queries_v1"
+    BUSY_TIMEOUT = 5.0
+
+    def __init__(self, path, ttls, max_stale=0, timer=time.time):
+        """
+        Initialise the class.
+
+        :param str path: The path of the database, created if missing.
+        :param dict ttls: The number of seconds results are fresh for, by
+            entity type. Queries of other entity types aren't cached.
+        :param float max_stale: The number of seconds results may be used for
+            once no longer fresh.
+        :param timer: Callable returning the current time in seconds.
+        """
+        self.path = path
+        self.ttls = dict(ttls)
+        self.max_stale = max_stale
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._timer = timer
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(method, entity_type, args, kwargs):
+        """
+        Get the key a query is cached under.
+
+        :param str method: The name of the query method, e.g. ``"find"``.
+        :param str entity_type: The queried entity type.
+        :param tuple args: The other positional arguments of the query.
+        :param dict kwargs: The keyword arguments of the query.
+
+        :returns: The key, or ``None`` if the query can't be cached.
+        :rtype: str
+        """
+        try:
+            return json.dumps(
+                [method, entity_type, list(args), kwargs],
+                sort_keys=True,
+                separators=(",", ":"),
+            )
+        except (TypeError, ValueError):
+            return None
+
+    def is_cached(self, entity_type):
+        """
+        Check if queries of the entity type are cached.
+
+        :param str entity_type: The entity type.
+
+        :rtype: bool
+        """
+        return entity_type in self.ttls
+
+    def _connect(self):
+        """
+        Get the connection of the current thread, as SQLite connections can't
+        be shared by threads.
+
+        :rtype: :class:`sqlite3.Connection`
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            return connection
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError as error:
+                if error.errno != errno.EEXIST:
+                    raise
+        connection = sqlite3.connect(
+            self.path,
+            timeout=self.BUSY_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS {} ("
+                "key TEXT PRIMARY KEY, "
+                "entity_type TEXT NOT NULL, "
+                "stored REAL NOT NULL, "
+                "result TEXT NOT NULL)".format(self.TABLE)
+            )
+        except sqlite3.Error:
+            connection.close()
+            raise
+        self._local.connection = connection
+        with self._lock:
+            self._connections.append(connection)
+        return connection
+
+    def get(self, entity_type, key):
+        """
+        Get the cached result of a query.
+
+        :param str entity_type: The queried entity type.
+        :param str key: The key of the query, see :meth:`get_key`.
+
+        :returns: A tuple of the result and whether it's fresh, or ``None``
+            if no result can be used.
+        :rtype: tuple
+        """
+        ttl = self.ttls.get(entity_type)
+        if ttl is None:
+            return None
+        try:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT stored, result FROM {} WHERE key = ?".format(self.TABLE),
+                    (key,),
+                )
+                .fetchone()
+            )
+        except sqlite3.Error:
+            self.errors += 1
+            row = None
+        if row is not None:
+            age = self._timer() - row[0]
+            if 0 <= age <= ttl:
+                self.hits += 1
+                return json.loads(row[1]), True
+            if 0 <= age <= ttl + self.max_stale:
+                self.stale_hits += 1
+                return json.loads(row[1]), False
+        self.misses += 1
+        return None
+
+    def set(self, entity_type, key, result):
+        """
+        Store the result of a query, unless it can't be stored as JSON.
+
+        :param str entity_type: The queried entity type.
+        :param str key: The key of the query, see :meth:`get_key`.
+        :param result: The result of the query.
+        """
+        if entity_type not in self.ttls:
+            return
+        try:
+            data = json.dumps(result, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return
+        try:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO {} (key, entity_type, stored, result) "
+                "VALUES (?, ?, ?, ?)".format(self.TABLE),
+                (key, entity_type, self._timer(), data),
+            )
+        except sqlite3.Error:
+            self.errors += 1
+
+    def invalidate(self, key):
+        """
+        Remove the cached result of a query.
+
+        :param str key: The key of the query, see :meth:`get_key`.
+        """
+        try:
+            self._connect().execute(
+                "DELETE FROM {} WHERE key = ?".format(self.TABLE), (key,)
+            )
+        except sqlite3.Error:
+            self.errors += 1
+
+    def invalidate_entity_type(self, entity_type):
+        """
+        Remove the cached results of all the queries of an entity type.
+
+        :param str entity_type: The queried entity type.
+        """
+        try:
+            self._connect().execute(
+                "DELETE FROM {} WHERE entity_type = ?".format(self.TABLE),
+                (entity_type,),
+            )
+        except sqlite3.Error:
+            self.errors += 1
+
+    def prune(self):
+        """
+        Remove the results too old to be used.
+        """
+        try:
+            connection = self._connect()
+            for entity_type, ttl in self.ttls.items():
+                connection.execute(
+                    "DELETE FROM {} WHERE entity_type = ? AND stored < ?".format(
+                        self.TABLE
+                    ),
+                    (entity_type, self._timer() - ttl - self.max_stale),
+                )
+        except sqlite3.Error:
+            self.errors += 1
+
+    def close(self):
+        """
+        Close the connections of all the threads.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    def stats(self):
+        """
+        Get the cache statistics.
+
+        :returns: A :class:`dict` containing the ``hits``, ``stale_hits``,
+            ``misses``, ``errors`` and ``hit_rate``, counting stale hits.
+        """
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": (
+                float(self.hits + self.stale_hits) / lookups if lookups else 0.0
+            ),
+        }
+
+
+class CachedShotgun(object):
+    """
+    Shotgun connection whose ``find`` and ``find_one`` queries go through a
+    :class:`ShotgunQueryCache`, other attributes are the connection's.
+
+    Stale results are returned straight away while the query runs again in
+    the background, if a revalidator is given, otherwise they are queried.
+    Whoever used a stale result is told when it turns out to have changed
+    through ``on_revalidated``.
+    """
+
+    def __init__(self, get_connection, cache, revalidate=None, on_revalidated=None):
+        """
+        Initialise the class.
+
+        :param get_connection: Callable returning the Shotgun connection to
+            query with, called from the thread querying.
+        :param cache: The :class:`ShotgunQueryCache` to use.
+        :param revalidate: Callable taking a key, a function, its arguments and
+            a callback for its result, running the function in the background
+            e.g. :meth:`WorkerPool.submit`.
+        :param on_revalidated: Callable taking the queried entity type, called
+            through the revalidator's callback when a stale result was replaced
+            by a different one.
+        """
+        self.cache = cache
+        self._get_connection = get_connection
+        self._revalidate = revalidate
+        self._on_revalidated = on_revalidated
+
+    def __getattr__(self, name):
+        return getattr(self._get_connection(), name)
+
+    def find(self, entity_type, *args, **kwargs):
+        """
+        Cached :meth:`shotgun_api3.Shotgun.find`.
+        """
+        return self._query("find", entity_type, args, kwargs)
+
+    def find_one(self, entity_type, *args, **kwargs):
+        """
+        Cached :meth:`shotgun_api3.Shotgun.find_one`.
+        """
+        return self._query("find_one", entity_type, args, kwargs)
+
+    def invalidate(self, method, entity_type, *args, **kwargs):
+        """
+        Remove the cached result of a query, so that it's queried next time.
+
+        :param str method: The name of the query method, e.g. ``"find"``.
+        :param str entity_type: The queried entity type.
+        """
+        key = self.cache.get_key(method, entity_type, args, kwargs)
+        if key is not None:
+            self.cache.invalidate(key)
+
+    def invalidate_entity_type(self, entity_type):
+        """
+        Remove the cached results of all the queries of an entity type, so
+        that they're queried next time.
+
+        :param str entity_type: The queried entity type.
+        """
+        self.cache.invalidate_entity_type(entity_type)
+
+    def _query(self, method, entity_type, args, kwargs):
+        """
+        Get the result of a query from the cache, querying it if needed.
+
+        :param str method: The name of the query method.
+        :param str entity_type: The queried entity type.
+        :param tuple args: The other positional arguments of the query.
+        :param dict kwargs: The keyword arguments of the query.
+        """
+        key = None
+        if self.cache.is_cached(entity_type):
+            key = self.cache.get_key(method, entity_type, args, kwargs)
+        if key is None:
+            connection = self._get_connection()
+            return getattr(connection, method)(entity_type, *args, **kwargs)
+
+        cached = self.cache.get(entity_type, key)
+        if cached is not None:
+            result, fresh = cached
+            if fresh:
+                return result
+            if self._revalidate is not None:
+
+                def revalidated(new_result):
+                    if new_result != result and self._on_revalidated is not None:
+                        self._on_revalidated(entity_type)
+
+                self._revalidate(
+                    key,
+                    self._store,
+                    (method, entity_type, args, kwargs, key),
+                    callback=revalidated,
+                )
+                return result
+        return self._store(method, entity_type, args, kwargs, key)
+
+    def _store(self, method, entity_type, args, kwargs, key):
+        """
+        Run a query and cache its result.
+        """
+        connection = self._get_connection()
+        result = getattr(connection, method)(entity_type, *args, **kwargs)
+        self.cache.set(entity_type, key, result)
+        return result
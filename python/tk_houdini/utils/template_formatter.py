@@ -0,0 +1,105 @@
+import re
+import string
+
+
+class TemplateFormatter(object):
+    """
+    Fast formatter of the paths of an sgtk template whose fields only differ
+    by a few varying keys e.g. ``version``, ``channel`` or ``SEQ``.
+
+    The template is applied once with sentinel values for the varying keys,
+    leaving a skeleton path the values of the varying keys are substituted
+    into, after being formatted and validated by their template key.
+    """
+
+    # unlikely values to find the varying keys' positions in the skeleton with
+    INT_SENTINEL = 918273600
+    STRING_SENTINEL = "tkhoudinivarying"
+
+    def __init__(self, template, fields, varying_keys):
+        """
+        Initialise the class.
+
+        :param template: An :class:`sgtk.Template`.
+        :param dict fields: The template fields, values of the varying keys
+            are ignored.
+        :param list(str) varying_keys: The names of the keys to substitute.
+
+        :raises: :class:`ValueError` if a varying key isn't in the template or
+            no sentinel value is valid for it, or :class:`sgtk.TankError` if
+            the template can't be applied to the fields.
+        """
+        self.template = template
+        self.varying_keys = tuple(varying_keys)
+        self._keys = {}
+        sentinel_fields = dict(fields)
+        names_by_sentinel = {}
+        for index, key_name in enumerate(self.varying_keys):
+            key = template.keys.get(key_name)
+            if key is None:
+                raise ValueError(
+                    "No key {!r} in template {}".format(key_name, template)
+                )
+            self._keys[key_name] = key
+            value, text = self._get_sentinel(key, index)
+            sentinel_fields[key_name] = value
+            names_by_sentinel[text] = key_name
+
+        skeleton = template.apply_fields(sentinel_fields)
+
+        # longest first, in case a sentinel starts with another
+        sentinels = sorted(names_by_sentinel, key=len, reverse=True)
+        split_regex = "({})".format("|".join(map(re.escape, sentinels)))
+        self._parts = []
+        for index, part in enumerate(re.split(split_regex, skeleton)):
+            if index % 2:
+                self._parts.append(names_by_sentinel[part])
+            elif part:
+                self._parts.append((part,))
+
+        missing = set(self.varying_keys).difference(self._parts)
+        if missing:
+            raise ValueError(
+                "Keys {} are not used by template {}".format(sorted(missing), template)
+            )
+
+    def _get_sentinel(self, key, index):
+        """
+        Get a sentinel value the key accepts.
+
+        :param key: An :class:`sgtk.TemplateKey`.
+        :param int index: The index of the key, for unique sentinels.
+
+        :raises: :class:`ValueError` if no sentinel is valid for the key.
+
+        :returns: A tuple of the sentinel value and its formatted string.
+        """
+        letters = string.ascii_lowercase
+        candidates = (
+            self.INT_SENTINEL + index,
+            self.STRING_SENTINEL + letters[index % len(letters)] * (index + 1),
+        )
+        for value in candidates:
+            try:
+                return value, key.str_from_value(value)
+            except Exception:
+                continue
+        raise ValueError("No valid sentinel value for key {}".format(key))
+
+    def format(self, fields):
+        """
+        Format the path for the values of the varying keys.
+
+        :param dict fields: The values of the varying keys, other fields are
+            ignored.
+
+        :raises: :class:`sgtk.TankError` if a value is invalid for its key.
+
+        :rtype: str
+        """
+        values = {}
+        for key_name, key in self._keys.items():
+            values[key_name] = key.str_from_value(fields[key_name])
+        return "".join(
+            part[0] if isinstance(part, tuple) else values[part] for part in self._parts
+        )
@@ -0,0 +1,166 @@
+import os
+import threading
+
+from .version_scanner import list_directory, scan_versions
+
+
+class VersionIndex(object):
+    """
+    In-memory index of the versions existing on disk for tokenised paths,
+    see :func:`scan_versions`, kept up to date by watching the directories
+    the versions were found in.
+
+    Paths are registered against keys, e.g. node session ids, so that the
+    keys affected by versions appearing or disappearing can be looked up.
+    """
+
+    def __init__(self, watcher, list_dir=None):
+        """
+        Initialise the class.
+
+        :param watcher: The directory watcher to use, see :func:`create_dir_watcher`.
+        :param list_dir: Callable used to list directories.
+        """
+        self._watcher = watcher
+        self._list_dir = list_dir or list_directory
+        self._versions = {}
+        self._directories = {}
+        self._paths_by_directory = {}
+        self._keys_by_path = {}
+        self._paths_by_key = {}
+        self._lock = threading.RLock()
+
+    def versions(self, scan_path, key=None):
+        """
+        Get the sorted versions existing on disk for the tokenised path.
+
+        Only paths registered against a key are indexed and watched, others
+        are scanned every time.
+
+        :param str scan_path: The tokenised path.
+        :param key: Hashable key to register the path against, if any.
+
+        :rtype: list(int)
+        """
+        with self._lock:
+            if key is not None:
+                self._register(key, scan_path)
+            elif scan_path not in self._versions:
+                versions = scan_versions(scan_path, list_dir=self._list_dir)
+                versions.discard(None)
+                return sorted(versions)
+            if scan_path not in self._versions:
+                self._index(scan_path)
+            return list(self._versions[scan_path])
+
+    def forget(self, key):
+        """
+        Forget the path registered against the key, no longer watching its
+        directories if no other key needs them.
+
+        :param key: The registered key.
+        """
+        with self._lock:
+            scan_path = self._paths_by_key.pop(key, None)
+            if scan_path is None:
+                return
+            keys = self._keys_by_path.get(scan_path, set())
+            keys.discard(key)
+            if not keys:
+                self._drop(scan_path)
+
+    def poll(self):
+        """
+        Re-index the paths whose watched directories have changed.
+
+        :returns: The keys whose versions have changed.
+        :rtype: set
+        """
+        with self._lock:
+            scan_paths = set()
+            for directory in self._watcher.poll():
+                scan_paths.update(self._paths_by_directory.get(directory, ()))
+            changed_keys = set()
+            for scan_path in scan_paths:
+                previous = self._versions.get(scan_path)
+                self._index(scan_path)
+                if self._versions[scan_path] != previous:
+                    changed_keys.update(self._keys_by_path.get(scan_path, ()))
+            return changed_keys
+
+    def close(self):
+        """
+        Forget all the paths and stop watching their directories.
+        """
+        with self._lock:
+            self._watcher.close()
+            self._versions.clear()
+            self._directories.clear()
+            self._paths_by_directory.clear()
+            self._keys_by_path.clear()
+            self._paths_by_key.clear()
+
+    def _register(self, key, scan_path):
+        previous = self._paths_by_key.get(key)
+        if previous == scan_path:
+            return
+        if previous is not None:
+            self.forget(key)
+        self._paths_by_key[key] = scan_path
+        self._keys_by_path.setdefault(scan_path, set()).add(key)
+
+    @staticmethod
+    def _existing_directory(directory):
+        """
+        Get the directory, or its closest ancestor, that exists.
+
+        :param str directory: The directory.
+
+        :rtype: str
+        """
+        while not os.path.isdir(directory):
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                break
+            directory = parent
+        return directory
+
+    def _index(self, scan_path):
+        """
+        Scan the versions for the path, watching the directories listed.
+
+        :param str scan_path: The tokenised path.
+        """
+        listed = []
+
+        def list_dir(directory):
+            listed.append(directory)
+            return self._list_dir(directory)
+
+        versions = scan_versions(scan_path, list_dir=list_dir)
+        versions.discard(None)
+        self._versions[scan_path] = sorted(versions)
+
+        # watch the closest existing directory of missing ones, to notice
+        # when they are created
+        directories = set(self._existing_directory(path) for path in listed)
+        previous = self._directories.get(scan_path, set())
+        for directory in previous - directories:
+            self._unwatch(scan_path, directory)
+        for directory in directories - previous:
+            self._paths_by_directory.setdefault(directory, set()).add(scan_path)
+            self._watcher.watch(directory)
+        self._directories[scan_path] = directories
+
+    def _unwatch(self, scan_path, directory):
+        scan_paths = self._paths_by_directory.get(directory, set())
+        scan_paths.discard(scan_path)
+        if not scan_paths:
+            self._paths_by_directory.pop(directory, None)
+            self._watcher.unwatch(directory)
+
+    def _drop(self, scan_path):
+        for directory in self._directories.pop(scan_path, set()):
+            self._unwatch(scan_path, directory)
+        self._versions.pop(scan_path, None)
+        self._keys_by_path.pop(scan_path, None)
@@ -0,0 +1,195 @@
+import functools
+import os
+import re
+
+try:
+    from os import scandir
+except ImportError:  # python 2
+    scandir = None
+
+
+# Placeholders marking the parts of a path that vary. Paths can't contain NULs.
+VERSION_TOKEN = "\x00version\x00"
+WILDCARD_TOKEN = "\x00wildcard\x00"
+
+VERSION_PATTERN = r"(?P<version>\d+)"
+REPEATED_VERSION_PATTERN = r"(?P=version)"
+WILDCARD_PATTERN = r"-?\d+"
+
+_TOKENS_REGEX = re.compile(
+    "({}|{})".format(re.escape(VERSION_TOKEN), re.escape(WILDCARD_TOKEN))
+)
+
+
+def list_directory(directory):
+    """
+    List the entries of a directory without stat-ing them where possible.
+
+    :param str directory: The directory to list.
+
+    :returns: A list of tuples of the entry name and a callable returning
+        whether the entry is a directory. Empty if the directory can't be listed.
+    """
+    try:
+        if scandir is not None:
+            return [(entry.name, entry.is_dir) for entry in scandir(directory)]
+        return [
+            (name, functools.partial(os.path.isdir, os.path.join(directory, name)))
+            for name in os.listdir(directory)
+        ]
+    except OSError:
+        return []
+
+
+def _compile_component(component):
+    """
+    Compile a path component containing tokens into a regular expression.
+
+    :param str component: The path component.
+
+    :returns: A compiled regular expression.
+    """
+    pattern = []
+    has_version = False
+    for part in _TOKENS_REGEX.split(component):
+        if part == VERSION_TOKEN:
+            pattern.append(REPEATED_VERSION_PATTERN if has_version else VERSION_PATTERN)
+            has_version = True
+        elif part == WILDCARD_TOKEN:
+            pattern.append(WILDCARD_PATTERN)
+        else:
+            pattern.append(re.escape(part))
+    return re.compile("^{}$".format("".join(pattern)))
+
+
+class VersionScanner(object):
+    """
+    Find the versions existing on disk for a path, without listing more of the
+    file system than needed.
+
+    The path marks the version with :data:`VERSION_TOKEN` and anything else
+    that varies, e.g. frame numbers, with :data:`WILDCARD_TOKEN`. Only the
+    directories containing tokens are listed. Once a version is known to
+    exist, no other entries for it are descended into, so the frames of a
+    sequence are never enumerated past the first one.
+    """
+
+    def __init__(self, path, list_dir=None):
+        """
+        Initialise the class.
+
+        :param str path: The tokenised path to scan for.
+        :param list_dir: Callable used to list directories, e.g.
+            :meth:`DirListingCache.list_dir`. Defaults to :func:`list_directory`.
+        """
+        self._list_dir = list_dir or list_directory
+        components = re.split(r"[\\/]", path)
+        index = 0
+        while index < len(components) and not _TOKENS_REGEX.search(components[index]):
+            index += 1
+
+        root = "/".join(components[:index])
+        if not root:
+            root = "/" if path[:1] in ("/", "\\") else os.curdir
+        elif root.endswith(":"):
+            root += "/"
+        self.root = root
+
+        self.components = []
+        for component in components[index:]:
+            if _TOKENS_REGEX.search(component):
+                self.components.append(_compile_component(component))
+            else:
+                self.components.append(component)
+
+        # whether a version is captured at, or after, each component
+        self._version_ahead = []
+        version_ahead = False
+        for component in reversed(self.components):
+            if hasattr(component, "match"):
+                version_ahead = version_ahead or "version" in component.groupindex
+            self._version_ahead.insert(0, version_ahead)
+
+    def scan(self):
+        """
+        Scan the file system for the versions.
+
+        :returns: A set of the versions (int) found. Contains ``None`` if a
+            path without a version exists.
+        :rtype: set
+        """
+        versions = set()
+        if not self.components:
+            if os.path.exists(self.root):
+                versions.add(None)
+        else:
+            self._scan(self.root, 0, None, versions)
+        return versions
+
+    def _scan(self, directory, index, version, versions):
+        """
+        Recursively match the components from the given index in the directory.
+
+        :param str directory: The directory to match the components in.
+        :param int index: The index of the component to match.
+        :param int version: The version matched so far, if any.
+        :param set versions: The versions found so far, updated in place.
+
+        :returns: Whether any path matched.
+        :rtype: bool
+        """
+        if index == len(self.components):
+            versions.add(version)
+            return True
+
+        component = self.components[index]
+        is_last = index == len(self.components) - 1
+        if not hasattr(component, "match"):
+            path = os.path.join(directory, component)
+            if is_last:
+                if not os.path.exists(path):
+                    return False
+                versions.add(version)
+                return True
+            return self._scan(path, index + 1, version, versions)
+
+        captures_version = "version" in component.groupindex
+        stop_on_match = version is not None or not self._version_ahead[index]
+        matched = False
+        for name, is_dir in self._list_dir(directory):
+            match = component.match(name)
+            if not match:
+                continue
+            found_version = version
+            if captures_version:
+                found_version = int(match.group("version"))
+                if version is not None and found_version != version:
+                    continue
+                if found_version in versions:
+                    # already confirmed, collapses the rest of its entries
+                    continue
+            if not is_last and not is_dir():
+                continue
+            path = os.path.join(directory, name)
+            if self._scan(path, index + 1, found_version, versions):
+                matched = True
+                if stop_on_match:
+                    break
+        return matched
+
+
+def scan_versions(path, list_dir=None):
+    """
+    Find the versions existing on disk for a tokenised path.
+
+    See :class:`VersionScanner`.
+
+    :param str path: The path, containing :data:`VERSION_TOKEN` and
+        :data:`WILDCARD_TOKEN` placeholders.
+    :param list_dir: Callable used to list directories.
+
+    :returns: A set of the versions (int) found. Contains ``None`` if a path
+        without a version exists.
+    :rtype: set
+    """
+    return VersionScanner(path, list_dir=list_dir).scan()
@@ -0,0 +1,136 @@
+import itertools
+import threading
+
+try:
+    import queue
+except ImportError:  # python 2
+    import Queue as queue
+
+
+class WorkerPool(object):
+    """
+    Run functions on a pool of worker threads, handing their results back
+    through a dispatcher, e.g. to run them in the main thread.
+
+    Work is submitted against a key. Submitting new work for the same key makes
+    any pending work for it stale: it is skipped if it has not started yet and
+    its result is discarded otherwise.
+    """
+
+    def __init__(self, dispatcher, workers=4):
+        """
+        Initialise the class.
+
+        :param dispatcher: Callable taking a function and its arguments, used to
+            deliver results e.g. :meth:`sgtk.platform.Engine.async_execute_in_main_thread`.
+        :param int workers: The number of worker threads to run.
+        """
+        self._dispatcher = dispatcher
+        self._workers = max(1, workers)
+        self._threads = []
+        self._queue = queue.Queue()
+        self._tickets = {}
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _start_workers(self):
+        """
+        Start the worker threads, if not already running.
+        """
+        while len(self._threads) < self._workers:
+            thread = threading.Thread(
+                target=self._work,
+                name="{}-{}".format(self.__class__.__name__, len(self._threads)),
+            )
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, key, func, args=(), callback=None, errback=None):
+        """
+        Run the function on a worker thread, making any pending work for the
+        same key stale.
+
+        :param key: Hashable key identifying what the work is for.
+        :param func: The function to run on the worker thread.
+        :param tuple args: The arguments to call the function with.
+        :param callback: Called with the result, through the dispatcher.
+        :param errback: Called with the raised exception, through the dispatcher.
+
+        :returns: The ticket of the work.
+        :rtype: int
+        """
+        with self._lock:
+            ticket = next(self._counter)
+            self._tickets[key] = ticket
+            self._start_workers()
+        self._queue.put((key, ticket, func, args, callback, errback))
+        return ticket
+
+    def cancel(self, key):
+        """
+        Make any pending work for the given key stale.
+
+        :param key: The key the work was submitted against.
+        """
+        with self._lock:
+            self._tickets.pop(key, None)
+
+    def is_pending(self, key):
+        """
+        Check if there is work pending for the given key.
+
+        :param key: The key the work was submitted against.
+
+        :rtype: bool
+        """
+        with self._lock:
+            return key in self._tickets
+
+    def shutdown(self):
+        """
+        Make all the pending work stale and stop the worker threads.
+        """
+        with self._lock:
+            self._tickets.clear()
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+
+    def _is_current(self, key, ticket):
+        with self._lock:
+            return self._tickets.get(key) == ticket
+
+    def _work(self):
+        """
+        Worker thread loop.
+        """
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            key, ticket, func, args, callback, errback = item
+            if not self._is_current(key, ticket):
+                continue
+            result = error = None
+            try:
+                result = func(*args)
+            except Exception as raised:
+                error = raised
+            self._dispatcher(
+                self._deliver, key, ticket, result, error, callback, errback
+            )
+
+    def _deliver(self, key, ticket, result, error, callback, errback):
+        """
+        Hand the result to the callbacks, unless the work went stale.
+        """
+        with self._lock:
+            if self._tickets.get(key) != ticket:
+                return
+            del self._tickets[key]
+        if error is None:
+            if callback:
+                callback(result)
+        elif errback:
+            errback(error)
@@ -0,0 +1,130 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import hou
+
+try:
+    from unittest import mock
+except ImportError:  # python 2
+    import mock
+
+from test_hooks_base import TestHooks
+
+
+class TestNodeHandlers(TestHooks):
+    """
+    Base class for tests of the node handlers, using file SOPs handled by the
+    import node handler.
+
+    The ``find`` and ``find_one`` queries made to mockgun are recorded in
+    :attr:`queries`.
+    """
+
+    def setUp(self):
+        super(TestNodeHandlers, self).setUp()
+        self.queries = mock.Mock()
+        for method in ("find", "find_one"):
+            patcher = mock.patch.object(
+                self.mockgun, method, wraps=getattr(self.mockgun, method)
+            )
+            self.queries.attach_mock(patcher.start(), method)
+            self.addCleanup(patcher.stop)
+
+        self._publishes = []
+        self._publish_file_type = self.mockgun.create(
+            "PublishedFileType", {"code": "Alembic Cache"}
+        )
+        self.geo = hou.node("/obj").createNode("geo")
+
+    def add_publishes(self, name, versions, status="cmpt", entity=True):
+        """
+        Create ``PublishedFile`` entities for the given versions of a publish,
+        linked to the asset unless ``entity`` is ``False``.
+
+        :returns: The entities created.
+        """
+        rows = []
+        for version in versions:
+            rows.append(
+                self.mockgun.create(
+                    "PublishedFile",
+                    {
+                        "code": name,
+                        "name": name,
+                        "description": "A cache",
+                        "version_number": version,
+                        "sg_status_list": status,
+                        "published_file_type": self._publish_file_type,
+                        "entity": self._asset if entity else None,
+                        "project": self.project,
+                        "task": self._task,
+                        "path": {
+                            "link_type": "local",
+                            "local_path": self.get_publish_path(name, version),
+                        },
+                    },
+                )
+            )
+        self._publishes.extend(rows)
+        return rows
+
+    @staticmethod
+    def get_publish_path(name, version):
+        return "/publish/{}.v{:03d}.abc".format(name, version)
+
+    def get_publish_data(self, name):
+        """
+        Get the latest ``PublishedFile`` record of a publish, as the loader
+        passes it to the node handlers.
+        """
+        rows = [row for row in self._publishes if row["name"] == name]
+        return dict(max(rows, key=lambda row: row["version_number"]))
+
+    def create_file_node(self, name=None, version_policy="<LATEST>"):
+        """
+        Create a file SOP with the sgtk parms and Shotgun enabled, populated
+        from the given publish, if any.
+        """
+        node = self.geo.createNode("file")
+        handler = self.engine.node_handler(node)
+        if not node.parm("sgtk_identifier"):
+            handler.on_created(node=node)
+        node.parm("use_sgtk").set(True)
+        if name:
+            handler.populate_node_from_publish_data(
+                node, self.get_publish_data(name), version_policy
+            )
+        return node
+
+    def override_setting(self, name, value):
+        """
+        Override an engine setting for the rest of the test.
+        """
+        get_setting = self.engine.get_setting
+
+        def override(key, default=None):
+            if key == name:
+                return value
+            return get_setting(key, default)
+
+        patcher = mock.patch.object(self.engine, "get_setting", side_effect=override)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def get_input_path(node):
+        return node.parm("file").unexpandedString()
+
+    def reset_queries(self):
+        """
+        Forget the queries made so far, and the rows cached from them.
+        """
+        self.engine.publish_cache.clear()
+        self.queries.reset_mock()
@@ -0,0 +1,44 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Makes the ``tk_houdini.utils`` modules importable as the ``tk_houdini_utils``
+package, without running the package ``__init__`` which needs Houdini and Qt.
+
+Importing this module is enough, e.g.::
+
+    import utils_loader  # noqa
+    from tk_houdini_utils.lru_cache import LRUCache
+"""
+
+import os
+import sys
+import types
+
+UTILS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "python",
+    "tk_houdini",
+    "utils",
+)
+
+
+def load_utils_package():
+    """
+    Register the ``tk_houdini_utils`` package, if not already registered.
+
+    :returns: The package module.
+    """
+    utils_package = types.ModuleType("tk_houdini_utils")
+    utils_package.__path__ = [UTILS_PATH]
+    return sys.modules.setdefault("tk_houdini_utils", utils_package)
+
+
+load_utils_package()
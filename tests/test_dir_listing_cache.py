@@ -0,0 +1,80 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import utils_loader  # noqa
+from tk_houdini_utils.dir_listing_cache import DirListingCache
+
+
+class TestDirListingCache(unittest.TestCase):
+    """
+    Tests the directory listing cache shared by the node handlers.
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        for name in ("v001", "v002"):
+            os.makedirs(os.path.join(self.root, name))
+            for frame in (1, 2):
+                path = os.path.join(self.root, name, "geo.{:04d}.bgeo".format(frame))
+                open(path, "w").close()
+        open(os.path.join(self.root, ".hidden"), "w").close()
+        self._age(self.root, os.path.join(self.root, "v001"))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    @staticmethod
+    def _age(*paths):
+        # make the directories old enough for their listings to be trusted
+        old = time.time() - 60
+        for path in paths:
+            os.utime(path, (old, old))
+
+    def test_listing_cached_until_modified(self):
+        cache = DirListingCache()
+        names = sorted(name for name, _ in cache.list_dir(self.root))
+        self.assertEqual(names, [".hidden", "v001", "v002"])
+        cache.list_dir(self.root)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        os.makedirs(os.path.join(self.root, "v003"))
+        names = sorted(name for name, _ in cache.list_dir(self.root))
+        self.assertEqual(names, [".hidden", "v001", "v002", "v003"])
+
+    def test_recent_listing_not_cached(self):
+        cache = DirListingCache()
+        directory = os.path.join(self.root, "v002")
+        cache.list_dir(directory)
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_glob(self):
+        cache = DirListingCache()
+        pattern = os.path.join(self.root, "v*", "geo.*.bgeo")
+        expected = sorted(
+            os.path.join(self.root, name, "geo.{:04d}.bgeo".format(frame))
+            for name in ("v001", "v002")
+            for frame in (1, 2)
+        )
+        self.assertEqual(sorted(cache.glob(pattern)), expected)
+        self.assertEqual(
+            cache.glob(os.path.join(self.root, "*")),
+            cache.glob(os.path.join(self.root, "v*")),
+        )
+        self.assertEqual(cache.glob(os.path.join(self.root, "missing", "*")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,255 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import json
+
+# Required so that the SHOTGUN_HOME env var will be set
+from tank_test.tank_test_base import setUpModule  # noqa
+
+from node_handler_test_base import TestNodeHandlers, mock
+
+
+class TestImportNodeHandler(TestNodeHandlers):
+    """
+    Tests resolving the publishes of import nodes.
+    """
+
+    def test_bulk_publish_resolution(self):
+        """
+        Tests the publishes of many nodes are resolved with a single query,
+        and not queried again once cached.
+        """
+        self.add_publishes("cache", [1, 2])
+        self.add_publishes("other", [1])
+        nodes = [
+            self.create_file_node("cache"),
+            self.create_file_node("cache"),
+            self.create_file_node("other"),
+        ]
+        handler = self.engine.node_handler(nodes[0])
+        self.reset_queries()
+
+        handler.refresh_file_paths(nodes)
+        self.assertEqual(len(self.queries.mock_calls), 1)
+        self.assertEqual(
+            [self.get_input_path(node) for node in nodes],
+            [
+                self.get_publish_path("cache", 2),
+                self.get_publish_path("cache", 2),
+                self.get_publish_path("other", 1),
+            ],
+        )
+
+        handler.refresh_file_paths(nodes)
+        self.assertEqual(len(self.queries.mock_calls), 1)
+
+    def test_bulk_resolution_of_new_versions(self):
+        """
+        Tests nodes using a version policy are resolved to versions published
+        since they were populated.
+        """
+        self.add_publishes("cache", [1])
+        node = self.create_file_node("cache")
+        self.assertEqual(self.get_input_path(node), self.get_publish_path("cache", 1))
+
+        self.add_publishes("cache", [2])
+        self.reset_queries()
+        self.engine.node_handler(node).refresh_file_paths([node])
+        self.assertEqual(self.get_input_path(node), self.get_publish_path("cache", 2))
+
+    def test_resolved_version_written_back(self):
+        """
+        Tests the version resolved when changing the version off the publish
+        tab is written back to the publish data once the refresh has run.
+        """
+        self.add_publishes("cache", [1])
+        node = self.create_file_node("cache")
+        handler = self.engine.node_handler(node)
+        node.parm(handler.SGTK_PATH_SELECTION).set(handler.WORK)
+
+        def refresh(node):
+            node.parm(handler.SGTK_RESOLVED_VERSION).set("4")
+
+        with mock.patch.object(
+            handler, "_refresh_file_path", side_effect=refresh
+        ), self.engine.defer_refreshes():
+            handler.refresh_file_path_from_version({"node": node})
+            self.assertEqual(handler._retrieve_publish_data(node)["version_number"], 4)
+
+    def test_compact_publish_data(self):
+        """
+        Tests only the ids, name, type, version and version policy of the
+        publish are stored on the node.
+        """
+        rows = self.add_publishes("cache", [1])
+        node = self.create_file_node("cache")
+        handler = self.engine.node_handler(node)
+
+        publish_data = json.loads(node.parm(handler.SGTK_PUBLISH_DATA).evalAsString())
+        self.assertEqual(
+            publish_data,
+            {
+                "schema": 2,
+                "type": "PublishedFile",
+                "id": rows[0]["id"],
+                "name": "cache",
+                "version_number": 1,
+                "version_policy": "<LATEST>",
+                "published_file_type": {
+                    "type": "PublishedFileType",
+                    "id": self._publish_file_type["id"],
+                },
+                "entity": {"type": "Asset", "id": self._asset["id"]},
+                "project": {"type": "Project", "id": self.project["id"]},
+            },
+        )
+
+    def test_legacy_publish_data_upgrade(self):
+        """
+        Tests the whole publish records stored by older versions of the engine
+        are shrunk when the node is loaded, and still resolve the same path.
+        """
+        self.add_publishes("cache", [1])
+        node = self.create_file_node("cache")
+        handler = self.engine.node_handler(node)
+        publish_data = handler._retrieve_publish_data(node)
+        legacy_publish_data = self.get_publish_data("cache")
+        legacy_publish_data["version_policy"] = "<LATEST>"
+        node.parm(handler.SGTK_PUBLISH_DATA).set(json.dumps(legacy_publish_data))
+        self.assertFalse(handler._is_slim_publish_data(legacy_publish_data))
+
+        handler.on_loaded(node=node)
+        self.assertEqual(handler._retrieve_publish_data(node), publish_data)
+        self.assertFalse(handler._upgrade_publish_data(node))
+
+        handler.refresh_file_paths([node])
+        self.assertEqual(self.get_input_path(node), self.get_publish_path("cache", 1))
+
+    def test_compact_project_publish_data(self):
+        """
+        Tests the empty entity of project publishes is stored as is, and still
+        resolves the publish.
+        """
+        self.add_publishes("cache", [1], entity=False)
+        node = self.create_file_node("cache")
+        handler = self.engine.node_handler(node)
+
+        publish_data = handler._retrieve_publish_data(node)
+        self.assertIsNone(publish_data["entity"])
+        self.assertIn(
+            ["entity", "is", None],
+            handler._get_search_filters_from_publish_data(publish_data),
+        )
+
+        self.add_publishes("cache", [2], entity=False)
+        self.reset_queries()
+        handler.refresh_file_paths([node])
+        self.assertEqual(self.get_input_path(node), self.get_publish_path("cache", 2))
+
+    def test_latest_only_queries(self):
+        """
+        Tests only the latest rows of nodes using a version policy are queried
+        when the version history is lazy.
+        """
+        self.override_setting("lazy_version_history", True)
+        self.add_publishes("cache", [1, 2])
+        self.add_publishes("cache", [3], status="ip")
+        nodes = [
+            self.create_file_node("cache"),
+            self.create_file_node("cache", version_policy="<LATEST COMPLETE>"),
+        ]
+        handler = self.engine.node_handler(nodes[0])
+        self.reset_queries()
+
+        handler.refresh_file_paths(nodes)
+        self.assertEqual(len(self.queries.mock_calls), 1)
+        self.assertEqual(
+            [self.get_input_path(node) for node in nodes],
+            [self.get_publish_path("cache", 3), self.get_publish_path("cache", 2)],
+        )
+        self.assertEqual(
+            [handler._get_all_versions(node) for node in nodes], [[3], [2]]
+        )
+
+    def test_lazy_version_menu(self):
+        """
+        Tests the version history is queried once Houdini is idle when the
+        version menu is first opened, rather than while it is generated, and
+        not again when the menu is drawn again.
+        """
+        self.override_setting("lazy_version_history", True)
+        self.add_publishes("cache", [1, 2])
+        node = self.create_file_node("cache")
+        handler = self.engine.node_handler(node)
+        self.reset_queries()
+        handler.refresh_file_paths([node])
+        self.reset_queries()
+        self.engine.menu_items_cache.clear()
+
+        deferred = []
+        with mock.patch.object(
+            self.engine, "async_execute_in_main_thread", side_effect=deferred.append
+        ):
+            items = handler.populate_versions({"node": node})
+            self.assertEqual(handler.populate_versions({"node": node}), items)
+            self.assertEqual(items[:2], ["2", "2"])
+            self.assertEqual(self.queries.mock_calls, [])
+            self.assertEqual(len(deferred), 1)
+
+            deferred.pop()()
+            self.assertEqual(len(self.queries.mock_calls), 1)
+            self.assertEqual(handler._get_all_versions(node), [1, 2])
+            self.assertEqual(
+                self.get_input_path(node), self.get_publish_path("cache", 2)
+            )
+
+            # once the cached history expired
+            self.reset_queries()
+            items = handler.populate_versions({"node": node})
+            self.assertEqual(items[:4], ["1", "1", "2", "2"])
+            self.assertEqual(deferred, [])
+
+    def test_refresh_invalidates_latest_publishes(self):
+        """
+        Tests the refresh versions button drops the cached latest rows.
+        """
+        self.override_setting("lazy_version_history", True)
+        self.add_publishes("cache", [1])
+        node = self.create_file_node("cache")
+        handler = self.engine.node_handler(node)
+        self.reset_queries()
+        handler.refresh_file_paths([node])
+
+        publish_data = handler._retrieve_publish_data(node)
+        key = handler._get_publish_key(publish_data)
+        latest_keys = [
+            handler._get_latest_publish_key(key, complete) for complete in (False, True)
+        ]
+        for latest_key in latest_keys:
+            self.assertIn(latest_key, self.engine.publish_cache)
+
+        with mock.patch.object(
+            self.engine, "invalidate_shotgun_queries"
+        ) as invalidate_shotgun_queries:
+            handler._invalidate_cached_publishes(
+                node.parm(handler.SGTK_REFRESH_VERSIONS), publish_data
+            )
+        for latest_key in latest_keys:
+            self.assertNotIn(latest_key, self.engine.publish_cache)
+        # the queries resolving many nodes at once are dropped too
+        invalidate_shotgun_queries.assert_called_once_with("PublishedFile")
+
+    def test_cached_shotgun_for_node_handlers_only(self):
+        """
+        Tests only the node handlers query through the Shotgun cache.
+        """
+        self.override_setting("shotgun_cache", True)
+        self.assertIs(self.engine.shotgun, self.mockgun)
+        self.assertIsNot(self.engine.cached_shotgun, self.mockgun)
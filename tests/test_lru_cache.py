@@ -0,0 +1,72 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import unittest
+
+import utils_loader  # noqa
+from tk_houdini_utils.lru_cache import LRUCache
+
+
+class FakeTimer(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCache(unittest.TestCase):
+    """
+    Tests the least recently used cache shared by the node handlers.
+    """
+
+    def setUp(self):
+        self.timer = FakeTimer()
+
+    def test_hits_and_misses(self):
+        cache = LRUCache(timer=self.timer)
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", [1])
+        self.assertEqual(cache.get("a"), [1])
+        self.assertEqual(
+            cache.stats(), {"hits": 1, "misses": 1, "hit_rate": 0.5, "size": 1}
+        )
+
+    def test_ttl(self):
+        cache = LRUCache(ttl=10, timer=self.timer)
+        cache.set("a", 1)
+        self.timer.now = 10
+        self.assertEqual(cache.get("a"), 1)
+        self.timer.now = 10.5
+        self.assertIsNone(cache.get("a"))
+        self.assertNotIn("a", cache)
+
+    def test_lru_eviction(self):
+        cache = LRUCache(max_size=2, timer=self.timer)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+
+    def test_invalidate(self):
+        cache = LRUCache(timer=self.timer)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.invalidate("a")
+        cache.invalidate("missing")
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.get("b"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
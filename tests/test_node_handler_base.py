@@ -0,0 +1,127 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import hou
+
+# Required so that the SHOTGUN_HOME env var will be set
+from tank_test.tank_test_base import setUpModule  # noqa
+
+from node_handler_test_base import TestNodeHandlers, mock
+
+
+class TestNodeHandlerBase(TestNodeHandlers):
+    """
+    Tests the behaviour shared by all the node handlers.
+    """
+
+    def test_memoized_version_menu(self):
+        """
+        Tests the version menu items are only generated again once the
+        versions change, e.g. when the refresh button is pressed.
+        """
+        self.add_publishes("cache", [1, 2])
+        node = self.create_file_node("cache")
+        handler = self.engine.node_handler(node)
+        policies = ["<LATEST>", "<LATEST>", "<LATEST COMPLETE>", "<LATEST COMPLETE>"]
+
+        with mock.patch.object(
+            handler, "_populate_versions", wraps=handler._populate_versions
+        ) as populate:
+            self.engine.menu_items_cache.clear()
+            items = handler.populate_versions({"node": node})
+            self.assertEqual(items, ["1", "1", "2", "2"] + policies)
+            self.assertEqual(handler.populate_versions({"node": node}), items)
+            self.assertEqual(populate.call_count, 1)
+
+            self.add_publishes("cache", [3])
+            handler.refresh_file_path_from_version(
+                {"node": node, "parm": node.parm(handler.SGTK_REFRESH_VERSIONS)}
+            )
+            items = handler.populate_versions({"node": node})
+            self.assertEqual(items, ["1", "1", "2", "2", "3", "3"] + policies)
+            self.assertEqual(populate.call_count, 2)
+
+    def test_memoized_menus_per_node(self):
+        """
+        Tests the version menu items are generated once per node.
+        """
+        self.add_publishes("cache", [1])
+        self.add_publishes("other", [1, 2])
+        nodes = [self.create_file_node("cache"), self.create_file_node("other")]
+        handler = self.engine.node_handler(nodes[0])
+
+        with mock.patch.object(
+            handler, "_populate_versions", wraps=handler._populate_versions
+        ) as populate:
+            self.engine.menu_items_cache.clear()
+            for _ in range(2):
+                self.assertEqual(
+                    [len(handler.populate_versions({"node": node})) for node in nodes],
+                    [6, 8],
+                )
+            self.assertEqual(populate.call_count, 2)
+
+    def test_batched_parm_writes(self):
+        """
+        Tests writes of locked parms are deferred until the end of a batch,
+        which nested batches are part of.
+        """
+        node = self.create_file_node()
+        handler = self.engine.node_handler(node)
+        input_parm = node.parm(handler.INPUT_PARM)
+        name_parm = node.parm(handler.SGTK_NAME)
+
+        with handler._batch_parm_writes(node):
+            handler._set_parm(input_parm, "/a.abc", lock=True)
+            with handler._batch_parm_writes(node):
+                handler._set_parm(input_parm, "/b.abc", lock=True)
+            handler._set_parm(name_parm, "cache")
+            self.assertNotEqual(input_parm.unexpandedString(), "/b.abc")
+            self.assertEqual(handler._get_parm_string(input_parm), "/b.abc")
+            self.assertEqual(name_parm.unexpandedString(), "cache")
+        self.assertEqual(input_parm.unexpandedString(), "/b.abc")
+        self.assertTrue(input_parm.isLocked())
+
+    def test_batched_parm_writes_on_error(self):
+        """
+        Tests the writes deferred by a batch are still made if it raises.
+        """
+        node = self.create_file_node()
+        handler = self.engine.node_handler(node)
+        input_parm = node.parm(handler.INPUT_PARM)
+
+        with self.assertRaises(ValueError):
+            with handler._batch_parm_writes(node):
+                handler._set_parm(input_parm, "/a.abc", lock=True)
+                raise ValueError("Failed to refresh")
+        self.assertEqual(input_parm.unexpandedString(), "/a.abc")
+        self.assertTrue(input_parm.isLocked())
+
+        # the batch is over, writes are made straight away
+        handler._set_parm(input_parm, "/b.abc", lock=True)
+        self.assertEqual(input_parm.unexpandedString(), "/b.abc")
+
+    def test_unchanged_parm_values_are_skipped(self):
+        """
+        Tests parms are only set when their value changes.
+        """
+        node = self.create_file_node()
+        handler = self.engine.node_handler(node)
+        name_parm = node.parm(handler.SGTK_NAME)
+        handler._set_parm(name_parm, "cache")
+
+        with mock.patch.object(hou.Parm, "set") as set_parm:
+            handler._set_parm(name_parm, "cache")
+            with handler._batch_parm_writes(node):
+                handler._set_parm(name_parm, "cache", lock=True)
+            self.assertEqual(set_parm.call_count, 0)
+
+            handler._set_parm(name_parm, "other")
+            self.assertEqual(set_parm.call_count, 1)
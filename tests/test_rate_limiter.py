@@ -0,0 +1,122 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import unittest
+
+import utils_loader  # noqa
+from tk_houdini_utils.rate_limiter import RateLimitedShotgun, TokenBucket
+
+
+class FakeClock(object):
+    """
+    Clock only moving forward when slept on.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FlakyShotgun(object):
+    """
+    Stand-in for a Shotgun connection failing a number of times first.
+    """
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = []
+
+    def _call(self, name):
+        self.calls.append(name)
+        if self.failures:
+            self.failures -= 1
+            raise IOError("429 Too Many Requests")
+        return [{"type": "PublishedFile", "id": 1}]
+
+    def find(self, entity_type, filters):
+        return self._call("find")
+
+    def create(self, entity_type, data):
+        return self._call("create")
+
+
+class TestRateLimiter(unittest.TestCase):
+    """
+    Tests throttling and retrying Shotgun calls.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def make_shotgun(self, connection, rate=None, **kwargs):
+        bucket = None
+        if rate:
+            bucket = TokenBucket(
+                rate, burst=2, timer=self.clock.time, sleep=self.clock.sleep
+            )
+        return RateLimitedShotgun(
+            lambda: connection,
+            bucket=bucket,
+            sleep=self.clock.sleep,
+            random=lambda: 0.5,
+            **kwargs
+        )
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(2, burst=2, timer=self.clock.time, sleep=self.clock.sleep)
+        waits = [bucket.acquire() for _ in range(4)]
+        self.assertEqual(waits, [0.0, 0.0, 0.5, 0.5])
+        self.assertEqual(self.clock.now, 1.0)
+        # refills up to the burst size
+        self.clock.now += 10
+        self.assertEqual([bucket.acquire() for _ in range(3)], [0.0, 0.0, 0.5])
+
+    def test_throttled_calls(self):
+        connection = FlakyShotgun()
+        sg = self.make_shotgun(connection, rate=4)
+        for _ in range(4):
+            sg.find("PublishedFile", [])
+        stats = sg.stats()
+        self.assertEqual(stats["calls"], 4)
+        self.assertEqual(stats["throttled"], 2)
+        self.assertAlmostEqual(stats["wait_time"], 0.5)
+
+    def test_jittered_backoff(self):
+        connection = FlakyShotgun(failures=3)
+        sg = self.make_shotgun(connection, retries=3, backoff=1.0, max_backoff=3.0)
+        self.assertEqual(
+            sg.find("PublishedFile", []), [{"type": "PublishedFile", "id": 1}]
+        )
+        self.assertEqual(self.clock.sleeps, [0.5, 1.0, 1.5])
+        self.assertEqual(sg.stats()["retried"], 3)
+        self.assertAlmostEqual(sg.stats()["wait_time"], 3.0)
+
+    def test_retries_exhausted(self):
+        connection = FlakyShotgun(failures=3)
+        sg = self.make_shotgun(connection, retries=2)
+        self.assertRaises(IOError, sg.find, "PublishedFile", [])
+        self.assertEqual(len(connection.calls), 3)
+
+    def test_writes_are_not_retried(self):
+        connection = FlakyShotgun(failures=1)
+        sg = self.make_shotgun(connection, retries=3)
+        self.assertRaises(IOError, sg.create, "Note", {})
+        self.assertEqual(connection.calls, ["create"])
+
+
+if __name__ == "__main__":
+    unittest.main()
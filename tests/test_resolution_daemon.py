@@ -0,0 +1,236 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import utils_loader  # noqa
+from tk_houdini_utils.resolution_daemon import (
+    ResolutionClient,
+    SharedShotgun,
+    list_directory_shared,
+    resolution_daemon_supported,
+    resolution_socket_directory,
+    start_resolution_daemon,
+)
+
+
+@unittest.skipUnless(resolution_daemon_supported(), "Needs Unix domain sockets")
+class TestResolutionDaemon(unittest.TestCase):
+    """
+    Tests deduplicating queries across processes through the local daemon.
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "resolve.sock")
+        self.calls = []
+        self.daemons = []
+
+    def tearDown(self):
+        for daemon in self.daemons:
+            daemon.close()
+        shutil.rmtree(self.root)
+
+    def start_daemon(self):
+        daemon = start_resolution_daemon(self.path, ttl=60, wait_timeout=5)
+        if daemon is not None:
+            self.daemons.append(daemon)
+        return daemon
+
+    def query(self, value, started=None, release=None):
+        self.calls.append(value)
+        if started is not None:
+            started.set()
+        if release is not None:
+            release.wait(5)
+        return [{"id": value}]
+
+    def test_fallback_without_daemon(self):
+        client = ResolutionClient(self.path, timeout=5)
+        self.assertEqual(client.resolve(["find", 1], self.query, 1), [{"id": 1}])
+        self.assertEqual(client.resolve(["find", 1], self.query, 1), [{"id": 1}])
+        self.assertEqual(self.calls, [1, 1])
+        self.assertEqual(client.stats()["fallbacks"], 2)
+
+    def test_started_on_demand(self):
+        client = ResolutionClient(self.path, timeout=5, start_daemon=self.start_daemon)
+        client.resolve(["find", 1], self.query, 1)
+        self.assertEqual(len(self.daemons), 1)
+        # only one daemon serves the socket
+        self.assertIsNone(self.start_daemon())
+
+        other_client = ResolutionClient(self.path, timeout=5)
+        self.assertEqual(other_client.resolve(["find", 1], self.query, 1), [{"id": 1}])
+        self.assertEqual(self.calls, [1])
+        self.assertEqual(client.stats()["leads"], 1)
+        self.assertEqual(other_client.stats()["hits"], 1)
+
+    def test_in_flight_queries_are_shared(self):
+        self.start_daemon()
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        def lead():
+            client = ResolutionClient(self.path, timeout=5)
+            results.append(client.resolve(["find", 2], self.query, 2, started, release))
+
+        def wait():
+            client = ResolutionClient(self.path, timeout=5)
+            results.append(client.resolve(["find", 2], self.query, 2))
+
+        leader = threading.Thread(target=lead)
+        leader.start()
+        started.wait(5)
+        waiters = [threading.Thread(target=wait) for _ in range(4)]
+        for waiter in waiters:
+            waiter.start()
+        release.set()
+        for thread in [leader] + waiters:
+            thread.join(5)
+        self.assertEqual(self.calls, [2])
+        self.assertEqual(results, [[{"id": 2}]] * 5)
+
+    def test_failed_leader_is_replaced(self):
+        self.start_daemon()
+        client = ResolutionClient(self.path, timeout=5)
+
+        def fail():
+            raise RuntimeError("Shotgun is down")
+
+        self.assertRaises(RuntimeError, client.resolve, ["find", 3], fail)
+        self.assertEqual(client.resolve(["find", 3], self.query, 3), [{"id": 3}])
+        self.assertEqual(client.stats()["leads"], 2)
+
+    def test_stale_socket_is_replaced(self):
+        daemon = self.start_daemon()
+        # a process that died leaves its socket behind
+        daemon._closed.set()
+        daemon._thread.join()
+        daemon._socket.close()
+        daemon._lock_file.close()
+        self.daemons.remove(daemon)
+        self.assertTrue(os.path.exists(self.path))
+
+        self.assertIsNotNone(self.start_daemon())
+        client = ResolutionClient(self.path, timeout=5)
+        client.resolve(["find", 4], self.query, 4)
+        self.assertEqual(client.stats()["leads"], 1)
+
+    def test_invalidate(self):
+        self.start_daemon()
+        client = ResolutionClient(self.path, timeout=5)
+        client.resolve(["find", 5], self.query, 5)
+        client.invalidate(["find", 5])
+        client.resolve(["find", 5], self.query, 5)
+        self.assertEqual(self.calls, [5, 5])
+
+    def test_shared_shotgun_queries(self):
+        self.start_daemon()
+        client = ResolutionClient(self.path, timeout=5)
+        test = self
+
+        class Config(object):
+            sudo_as_login = None
+            user_login = None
+
+        class Connection(object):
+            def __init__(self, base_url, login):
+                self.base_url = base_url
+                self.config = Config()
+                self.config.script_name = login
+
+            def find(self, entity_type, filters, fields=None):
+                return test.query((self.base_url, self.config.script_name))
+
+        def connect(base_url, login):
+            connection = Connection(base_url, login)
+            return SharedShotgun(lambda: connection, client)
+
+        for shotgun in [
+            connect("https://a.shotgunstudio.com", "houdini"),
+            connect("https://a.shotgunstudio.com", "houdini"),
+            connect("https://a.shotgunstudio.com", "nuke"),
+            connect("https://b.shotgunstudio.com", "houdini"),
+        ]:
+            shotgun.find("PublishedFile", [["id", "is", 6]], fields=["code"])
+        # only the same site and login share results
+        self.assertEqual(
+            self.calls,
+            [
+                ("https://a.shotgunstudio.com", "houdini"),
+                ("https://a.shotgunstudio.com", "nuke"),
+                ("https://b.shotgunstudio.com", "houdini"),
+            ],
+        )
+
+    def test_shared_listing(self):
+        self.start_daemon()
+        directory = os.path.join(self.root, "v001")
+        os.mkdir(directory)
+        os.mkdir(os.path.join(directory, "sub"))
+        open(os.path.join(directory, "geo.bgeo"), "w").close()
+        # old enough to share the listing
+        os.utime(directory, (0, 0))
+
+        client = ResolutionClient(self.path, timeout=5)
+        for _ in range(2):
+            entries = list_directory_shared(client, directory)
+            listing = sorted((name, is_dir()) for name, is_dir in entries)
+            self.assertEqual(listing, [("geo.bgeo", False), ("sub", True)])
+        self.assertEqual(client.stats()["leads"], 1)
+        self.assertEqual(client.stats()["hits"], 1)
+
+    def test_shared_directory_is_refused(self):
+        shared = os.path.join(self.root, "shared")
+        os.mkdir(shared)
+        os.chmod(shared, 0o777)
+        self.path = os.path.join(shared, "resolve.sock")
+        self.assertIsNone(self.start_daemon())
+
+        client = ResolutionClient(self.path, timeout=5, start_daemon=self.start_daemon)
+        client.resolve(["find", 6], self.query, 6)
+        self.assertEqual(client.stats()["fallbacks"], 1)
+
+    def test_foreign_socket_path_is_refused(self):
+        # something other than a socket of the user's is at the path
+        open(self.path, "w").close()
+        self.assertIsNone(self.start_daemon())
+        self.assertTrue(os.path.isfile(self.path))
+
+        client = ResolutionClient(self.path, timeout=5)
+        client.resolve(["find", 7], self.query, 7)
+        self.assertEqual(client.stats()["fallbacks"], 1)
+
+    def test_socket_directory(self):
+        environ = dict(os.environ)
+        self.addCleanup(os.environ.clear)
+        self.addCleanup(os.environ.update, environ)
+
+        os.environ["XDG_RUNTIME_DIR"] = self.root
+        self.assertEqual(resolution_socket_directory(), self.root)
+
+        # a runtime directory other users can write to isn't used
+        os.chmod(self.root, 0o777)
+        try:
+            directory = resolution_socket_directory()
+        finally:
+            os.chmod(self.root, 0o700)
+        self.assertNotEqual(directory, self.root)
+        self.assertEqual(os.stat(directory).st_mode & 0o777, 0o700)
+        self.assertEqual(os.stat(directory).st_uid, os.getuid())
+
+
+if __name__ == "__main__":
+    unittest.main()
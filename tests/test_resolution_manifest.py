@@ -0,0 +1,83 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import utils_loader  # noqa
+from tk_houdini_utils.resolution_manifest import ResolutionManifest
+
+PUBLISH_KEY = (("PublishedFileType", 1), ("Shot", 2), ("Project", 3), "cache")
+
+
+class TestResolutionManifest(unittest.TestCase):
+    """
+    Tests the manifest of the paths sgtk nodes were resolved to.
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.hip_path = os.path.join(self.root, "scene.hip")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def make_manifest(self):
+        manifest = ResolutionManifest(hip_path=self.hip_path)
+        manifest.add_node(
+            "/obj/geo1/alembic1",
+            {
+                "node_type": "Sop/alembic",
+                "inputs": ["/cache_v003.abc"],
+                "publish": {
+                    "key": PUBLISH_KEY,
+                    "id": 30,
+                    "version_number": 3,
+                    "sg_status_list": "cmpt",
+                    "path": {"link_type": "local", "local_path": "/cache_v003.abc"},
+                },
+            },
+        )
+        manifest.add_node(
+            "/out/geometry1",
+            {
+                "node_type": "Driver/geometry",
+                "output_path": "/geo_v001.$F4.bgeo.sc",
+                "outputs": [{"path": "/geo_v001.$F4.bgeo.sc"}],
+            },
+        )
+        return manifest
+
+    def test_round_trip(self):
+        path = ResolutionManifest.get_path(self.hip_path)
+        self.assertEqual(path, self.hip_path + ".sgtk.json")
+        self.make_manifest().save(path)
+        self.assertEqual(os.listdir(self.root), [os.path.basename(path)])
+
+        manifest = ResolutionManifest.load(path)
+        self.assertEqual(manifest.hip_path, self.hip_path)
+        self.assertEqual(manifest.input_paths(), ["/cache_v003.abc"])
+        self.assertEqual(manifest.output_paths(), ["/geo_v001.$F4.bgeo.sc"])
+        rows = manifest.find_publishes(PUBLISH_KEY)
+        self.assertEqual([row["id"] for row in rows], [30])
+        self.assertNotIn("key", rows[0])
+        self.assertEqual(manifest.find_publishes(PUBLISH_KEY[:3] + ("other",)), [])
+
+    def test_unsupported_version(self):
+        path = ResolutionManifest.get_path(self.hip_path)
+        with open(path, "w") as manifest_file:
+            manifest_file.write('{"version": 0}')
+        self.assertRaises(ValueError, ResolutionManifest.load, path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,297 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import json
+
+import hou
+
+# Required so that the SHOTGUN_HOME env var will be set
+from tank_test.tank_test_base import setUpModule  # noqa
+
+from node_handler_test_base import TestNodeHandlers, mock
+
+
+class TestSgtkNodes(TestNodeHandlers):
+    """
+    Tests how the engine keeps track of and refreshes the sgtk nodes.
+    """
+
+    def test_coalesced_refreshes(self):
+        """
+        Tests refreshes scheduled for the same node are collapsed into one.
+        """
+        node = self.create_file_node()
+        other_node = self.create_file_node()
+        handler = self.engine.node_handler(node)
+
+        with mock.patch.object(handler, "refresh_file_paths") as refresh:
+            with self.engine.defer_refreshes():
+                for _ in range(3):
+                    self.engine.schedule_refresh(node)
+                self.engine.schedule_refresh(other_node)
+                self.engine.schedule_refresh(node)
+                self.assertEqual(refresh.call_count, 0)
+            refresh.assert_called_once_with([node, other_node])
+
+    def test_flush_refreshes(self):
+        """
+        Tests scheduled refreshes can be run straight away.
+        """
+        node = self.create_file_node()
+        other_node = self.create_file_node()
+        handler = self.engine.node_handler(node)
+
+        with mock.patch.object(handler, "refresh_file_paths") as refresh:
+            with self.engine.defer_refreshes():
+                self.engine.schedule_refresh(node)
+                self.engine.schedule_refresh(other_node)
+                self.engine.flush_refreshes([node])
+                refresh.assert_called_once_with([node])
+            self.assertEqual(refresh.call_count, 2)
+            refresh.assert_called_with([other_node])
+
+            # without a UI, refreshes aren't held back unless deferred
+            self.engine.schedule_refresh(node)
+            self.assertEqual(refresh.call_count, 3)
+
+    def test_scene_event_refresh_policies(self):
+        """
+        Tests saving only updates the variables by default, while loading
+        refreshes every node.
+        """
+        self.create_file_node()
+        with mock.patch.object(
+            self.engine, "refresh_sgtk_nodes"
+        ) as refresh, mock.patch.object(self.engine, "update_variables") as update:
+            self.engine.refresh_after_scene_event("save")
+            self.assertEqual(update.call_count, 1)
+            self.assertEqual(refresh.call_count, 0)
+
+            self.engine.refresh_after_scene_event("load")
+            self.assertEqual(update.call_count, 2)
+            refresh.assert_called_once_with()
+
+            self.override_setting("clear_refresh_policy", "none")
+            self.engine.refresh_after_scene_event("clear")
+            self.assertEqual(update.call_count, 2)
+            self.assertEqual(refresh.call_count, 1)
+
+    def test_dirty_refresh_policy(self):
+        """
+        Tests only the nodes whose parms changed since they were last
+        refreshed are refreshed by the ``dirty`` policy.
+        """
+        self.add_publishes("cache", [1, 2])
+        node = self.create_file_node("cache")
+        other_node = self.create_file_node("cache")
+        handler = self.engine.node_handler(node)
+        self.engine.refresh_sgtk_nodes()
+        self.assertEqual(list(self.engine.dirty_sgtk_nodes()), [])
+
+        node.parm(handler.SGTK_VERSION).set(0)
+        self.assertEqual(list(self.engine.dirty_sgtk_nodes()), [node])
+
+        self.override_setting("save_refresh_policy", "dirty")
+        with mock.patch.object(handler, "refresh_file_paths") as refresh:
+            self.engine.refresh_after_scene_event("save")
+        refresh.assert_called_once_with([node])
+        self.assertNotIn(other_node, refresh.call_args[0][0])
+
+    def test_node_handlers_kept_across_save_and_load(self):
+        """
+        Tests node handlers are only created again when the context or
+        environment changes, or when forced to.
+        """
+        node = self.create_file_node()
+        path = node.path()
+        handler = self.engine.node_handler(node)
+        constructions = self.engine.node_handler_constructions
+
+        file_path = self._create_file("handlers")
+        self.engine.refresh_after_scene_event("save")
+        hou.hipFile.load(file_path, suppress_save_prompt=True)
+        self.engine.refresh_after_scene_event("load")
+        self.assertIs(self.engine.node_handler(hou.node(path)), handler)
+        self.assertEqual(self.engine.node_handler_constructions, constructions)
+
+        with mock.patch.object(
+            self.engine, "_get_node_handlers_key", return_value=("other context",)
+        ):
+            self.engine.reset_node_handlers()
+        handler = self.engine.node_handler(hou.node(path))
+        self.assertEqual(self.engine.node_handler_constructions, constructions + 1)
+
+        self.engine.reset_node_handlers(force=True)
+        self.assertIsNot(self.engine.node_handler(hou.node(path)), handler)
+        self.assertEqual(self.engine.node_handler_constructions, constructions + 2)
+
+    def test_node_handler_configs_rebuilt_with_node_handlers(self):
+        """
+        Tests the node handler configs are indexed again from the settings of
+        the new environment when the node handlers are reset.
+        """
+        node = self.create_file_node()
+        configs = self.engine.node_handler_configs
+        self.engine.reset_node_handlers()
+        self.assertIs(self.engine.node_handler_configs, configs)
+
+        self.override_setting("node_handlers", [])
+        with mock.patch.object(
+            self.engine, "_get_node_handlers_key", return_value=("other context",)
+        ):
+            self.engine.reset_node_handlers()
+        self.assertEqual(list(self.engine.node_handler_configs), [])
+        self.assertIsNone(self.engine.node_handler(node))
+        self.assertEqual(list(self.engine.all_sgtk_nodes()), [])
+
+    def get_sgtk_node_paths(self):
+        return sorted(node.path() for node in self.engine.all_sgtk_nodes())
+
+    def test_sgtk_node_registry(self):
+        """
+        Tests the registry keeps track of the created and deleted sgtk nodes.
+        """
+        node = self.create_file_node()
+        self.geo.createNode("null")
+        self.assertEqual(self.get_sgtk_node_paths(), [node.path()])
+
+        # as the OnCreated and OnDeleted scripts do
+        other_node = self.create_file_node()
+        self.engine.register_sgtk_node(other_node)
+        self.assertEqual(
+            self.get_sgtk_node_paths(), sorted([node.path(), other_node.path()])
+        )
+        self.engine.unregister_sgtk_node(other_node)
+        other_node.destroy()
+        self.assertEqual(self.get_sgtk_node_paths(), [node.path()])
+
+        # deleted without the OnDeleted script running
+        node.destroy()
+        self.assertEqual(self.get_sgtk_node_paths(), [])
+
+    def test_sgtk_node_registry_lookups(self):
+        """
+        Tests the nodes of the handled types aren't looked through again once
+        the registry is built.
+        """
+        node = self.create_file_node()
+        self.assertEqual(self.get_sgtk_node_paths(), [node.path()])
+
+        with mock.patch.object(
+            self.engine,
+            "_get_node_type_instances",
+            wraps=self.engine._get_node_type_instances,
+        ) as get_node_type_instances:
+            other_node = self.create_file_node()
+            self.engine.register_sgtk_node(other_node)
+            for _ in range(3):
+                self.assertEqual(
+                    self.get_sgtk_node_paths(),
+                    sorted([node.path(), other_node.path()]),
+                )
+        self.assertEqual(get_node_type_instances.call_count, 0)
+
+    def test_sgtk_node_registry_after_undo(self):
+        """
+        Tests nodes restored by undoing their deletion are registered again.
+        """
+        if not hou.undos.areEnabled():
+            self.skipTest("Undos are disabled")
+        node = self.create_file_node()
+        path = node.path()
+        self.assertEqual(self.get_sgtk_node_paths(), [path])
+
+        with hou.undos.group("Delete sgtk node"):
+            self.engine.unregister_sgtk_node(node)
+            node.destroy()
+        self.assertEqual(self.get_sgtk_node_paths(), [])
+
+        hou.undos.performUndo()
+        self.assertEqual(self.get_sgtk_node_paths(), [path])
+
+    def test_saved_sgtk_node_registry(self):
+        """
+        Tests the registry is saved with the scene and rebuilt if it drifted.
+        """
+        node = self.create_file_node()
+        self.engine.save_sgtk_node_registry()
+        saved = hou.node("/").userData(self.engine.SGTK_NODE_REGISTRY_KEY)
+        self.assertEqual(json.loads(saved), [["Sop", "file", [node.path()]]])
+        self.assertFalse(self.engine.check_sgtk_node_registry())
+
+        self.engine.unregister_sgtk_node(node)
+        self.assertTrue(self.engine.check_sgtk_node_registry())
+        self.assertEqual(self.get_sgtk_node_paths(), [node.path()])
+
+    def freeze_paths(self):
+        """
+        Enable frozen paths for the rest of the test.
+        """
+        patcher = mock.patch.object(self.engine, "_HoudiniEngine__frozen_paths", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_frozen_paths(self):
+        """
+        Tests the nodes keep the paths they were resolved to and Shotgun isn't
+        queried when paths are frozen.
+        """
+        self.add_publishes("cache", [1])
+        node = self.create_file_node("cache")
+        self.add_publishes("cache", [2])
+        self.reset_queries()
+        self.freeze_paths()
+
+        self.engine.refresh_sgtk_nodes()
+        self.engine.schedule_refresh(node)
+        self.engine.flush_refreshes()
+        self.engine.refresh_after_scene_event("load")
+        self.assertEqual(self.get_input_path(node), self.get_publish_path("cache", 1))
+
+        self.assertEqual(self.queries.mock_calls, [])
+
+    def test_frozen_paths_skip_migrations(self):
+        """
+        Tests the sgtk parms of loaded nodes are left untouched when paths
+        are frozen.
+        """
+        self.add_publishes("cache", [1])
+        node = self.create_file_node("cache")
+        handler = self.engine.node_handler(node)
+        legacy_publish_data = json.dumps(self.get_publish_data("cache"))
+        node.parm(handler.SGTK_PUBLISH_DATA).set(legacy_publish_data)
+        self.freeze_paths()
+
+        with mock.patch.object(handler, "remove_sgtk_parms") as remove_sgtk_parms:
+            handler.on_loaded(node=node)
+        self.assertEqual(remove_sgtk_parms.call_count, 0)
+        self.assertEqual(
+            node.parm(handler.SGTK_PUBLISH_DATA).evalAsString(), legacy_publish_data
+        )
+
+    def test_frozen_paths_report_unresolved_paths(self):
+        """
+        Tests the paths left unresolved are reported when a scene is loaded
+        with frozen paths.
+        """
+        self.add_publishes("cache", [1])
+        self.create_file_node("cache")
+        node = self.create_file_node()
+        self.engine.node_handler(node).refresh_file_path({"node": node})
+        self.freeze_paths()
+
+        with mock.patch.object(
+            self.engine, "log_unresolved_paths", wraps=self.engine.log_unresolved_paths
+        ) as log_unresolved_paths:
+            self.engine.refresh_after_scene_event("load")
+        log_unresolved_paths.assert_called_once_with()
+        self.assertEqual(
+            self.engine.log_unresolved_paths(), ["{}/file".format(node.path())]
+        )
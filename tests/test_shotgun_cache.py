@@ -0,0 +1,163 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+import utils_loader  # noqa
+from tk_houdini_utils.shotgun_cache import CachedShotgun, ShotgunQueryCache
+
+FILTERS = [["project", "is", {"type": "Project", "id": 1}]]
+
+
+class FakeShotgun(object):
+    """
+    Stand-in for a Shotgun connection, counting the queries made.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.rows = [{"type": "PublishedFile", "id": 1, "version_number": 1}]
+
+    def find(self, entity_type, filters, fields=None, **kwargs):
+        self.queries.append(("find", entity_type))
+        return [dict(row) for row in self.rows]
+
+    def find_one(self, entity_type, filters, fields=None, **kwargs):
+        self.queries.append(("find_one", entity_type))
+        return dict(self.rows[-1])
+
+
+class TestShotgunCache(unittest.TestCase):
+    """
+    Tests the on disk cache of Shotgun queries.
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "cache", "shotgun.sqlite")
+        self.now = 1000.0
+        self.connection = FakeShotgun()
+        self.revalidations = []
+        self.revalidated = []
+        self.caches = []
+
+    def tearDown(self):
+        for cache in self.caches:
+            cache.close()
+        shutil.rmtree(self.root)
+
+    def make_shotgun(self, revalidate=False):
+        cache = ShotgunQueryCache(
+            self.path, {"PublishedFile": 60}, max_stale=600, timer=lambda: self.now,
+        )
+        self.caches.append(cache)
+        return CachedShotgun(
+            lambda: self.connection,
+            cache,
+            revalidate=self.revalidate if revalidate else None,
+            on_revalidated=self.revalidated.append,
+        )
+
+    def revalidate(self, key, func, args, callback=None):
+        self.revalidations.append((key, func, args, callback))
+
+    def test_shared_by_sessions(self):
+        sg = self.make_shotgun()
+        rows = sg.find("PublishedFile", FILTERS, ["version_number"])
+        self.assertEqual(rows, self.connection.rows)
+        # another session reads the same database
+        other_sg = self.make_shotgun()
+        self.assertEqual(
+            other_sg.find("PublishedFile", FILTERS, ["version_number"]), rows
+        )
+        self.assertEqual(len(self.connection.queries), 1)
+        self.assertEqual(other_sg.cache.stats()["hits"], 1)
+
+        other_sg.find("PublishedFile", FILTERS, ["code"])
+        other_sg.find_one("PublishedFile", FILTERS, ["version_number"])
+        self.assertEqual(len(self.connection.queries), 3)
+
+    def test_uncached_entity_types(self):
+        sg = self.make_shotgun()
+        sg.find("Task", FILTERS)
+        sg.find("Task", FILTERS)
+        self.assertEqual(len(self.connection.queries), 2)
+
+    def test_stale_while_revalidate(self):
+        sg = self.make_shotgun(revalidate=True)
+        rows = sg.find("PublishedFile", FILTERS)
+        self.connection.rows.append({"type": "PublishedFile", "id": 2})
+
+        self.now += 120
+        self.assertEqual(sg.find("PublishedFile", FILTERS), rows)
+        self.assertEqual(len(self.connection.queries), 1)
+        self.assertEqual(len(self.revalidations), 1)
+
+        key, func, args, callback = self.revalidations.pop()
+        callback(func(*args))
+        # users of the stale result are told it changed
+        self.assertEqual(self.revalidated, ["PublishedFile"])
+        self.assertEqual(len(sg.find("PublishedFile", FILTERS)), 2)
+        self.assertEqual(sg.cache.stats()["stale_hits"], 1)
+
+        # too old to be used while revalidating
+        self.now += 1000
+        sg.find("PublishedFile", FILTERS)
+        self.assertEqual(len(self.connection.queries), 3)
+        self.assertEqual(self.revalidations, [])
+
+    def test_unchanged_revalidation(self):
+        sg = self.make_shotgun(revalidate=True)
+        sg.find("PublishedFile", FILTERS)
+        self.now += 120
+        sg.find("PublishedFile", FILTERS)
+        key, func, args, callback = self.revalidations.pop()
+        callback(func(*args))
+        self.assertEqual(self.revalidated, [])
+
+    def test_stale_without_revalidator(self):
+        sg = self.make_shotgun()
+        sg.find("PublishedFile", FILTERS)
+        self.now += 120
+        sg.find("PublishedFile", FILTERS)
+        self.assertEqual(len(self.connection.queries), 2)
+
+    def test_invalidate(self):
+        sg = self.make_shotgun()
+        sg.find("PublishedFile", FILTERS)
+        sg.invalidate("find", "PublishedFile", FILTERS)
+        sg.find("PublishedFile", FILTERS)
+        self.assertEqual(len(self.connection.queries), 2)
+
+    def test_invalidate_entity_type(self):
+        sg = self.make_shotgun()
+        other_filters = [["project", "is", {"type": "Project", "id": 2}]]
+        sg.find("PublishedFile", FILTERS)
+        sg.find("PublishedFile", other_filters)
+        sg.invalidate_entity_type("PublishedFile")
+        sg.find("PublishedFile", FILTERS)
+        sg.find("PublishedFile", other_filters)
+        self.assertEqual(len(self.connection.queries), 4)
+
+    def test_unserializable_results(self):
+        sg = self.make_shotgun()
+        self.connection.rows[0]["created_at"] = datetime.datetime(2020, 1, 1)
+        sg.find("PublishedFile", FILTERS)
+        rows = sg.find("PublishedFile", FILTERS)
+        self.assertIsInstance(rows[0]["created_at"], datetime.datetime)
+        self.assertEqual(len(self.connection.queries), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
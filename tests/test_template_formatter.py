@@ -0,0 +1,120 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import unittest
+
+import utils_loader  # noqa
+from tk_houdini_utils.template_formatter import TemplateFormatter
+
+
+class FakeIntegerKey(object):
+    """
+    Stand-in for :class:`sgtk.IntegerKey`.
+    """
+
+    def __init__(self, padding):
+        self.padding = padding
+
+    def str_from_value(self, value):
+        if isinstance(value, str) and value.startswith("FORMAT: "):
+            return "$F{}".format(self.padding)
+        if not isinstance(value, int):
+            raise ValueError("Not an int: {!r}".format(value))
+        return "{:0{}d}".format(value, self.padding)
+
+    def value_from_str(self, text):
+        return int(text)
+
+
+class FakeStringKey(object):
+    """
+    Stand-in for :class:`sgtk.StringKey`.
+    """
+
+    def __init__(self, choices=None):
+        self.choices = choices
+
+    def str_from_value(self, value):
+        value = str(value)
+        if self.choices and value not in self.choices:
+            raise ValueError("Not a choice: {!r}".format(value))
+        return value
+
+    def value_from_str(self, text):
+        return self.str_from_value(text)
+
+
+class FakeTemplate(object):
+    """
+    Stand-in for :class:`sgtk.Template`, counting the paths it formats.
+    """
+
+    def __init__(self, definition, keys):
+        self.definition = definition
+        self.keys = keys
+        self.applied = 0
+
+    def apply_fields(self, fields):
+        self.applied += 1
+        values = dict(
+            (name, key.str_from_value(fields[name])) for name, key in self.keys.items()
+        )
+        return self.definition.format(**values)
+
+
+class TestTemplateFormatter(unittest.TestCase):
+    """
+    Tests the formatters compiled from templates.
+    """
+
+    def setUp(self):
+        self.template = FakeTemplate(
+            "/shots/{Shot}/v{version}/{Shot}_{channel}_v{version}.{SEQ}.{extension}",
+            {
+                "Shot": FakeStringKey(),
+                "version": FakeIntegerKey(3),
+                "channel": FakeStringKey(),
+                "SEQ": FakeIntegerKey(4),
+                "extension": FakeStringKey(choices=["exr", "tif"]),
+            },
+        )
+        self.fields = {
+            "Shot": "sh010",
+            "version": 1,
+            "channel": "beauty",
+            "SEQ": "FORMAT: $F",
+            "extension": "exr",
+        }
+
+    def test_format(self):
+        formatter = TemplateFormatter(
+            self.template, self.fields, ["version", "channel", "SEQ"]
+        )
+        self.assertEqual(self.template.applied, 1)
+        for version, channel in ((1, "beauty"), (12, "diffuse")):
+            fields = dict(self.fields, version=version, channel=channel)
+            self.assertEqual(
+                formatter.format(fields), self.template.apply_fields(fields)
+            )
+
+    def test_format_validates_values(self):
+        formatter = TemplateFormatter(self.template, self.fields, ["version"])
+        with self.assertRaises(ValueError):
+            formatter.format(dict(self.fields, version="latest"))
+
+    def test_invalid_varying_keys(self):
+        with self.assertRaises(ValueError):
+            TemplateFormatter(self.template, self.fields, ["extension"])
+        with self.assertRaises(ValueError):
+            TemplateFormatter(self.template, self.fields, ["missing"])
+
+
+if __name__ == "__main__":
+    unittest.main()
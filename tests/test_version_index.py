@@ -0,0 +1,124 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import utils_loader  # noqa
+from tk_houdini_utils.dir_watcher import (
+    InotifyDirWatcher,
+    PollingDirWatcher,
+)
+from tk_houdini_utils.version_index import VersionIndex
+from tk_houdini_utils.version_scanner import VERSION_TOKEN, WILDCARD_TOKEN
+
+
+class ManualDirWatcher(PollingDirWatcher):
+    """
+    Watcher reporting the directories it is told have changed.
+    """
+
+    def __init__(self):
+        super(ManualDirWatcher, self).__init__()
+        self.changed = set()
+
+    def poll(self):
+        changed, self.changed = self.changed, set()
+        return changed & set(self.directories)
+
+
+class TestVersionIndex(unittest.TestCase):
+    """
+    Tests the live index of versions on disk.
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.watcher = ManualDirWatcher()
+        self.index = VersionIndex(self.watcher)
+        self.scan_path = os.path.join(
+            self.root,
+            "v" + VERSION_TOKEN,
+            "geo_v{}.{}.bgeo".format(VERSION_TOKEN, WILDCARD_TOKEN),
+        )
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.root)
+
+    def _write_version(self, version):
+        directory = os.path.join(self.root, "v{:03d}".format(version))
+        os.makedirs(directory)
+        path = os.path.join(directory, "geo_v{:03d}.0001.bgeo".format(version))
+        open(path, "w").close()
+
+    def test_new_version_detected(self):
+        self._write_version(1)
+        self.assertEqual(self.index.versions(self.scan_path, key="node"), [1])
+        self.assertIn(self.root, self.watcher.directories)
+
+        self._write_version(2)
+        self.watcher.changed.add(self.root)
+        self.assertEqual(self.index.poll(), {"node"})
+        self.assertEqual(self.index.versions(self.scan_path), [1, 2])
+
+        # unrelated changes don't report the key
+        self.watcher.changed.add(self.root)
+        self.assertEqual(self.index.poll(), set())
+
+    def test_missing_root_watched_through_parent(self):
+        scan_path = os.path.join(self.root, "missing", "v" + VERSION_TOKEN)
+        self.assertEqual(self.index.versions(scan_path, key="node"), [])
+        self.assertEqual(self.watcher.directories, [self.root])
+
+    def test_forget(self):
+        self._write_version(1)
+        self.index.versions(self.scan_path, key="node")
+        self.index.forget("node")
+        self.assertEqual(self.watcher.directories, [])
+
+    def test_unregistered_paths_not_watched(self):
+        self._write_version(1)
+        self.assertEqual(self.index.versions(self.scan_path), [1])
+        self.assertEqual(self.watcher.directories, [])
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+class TestInotifyDirWatcher(unittest.TestCase):
+    """
+    Tests watching directories with inotify.
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.watcher = InotifyDirWatcher()
+
+    def tearDown(self):
+        self.watcher.close()
+        shutil.rmtree(self.root)
+
+    def test_poll(self):
+        missing = os.path.join(self.root, "missing")
+        self.watcher.watch(self.root)
+        self.watcher.watch(missing)
+        self.assertEqual(self.watcher.poll(), set())
+
+        os.makedirs(missing)
+        self.assertEqual(self.watcher.poll(), {self.root, missing})
+
+        open(os.path.join(missing, "file"), "w").close()
+        self.assertEqual(self.watcher.poll(), {missing})
+
+
+if __name__ == "__main__":
+    unittest.main()
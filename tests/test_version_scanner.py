@@ -0,0 +1,92 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import utils_loader  # noqa
+from tk_houdini_utils.version_scanner import list_directory
+from tk_houdini_utils.version_scanner import (
+    VERSION_TOKEN,
+    WILDCARD_TOKEN,
+    scan_versions,
+)  # noqa
+
+
+class TestVersionScanner(unittest.TestCase):
+    """
+    Tests finding the versions on disk for a tokenised path.
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _touch(self, *parts):
+        path = os.path.join(self.root, *parts)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        open(path, "w").close()
+
+    def _path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def test_versioned_sequence(self):
+        for version in (1, 2, 10):
+            for frame in range(1, 4):
+                self._touch(
+                    "v{:03d}".format(version),
+                    "beauty",
+                    "shot_v{:03d}.{:04d}.exr".format(version, frame),
+                )
+        # version folder without any matching frames
+        os.makedirs(self._path("v004", "beauty"))
+        self._touch("v005", "beauty", "shot_v006.0001.exr")
+
+        path = self._path(
+            "v" + VERSION_TOKEN,
+            "beauty",
+            "shot_v{}.{}.exr".format(VERSION_TOKEN, WILDCARD_TOKEN),
+        )
+        self.assertEqual(scan_versions(path), {1, 2, 10})
+
+    def test_frames_collapsed(self):
+        for frame in range(1, 50):
+            self._touch("shot_v001.{:04d}.exr".format(frame))
+        self._touch("shot_v002.0001.exr")
+
+        listed = []
+
+        def list_dir(directory):
+            listed.append(directory)
+            return list_directory(directory)
+
+        path = self._path("shot_v{}.{}.exr".format(VERSION_TOKEN, WILDCARD_TOKEN))
+        self.assertEqual(scan_versions(path, list_dir=list_dir), {1, 2})
+        self.assertEqual(listed, [self.root])
+
+    def test_unversioned(self):
+        self._touch("cache", "geo.0001.bgeo")
+        path = self._path("cache", "geo.{}.bgeo".format(WILDCARD_TOKEN))
+        self.assertEqual(scan_versions(path), {None})
+        self.assertEqual(scan_versions(self._path("cache", "geo.0001.bgeo")), {None})
+        self.assertEqual(scan_versions(self._path("missing", "geo.bgeo")), set())
+
+    def test_missing_root(self):
+        path = self._path("missing", "v" + VERSION_TOKEN, "geo.bgeo")
+        self.assertEqual(scan_versions(path), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+# Copyright (c) 2019 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import threading
+import unittest
+
+import utils_loader  # noqa
+from tk_houdini_utils.worker_pool import WorkerPool
+
+
+class QueuedDispatcher(object):
+    """
+    Stand-in for the main thread, delivering results on request.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.dispatched = threading.Semaphore(0)
+
+    def __call__(self, func, *args):
+        self.calls.append((func, args))
+        self.dispatched.release()
+
+    def wait(self, count=1):
+        for _ in range(count):
+            self.dispatched.acquire()
+
+    def run(self):
+        calls, self.calls = self.calls, []
+        for func, args in calls:
+            func(*args)
+
+
+class TestWorkerPool(unittest.TestCase):
+    """
+    Tests the worker pool used to resolve publishes asynchronously.
+    """
+
+    def setUp(self):
+        self.dispatcher = QueuedDispatcher()
+        self.pool = WorkerPool(self.dispatcher, workers=2)
+        self.results = []
+        self.errors = []
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_callback(self):
+        self.pool.submit("node", sum, args=([1, 2],), callback=self.results.append)
+        self.dispatcher.wait()
+        self.assertTrue(self.pool.is_pending("node"))
+        self.dispatcher.run()
+        self.assertEqual(self.results, [3])
+        self.assertFalse(self.pool.is_pending("node"))
+
+    def test_errback(self):
+        self.pool.submit(
+            "node",
+            int,
+            args=("nope",),
+            callback=self.results.append,
+            errback=self.errors.append,
+        )
+        self.dispatcher.wait()
+        self.dispatcher.run()
+        self.assertEqual(self.results, [])
+        self.assertIsInstance(self.errors[0], ValueError)
+
+    def test_stale_results_discarded(self):
+        self.pool.submit("node", sum, args=([1],), callback=self.results.append)
+        self.dispatcher.wait()
+        self.pool.submit("node", sum, args=([2],), callback=self.results.append)
+        self.dispatcher.wait()
+        self.dispatcher.run()
+        self.assertEqual(self.results, [2])
+
+    def test_cancel(self):
+        self.pool.submit("node", sum, args=([1],), callback=self.results.append)
+        self.dispatcher.wait()
+        self.pool.cancel("node")
+        self.dispatcher.run()
+        self.assertEqual(self.results, [])
+
+
+if __name__ == "__main__":
+    unittest.main()